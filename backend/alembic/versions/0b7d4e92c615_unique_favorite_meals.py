@@ -0,0 +1,33 @@
+"""unique_favorite_meals
+
+Revision ID: 0b7d4e92c615
+Revises: f3a9c27e1d58
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d4e92c615'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c27e1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mevcut tekrarlı favorilerden en eskisi kalır
+    op.execute(
+        "DELETE FROM favorite_meals WHERE id NOT IN "
+        "(SELECT MIN(id) FROM favorite_meals GROUP BY user_id, meal_id)"
+    )
+    op.create_unique_constraint('uq_favorite_meals_user_meal', 'favorite_meals', ['user_id', 'meal_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_favorite_meals_user_meal', 'favorite_meals', type_='unique')
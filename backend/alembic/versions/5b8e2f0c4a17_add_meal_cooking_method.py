@@ -0,0 +1,28 @@
+"""add_meal_cooking_method
+
+Revision ID: 5b8e2f0c4a17
+Revises: a3c91e5b7d20
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f0c4a17'
+down_revision: Union[str, Sequence[str], None] = 'a3c91e5b7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('meals', sa.Column('cooking_method', sa.String(length=50), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('meals', 'cooking_method')
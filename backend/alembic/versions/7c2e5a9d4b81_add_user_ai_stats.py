@@ -0,0 +1,43 @@
+"""add_user_ai_stats
+
+Revision ID: 7c2e5a9d4b81
+Revises: 0b7d4e92c615
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5a9d4b81'
+down_revision: Union[str, Sequence[str], None] = '0b7d4e92c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_ai_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('interaction_count', sa.Integer(), nullable=False),
+    sa.Column('acceptance_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Mevcut etkileşim / kabul sayılarından doldur
+    op.execute(
+        "INSERT INTO user_ai_stats (user_id, interaction_count, acceptance_count) "
+        "SELECT u.id, "
+        "(SELECT COUNT(*) FROM ai_interactions i WHERE i.user_id = u.id), "
+        "(SELECT COUNT(*) FROM ai_acceptances a WHERE a.user_id = u.id) "
+        "FROM users u WHERE EXISTS (SELECT 1 FROM ai_interactions i WHERE i.user_id = u.id) "
+        "OR EXISTS (SELECT 1 FROM ai_acceptances a WHERE a.user_id = u.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_ai_stats')
@@ -0,0 +1,37 @@
+"""add_id_blocks
+
+Revision ID: 8d4f1b6e2a93
+Revises: 7c2e5a9d4b81
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f1b6e2a93'
+down_revision: Union[str, Sequence[str], None] = '7c2e5a9d4b81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('id_blocks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('next_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Write-behind AI kayıtlarının id'leri mevcut en büyük id'den sonra başlar
+    for table in ('ai_interactions', 'ai_acceptances'):
+        op.execute(
+            f"INSERT INTO id_blocks (name, next_id) SELECT '{table}', COALESCE(MAX(id), 0) + 1 FROM {table}"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('id_blocks')
@@ -0,0 +1,32 @@
+"""enable_snapshot_isolation
+
+Revision ID: b5e92d7a1c34
+Revises: 8d4f1b6e2a93
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e92d7a1c34'
+down_revision: Union[str, Sequence[str], None] = '8d4f1b6e2a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Kural madenciliği geçişleri tek SNAPSHOT transaction'ında okur (MSSQL'e özgü ayar)
+    if op.get_bind().dialect.name == 'mssql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER DATABASE CURRENT SET ALLOW_SNAPSHOT_ISOLATION ON")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'mssql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER DATABASE CURRENT SET ALLOW_SNAPSHOT_ISOLATION OFF")
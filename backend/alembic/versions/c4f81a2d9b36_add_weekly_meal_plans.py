@@ -0,0 +1,42 @@
+"""add_weekly_meal_plans
+
+Revision ID: c4f81a2d9b36
+Revises: 9e4d6a1f3c52
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f81a2d9b36'
+down_revision: Union[str, Sequence[str], None] = '9e4d6a1f3c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('weekly_meal_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('plan_date', sa.Date(), nullable=False),
+    sa.Column('meal_type', sa.String(length=50), nullable=False),
+    sa.Column('meal_id', sa.Integer(), nullable=False),
+    sa.Column('portion', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['meal_id'], ['meals.meal_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_weekly_meal_plans_user_week', 'weekly_meal_plans', ['user_id', 'week_start'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_weekly_meal_plans_user_week', table_name='weekly_meal_plans')
+    op.drop_table('weekly_meal_plans')
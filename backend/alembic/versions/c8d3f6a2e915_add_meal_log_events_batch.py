@@ -0,0 +1,31 @@
+"""add_meal_log_events_batch
+
+Revision ID: c8d3f6a2e915
+Revises: b5e92d7a1c34
+Create Date: 2026-10-20 01:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d3f6a2e915'
+down_revision: Union[str, Sequence[str], None] = 'b5e92d7a1c34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mevcut olaylar NULL kalır; eski (watermark'lı) durumlar ilk turda tam madencilik yapar
+    op.add_column('meal_log_events', sa.Column('batch', sa.Integer(), nullable=True))
+    op.create_index('ix_meal_log_events_batch', 'meal_log_events', ['batch'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_meal_log_events_batch', table_name='meal_log_events')
+    op.drop_column('meal_log_events', 'batch')
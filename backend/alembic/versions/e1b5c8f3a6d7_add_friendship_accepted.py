@@ -0,0 +1,32 @@
+"""add_friendship_accepted
+
+Revision ID: e1b5c8f3a6d7
+Revises: d4a7e1c9f258
+Create Date: 2026-10-20 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b5c8f3a6d7'
+down_revision: Union[str, Sequence[str], None] = 'd4a7e1c9f258'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mevcut satırlar zaten karşılıklı eklenmişti → kabul edilmiş sayılır
+    op.add_column('friendships', sa.Column('accepted', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # İki yönlü olmayan (bekleyen) istekler eski şemada arkadaşlık sayılmasın
+    friendships = sa.table('friendships', sa.column('accepted', sa.Boolean()))
+    op.execute(friendships.delete().where(friendships.c.accepted == sa.false()))
+    op.drop_column('friendships', 'accepted')
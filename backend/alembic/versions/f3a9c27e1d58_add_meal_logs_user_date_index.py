@@ -0,0 +1,28 @@
+"""add_meal_logs_user_date_index
+
+Revision ID: f3a9c27e1d58
+Revises: e6b0d3c58a14
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c27e1d58'
+down_revision: Union[str, Sequence[str], None] = 'e6b0d3c58a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_meal_logs_user_date', 'meal_logs', ['user_id', 'log_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_meal_logs_user_date', table_name='meal_logs')
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MIN: int = 1440  # 24 saat
+    JWT_CACHE_MAX_TOKENS: int = 10000  # Doğrulanmış token cache'i (0: kapalı)
 
     # OpenAI
     OPENAI_API_KEY: str = ""
@@ -32,6 +33,60 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
 
+    # User context cache (hedef/profil/aktivite)
+    USER_CONTEXT_TTL_SECONDS: int = 30
+
+    # Catalog version kontrol aralığı (in-memory indeksler için)
+    CATALOG_VERSION_CHECK_SECONDS: int = 10
+
+    # Birliktelik kuralları (mining) - versiyonlu kural dosyaları
+    RULE_STORE_DIR: str = "rule_store"
+
+    # Katalogdan türetilen disk indeksleri (benzerlik, ...) - catalog_version başına
+    MEAL_INDEX_DIR: str = "meal_index"
+    SIMILAR_MEALS_TOP_K: int = 50
+
+    # Implicit ALS öneri modeli (scripts/train_recommender.py yazar)
+    RECOMMENDER_DIR: str = "recommender_model"
+
+    # Öğün planlayıcı arama süresi bütçesi (ms)
+    MEAL_PLAN_BUDGET_MS: int = 150
+
+    # Streak leaderboard: bellek içi indeks tablodan yeniden kurulma aralığı
+    # (birden fazla worker'da diğer worker'ların yazımları bu sürede yansır)
+    LEADERBOARD_REBUILD_SECONDS: int = 300
+
+    # Idempotency-Key (POST /logs, /favorites, /ai/accept) cevap deposu (idempotency_keys tablosu)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+
+    # Kullanıcı başına favori bitset cache'i (öneri kodu için)
+    FAVORITES_CACHE_TTL_SECONDS: int = 300
+    FAVORITES_CACHE_MAX_USERS: int = 10000
+
+    # AI etkileşim / kabul write-behind kuyruğu (app/services/ai_write_behind.py)
+    AI_WRITE_FLUSH_SECONDS: float = 1.0  # En geç bu aralıkta yazılır
+    AI_WRITE_BATCH_SIZE: int = 200  # Bu kadar kayıt birikince hemen yazılır
+    AI_WRITE_MAX_PENDING: int = 10000  # DB yazılamazken bellekte tutulacak en fazla kayıt
+    AI_WRITE_RETRY_SECONDS: float = 30.0  # FK hatası alan kabul (interaction başka worker'da bekliyor olabilir) bu süre tekrar denenir
+    AI_ID_BLOCK_SIZE: int = 100  # Hi-lo: id_blocks'tan bir seferde ayrılan id sayısı
+
+    # Error log sink (yakalanmayan hatalar → error_logs, app/core/error_sink.py)
+    ERROR_LOG_ENABLED: bool = True
+    ERROR_LOG_QUEUE_SIZE: int = 1000
+    ERROR_LOG_RATE_PER_MINUTE: int = 60
+    ERROR_LOG_DEDUP_SECONDS: int = 60  # Aynı endpoint + hata bu sürede bir kez yazılır
+    ERROR_LOG_FLUSH_SECONDS: float = 2.0
+    ERROR_LOG_BATCH_SIZE: int = 100
+
+    # Admin (virgülle ayrılmış user id listesi)
+    ADMIN_USER_IDS: str = ""
+
+    # Slow Query Log
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = False  # Yavaş SELECT'ler için plan yakala
+
     @property
     def is_production(self) -> bool:
         return self.ENV == "production"
@@ -40,6 +95,10 @@ class Settings(BaseSettings):
     def allowed_origins(self) -> list:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def admin_user_ids(self) -> set:
+        return {int(uid) for uid in self.ADMIN_USER_IDS.split(",") if uid.strip()}
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,207 @@
+"""
+Error Log Sink
+Yakalanmayan hatalar (global_exception_handler) error_logs tablosuna
+isteği bekletmeden yazılır:
+
+  - record() sadece bellekte çalışır (kilit + deque), DB'ye dokunmaz
+  - aynı (route şablonu, parmak izi) ERROR_LOG_DEDUP_SECONDS içinde bir kez
+    kaydedilir; pencere bitince bastırılan tekrar sayısı "(+N tekrar)"
+    notlu tek özet kayıt olarak yazılır
+  - token bucket ile dakikada en fazla ERROR_LOG_RATE_PER_MINUTE kayıt
+  - kuyruk ERROR_LOG_QUEUE_SIZE ile sınırlı, doluysa yeni kayıt atılır
+  - arka plan thread'i ERROR_LOG_FLUSH_SECONDS'ta bir tek bağlantı ile
+    executemany INSERT yapar; hata fırtınası havuzdan tek bağlantı kullanır
+
+Parmak izi: hata tipi + sayıları / tırnaklı değerleri ? yapılmış mesaj.
+"""
+
+from collections import OrderedDict, deque
+from typing import List, Optional
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.models import ErrorLog
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+RATE_LIMITED = "rate_limited"
+DROPPED = "dropped"
+
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_NUMBER = re.compile(r"\b0x[0-9a-fA-F]+\b|\d+")
+
+
+def fingerprint(error_type: str, message: str) -> str:
+    normalized = _NUMBER.sub("?", _QUOTED.sub("?", message))
+    return hashlib.sha1(f"{error_type}:{normalized}".encode("utf-8")).hexdigest()[:16]
+
+
+class ErrorLogSink:
+    """Thread-safe, sınırlı, tekilleştiren ve hız sınırlı error_logs yazıcısı"""
+
+    def __init__(self, engine: Engine, queue_size: int, rate_per_minute: int, dedup_seconds: int, flush_seconds: float, batch_size: int):
+        self.engine = engine
+        self.queue_size = queue_size
+        self.rate_per_minute = rate_per_minute
+        self.dedup_seconds = dedup_seconds
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._queue: deque = deque()
+        # (route, parmak izi) → [pencere sonu, bastırılan tekrar, kayıt]; TTL sabit, baştan süpürülür
+        self._seen: "OrderedDict[tuple, list]" = OrderedDict()
+        self._tokens = float(rate_per_minute)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._counts = {QUEUED: 0, DUPLICATE: 0, RATE_LIMITED: 0, DROPPED: 0, "written": 0, "failed_flushes": 0}
+
+    def _sweep(self, now: float):
+        while self._seen:
+            key, entry = next(iter(self._seen.items()))
+            if entry[0] > now:
+                break
+            del self._seen[key]
+            if entry[1]:
+                if len(self._queue) < self.queue_size:
+                    row = entry[2]
+                    self._queue.append({**row, "error_message": f"{row['error_message'][:960]} (+{entry[1]} tekrar)"})
+                else:
+                    self._counts[DROPPED] += 1
+
+    def _take_token(self, now: float) -> bool:
+        self._tokens = min(
+            float(self.rate_per_minute),
+            self._tokens + (now - self._refilled_at) * self.rate_per_minute / 60
+        )
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def record(self, endpoint: str, user_id: Optional[int], exc: BaseException, route: Optional[str] = None) -> str:
+        """
+        Hatayı kuyruğa al (DB'ye dokunmaz). route: tekilleştirme için path
+        şablonu ("GET /logs/{log_id}"), yoksa endpoint kullanılır.
+        Returns: QUEUED | DUPLICATE | RATE_LIMITED | DROPPED
+        """
+        error_type = type(exc).__name__
+        message = str(exc)
+        key = (route or endpoint, fingerprint(error_type, message))
+        now = time.monotonic()
+
+        with self._lock:
+            self._sweep(now)
+            entry = self._seen.get(key)
+            if entry is not None:
+                entry[1] += 1
+                status = DUPLICATE
+            elif not self._take_token(now):
+                status = RATE_LIMITED
+            elif len(self._queue) >= self.queue_size:
+                status = DROPPED
+            else:
+                row = {
+                    "user_id": user_id,
+                    "endpoint": endpoint[:255],
+                    "error_message": f"{error_type}: {message}"[:1000]
+                }
+                self._seen[key] = [now + self.dedup_seconds, 0, row]
+                self._queue.append(row)
+                status = QUEUED
+            self._counts[status] += 1
+            pending = len(self._queue)
+
+        if status == QUEUED:
+            self._ensure_thread()
+            if pending >= self.batch_size:
+                self._wakeup.set()
+        return status
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._closed:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="error-log-sink", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Error log flush failed: {e}")
+
+    def flush(self) -> int:
+        """Kuyruktakileri batch'ler halinde yaz. Returns: yazılan kayıt sayısı"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    self._sweep(time.monotonic())
+                    rows: List[dict] = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                if not rows:
+                    return written
+                try:
+                    with self.engine.begin() as conn:
+                        conn.execute(insert(ErrorLog), rows)
+                except Exception:
+                    with self._lock:
+                        # Yer varsa sonraki tura bırak, yoksa at
+                        room = max(self.queue_size - len(self._queue), 0)
+                        self._queue.extendleft(reversed(rows[:room]))
+                        self._counts[DROPPED] += len(rows) - min(room, len(rows))
+                        self._counts["failed_flushes"] += 1
+                    raise
+                written += len(rows)
+                with self._lock:
+                    self._counts["written"] += len(rows)
+
+    def close(self, timeout: float = 5.0):
+        """Graceful shutdown: thread'i durdur ve kuyruğu boşalt"""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._lock:
+            # Açık pencerelerin bastırılan tekrarları da özet olarak yazılsın
+            self._sweep(float("inf"))
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "pending": len(self._queue),
+                "tracked_fingerprints": len(self._seen),
+                "queue_size": self.queue_size,
+                "rate_per_minute": self.rate_per_minute,
+                "dedup_seconds": self.dedup_seconds
+            }
+
+
+error_log_sink = ErrorLogSink(
+    engine,
+    settings.ERROR_LOG_QUEUE_SIZE,
+    settings.ERROR_LOG_RATE_PER_MINUTE,
+    settings.ERROR_LOG_DEDUP_SECONDS,
+    settings.ERROR_LOG_FLUSH_SECONDS,
+    settings.ERROR_LOG_BATCH_SIZE
+)
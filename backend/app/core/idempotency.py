@@ -0,0 +1,181 @@
+"""
+Idempotency-Key Store
+Yazma endpoint'lerinde (POST /logs, /favorites, /ai/accept) tekrar denenen
+isteklerin yazımı tekrarlamadan ilk cevabı almasını sağlar.
+
+Anahtar (user_id, endpoint, Idempotency-Key) → (istek parmak izi, cevap)
+idempotency_keys tablosunda tutulur; tekrar hangi worker'a / process'e
+düşerse düşsün aynı kaydı görür:
+
+  - anahtar satırı yazımla aynı session transaction'ında eklenir; yazım
+    commit edilmeden anahtar, anahtar olmadan yazım kalıcı olmaz
+  - eşzamanlı aynı anahtar PK çakışmasına düşer (ilk transaction bitene
+    kadar bekler), sonra saklanan cevabı veya 409 alır
+  - cevap commit'ten hemen sonra aynı satıra yazılır; process bu arada
+    ölürse tekrarlar TTL dolana kadar 409 alır (yazım tekrarlanmaz)
+
+Süresi dolan satırlar saatte en fazla bir kez toplu silinir.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import IdempotencyKey
+
+HIT = "hit"
+NEW = "new"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+# Süresi dolan satırların silinme aralığı (process başına)
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def _matches(key: tuple):
+    user_id, endpoint, idempotency_key = key
+    return and_(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.endpoint == endpoint,
+        IdempotencyKey.idempotency_key == idempotency_key
+    )
+
+
+class IdempotencyStore:
+    """idempotency_keys tablosu üzerinde TTL'li cevap deposu (sayaçlar process başına)"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._pruned_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "in_progress": 0, "mismatches": 0, "expired": 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counts[name] += n
+
+    def _prune(self, db: Session):
+        now = time.monotonic()
+        with self._lock:
+            if self._pruned_at is not None and now - self._pruned_at < PRUNE_INTERVAL_SECONDS:
+                return
+            self._pruned_at = now
+        result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now()))
+        db.commit()
+        self._count("expired", max(result.rowcount, 0))
+
+    def _existing(self, db: Session, key: tuple, fingerprint: str) -> Tuple[str, Any]:
+        row = db.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.response).where(_matches(key))
+        ).first()
+        if row is None:
+            return NEW, None
+        if row.fingerprint != fingerprint:
+            self._count("mismatches")
+            return MISMATCH, None
+        if row.response is None:
+            self._count("in_progress")
+            return IN_PROGRESS, None
+        self._count("hits")
+        return HIT, json.loads(row.response)
+
+    def begin(self, db: Session, key: tuple, fingerprint: str) -> Tuple[str, Any]:
+        """
+        Anahtarı db'nin açık transaction'ına ekle (commit etmez).
+        Returns: (HIT, cevap) | (NEW, None) | (IN_PROGRESS, None) | (MISMATCH, None)
+        """
+        self._prune(db)
+        now = datetime.now()
+        # Süresi dolmuş eski kayıt yeni isteği engellemesin
+        db.execute(delete(IdempotencyKey).where(_matches(key), IdempotencyKey.expires_at <= now))
+
+        status, response = self._existing(db, key, fingerprint)
+        if status != NEW:
+            db.rollback()
+            return status, response
+
+        user_id, endpoint, idempotency_key = key
+        try:
+            db.execute(insert(IdempotencyKey).values(
+                user_id=user_id,
+                endpoint=endpoint,
+                idempotency_key=idempotency_key,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=self.ttl_seconds)
+            ))
+        except IntegrityError:
+            # Aynı anahtarla eşzamanlı istek önce commit etti
+            db.rollback()
+            status, response = self._existing(db, key, fingerprint)
+            db.rollback()
+            return (IN_PROGRESS, None) if status == NEW else (status, response)
+
+        self._count("misses")
+        return NEW, None
+
+    def complete(self, db: Session, key: tuple, response: Any):
+        """Cevabı sakla; yazımla birlikte commit edilmemiş anahtar da burada commit edilir"""
+        db.execute(
+            update(IdempotencyKey).where(_matches(key)).values(response=json.dumps(response, default=str))
+        )
+        db.commit()
+
+    def release(self, db: Session, key: tuple):
+        """Yazım başarısız: anahtar tekrar denenebilsin"""
+        db.rollback()
+        # Handler commit ettikten sonra hata verdiyse anahtar kalıcı olmuş olabilir
+        db.execute(delete(IdempotencyKey).where(_matches(key), IdempotencyKey.response.is_(None)))
+        db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counts, "ttl_seconds": self.ttl_seconds}
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+def run_idempotent(
+    db: Session,
+    user_id: int,
+    endpoint: str,
+    idempotency_key: Optional[str],
+    params: dict,
+    handler: Callable[[], Any]
+) -> Any:
+    """
+    Idempotency-Key yoksa handler'ı çalıştırır. Varsa anahtar satırı db'nin
+    transaction'ına eklenir; handler aynı session'da commit ederse yazım ve
+    anahtar birlikte kalıcı olur. Aynı anahtarla gelen tekrar, yazımı
+    tekrarlamadan saklanan cevabı alır. handler hata fırlatırsa cevap
+    saklanmaz.
+    """
+    if not idempotency_key:
+        return handler()
+
+    key = (user_id, endpoint, idempotency_key)
+    fingerprint = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    status, response = idempotency_store.begin(db, key, fingerprint)
+    if status == HIT:
+        return response
+    if status == MISMATCH:
+        raise HTTPException(status_code=422, detail="Idempotency-Key farklı bir istek için kullanılmış")
+    if status == IN_PROGRESS:
+        raise HTTPException(status_code=409, detail="Aynı Idempotency-Key ile istek hâlâ işleniyor")
+
+    try:
+        response = handler()
+    except BaseException:
+        idempotency_store.release(db, key)
+        raise
+    idempotency_store.complete(db, key, response)
+    return response
@@ -0,0 +1,38 @@
+"""
+Request Context
+İstek bazlı bağlam (endpoint, user_id) - DB katmanı ve loglama için.
+
+Middleware isteğin başında bağlamı açar, get_current_user_id kullanıcıyı bağlar.
+Sync endpoint'ler threadpool'da çalıştığı için bağlam mutable bir dict olarak
+tutulur; context kopyalansa da aynı dict paylaşılır.
+"""
+
+from contextvars import ContextVar, Token
+from typing import Optional
+
+_request_ctx: ContextVar[Optional[dict]] = ContextVar("request_ctx", default=None)
+
+
+def begin_request(endpoint: str) -> Token:
+    """Yeni istek bağlamı aç (middleware'den çağrılır)"""
+    return _request_ctx.set({"endpoint": endpoint, "user_id": None})
+
+
+def end_request(token: Token) -> None:
+    """İstek bağlamını kapat"""
+    _request_ctx.reset(token)
+
+
+def bind_user(user_id: int) -> None:
+    """Doğrulanmış kullanıcıyı mevcut isteğe bağla"""
+    ctx = _request_ctx.get()
+    if ctx is not None:
+        ctx["user_id"] = user_id
+
+
+def get_request_context() -> dict:
+    """Mevcut istek bağlamı (istek dışında boş değerler döner)"""
+    ctx = _request_ctx.get()
+    if ctx is None:
+        return {"endpoint": None, "user_id": None}
+    return ctx
@@ -3,6 +3,7 @@ import bcrypt
 from datetime import datetime, timedelta
 from jose import jwt
 from app.core.config import settings
+from app.core.request_context import bind_user
 
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -18,13 +19,28 @@ def create_access_token(subject: str) -> str:
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from app.core.token_cache import token_cache
 
 security = HTTPBearer()
 
 def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        return int(payload.get("sub"))
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Geçersiz token")
+    token = credentials.credentials
+    # Aynı token daha önce doğrulandıysa (ve exp geçmediyse) tekrar decode edilmez
+    cache_key = token_cache.key(token)
+    user_id = token_cache.get(cache_key)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+            user_id = int(payload.get("sub"))
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Geçersiz token")
+        if payload.get("exp") is not None:
+            token_cache.put(cache_key, user_id, float(payload["exp"]))
+    bind_user(user_id)
+    return user_id
+
+def get_admin_user_id(user_id: int = Depends(get_current_user_id)) -> int:
+    """Sadece ADMIN_USER_IDS içindeki kullanıcılara izin ver"""
+    if user_id not in settings.admin_user_ids:
+        raise HTTPException(status_code=403, detail="Yetkisiz erişim")
+    return user_id
@@ -0,0 +1,70 @@
+"""
+Decoded-JWT Cache
+Dashboard aynı token ile art arda 6-10 istek atar; her birinde base64 +
+JSON çözme ve HMAC doğrulaması tekrarlanmasın diye doğrulanmış token'lar
+bellekte tutulur.
+
+Anahtar token'ın SHA-256 özeti (ham token saklanmaz), değer (user_id, exp).
+Kayıt token'ın exp anında geçersizleşir; en fazla max_entries token'lık LRU.
+Geçersiz token'lar cache'lenmez.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import threading
+import time
+
+from app.core.config import settings
+
+
+class TokenCache:
+    """Thread-safe, exp'e uyan, sınırlı LRU"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # sha256(token) → (user_id, exp epoch saniye)
+        self._entries: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return entry[0]
+
+    def put(self, key: bytes, user_id: int, exp: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (user_id, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evicted"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counts, "cached": len(self._entries), "capacity": self.max_entries}
+
+
+token_cache = TokenCache(settings.JWT_CACHE_MAX_TOKENS)
@@ -0,0 +1,42 @@
+"""
+Hi-lo ID Allocator
+
+Write-behind yazımlarda satır id'si INSERT'ten önce gerekir. id_blocks
+tablosundan tek atomik UPDATE ile block_size'lık aralık ayrılır (satır
+kilidi sayesinde worker'lar çakışmaz), aralık bitene kadar id'ler
+bellekten verilir. Süreç kapanınca kullanılmayan id'ler boşluk bırakır.
+"""
+
+from typing import Dict, List
+import threading
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Engine
+
+from app.db.models import IdBlock
+
+
+class IdBlockAllocator:
+    def __init__(self, engine: Engine, block_size: int):
+        self.engine = engine
+        self.block_size = block_size
+        # name → [sıradaki id, aralık sonu (hariç)]
+        self._blocks: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, name: str) -> int:
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(IdBlock).where(IdBlock.name == name).values(next_id=IdBlock.next_id + self.block_size)
+            )
+            end = conn.execute(select(IdBlock.next_id).where(IdBlock.name == name)).scalar_one()
+        return end - self.block_size
+
+    def next_id(self, name: str) -> int:
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None or block[0] >= block[1]:
+                start = self._reserve(name)
+                block = self._blocks[name] = [start, start + self.block_size]
+            block[0] += 1
+            return block[0] - 1
@@ -23,6 +23,7 @@ class Meal(Base):
     cuisine: Mapped[str] = mapped_column(String(100))
     meal_type: Mapped[str] = mapped_column(String(50))
     diet_type: Mapped[str] = mapped_column(String(50))
+    cooking_method: Mapped[str] = mapped_column(String(50), nullable=True)
 
     calories: Mapped[float] = mapped_column(Float)
     protein_g: Mapped[float] = mapped_column(Float)
@@ -40,12 +41,19 @@ class Meal(Base):
     rating: Mapped[float] = mapped_column(Float)
     is_healthy: Mapped[bool] = mapped_column(Boolean)
 
+    # Catalog sync - içerik değişti mi? (hex, meal_import.content_hashes)
+    content_hash: Mapped[str] = mapped_column(String(16), nullable=True)
 
-from sqlalchemy import ForeignKey, Date
+
+from sqlalchemy import ForeignKey, Date, Index, UniqueConstraint
 from datetime import date
 
 class MealLog(Base):
     __tablename__ = "meal_logs"
+    __table_args__ = (
+        # Tarih aralığı geçmişi / günlük toplamlar / streak
+        Index("ix_meal_logs_user_date", "user_id", "log_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -57,6 +65,9 @@ class MealLog(Base):
 
 class FavoriteMeal(Base):
     __tablename__ = "favorite_meals"
+    __table_args__ = (
+        UniqueConstraint("user_id", "meal_id", name="uq_favorite_meals_user_meal"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -86,6 +97,15 @@ class AIAcceptance(Base):
     accepted_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
 
+# AI sayaçları - /ai/stats tek PK okuması (ai_history servisi artırır)
+class UserAIStats(Base):
+    __tablename__ = "user_ai_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    interaction_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    acceptance_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class UserGoals(Base):
     __tablename__ = "user_goals"
 
@@ -142,3 +162,80 @@ class ErrorLog(Base):
     endpoint: Mapped[str] = mapped_column(String(255), nullable=False)
     error_message: Mapped[str] = mapped_column(String(1000), nullable=False)
     created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+
+
+# Catalog sync - katalog değiştikçe artan tek satırlık sayaç
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), nullable=True)
+
+
+# Artımlı kural madenciliği - meal_logs ekleme/silme günlüğü
+class MealLogEvent(Base):
+    __tablename__ = "meal_log_events"
+    __table_args__ = (
+        Index("ix_meal_log_events_batch", "batch"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    log_date: Mapped[date] = mapped_column(Date, nullable=False)
+    meal_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)  # +1 eklendi, -1 silindi
+    # Olayı ilk işleyen madencilik turu; NULL = henüz işlenmedi (app/mining/co_consumption.claim_events)
+    batch: Mapped[int] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+
+
+# Haftalık plan batch job'u (scripts/generate_weekly_plans.py) - öğün başına bir satır
+class WeeklyMealPlan(Base):
+    __tablename__ = "weekly_meal_plans"
+    __table_args__ = (
+        Index("ix_weekly_meal_plans_user_week", "user_id", "week_start"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)  # Pazartesi
+    plan_date: Mapped[date] = mapped_column(Date, nullable=False)
+    meal_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    meal_id: Mapped[int] = mapped_column(ForeignKey("meals.meal_id"), nullable=False)
+    portion: Mapped[float] = mapped_column(Float, default=1.0, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+
+
+# Streak leaderboard arkadaş kapsamı - istek: (gönderen, alıcı, accepted=False);
+# alıcı kabul edince iki yönlü, accepted=True satırlar
+class Friendship(Base):
+    __tablename__ = "friendships"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    friend_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    accepted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+
+
+# Hi-lo ID ayırıcı - tablo başına bir sonraki ayrılmamış id (app/db/id_blocks.py)
+class IdBlock(Base):
+    __tablename__ = "id_blocks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    next_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+# Idempotency-Key cevapları (app/core/idempotency.py) - yazımla aynı transaction'da eklenir
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    endpoint: Mapped[str] = mapped_column(String(64), primary_key=True)
+    idempotency_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=True)  # JSON; NULL = işleniyor
+    expires_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
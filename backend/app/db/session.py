@@ -1,8 +1,21 @@
 # Database Session - Azure SQL Ready
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from urllib.parse import quote_plus
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+import logging
+import re
+import threading
+import time
+
 from app.core.config import settings
+from app.core.request_context import get_request_context
+
+logger = logging.getLogger(__name__)
+
 
 def build_conn_str() -> str:
     """Build Azure SQL connection string via ODBC"""
@@ -23,7 +36,8 @@ engine = create_engine(
     pool_pre_ping=True,
     pool_recycle=300,  # Recycle connections every 5 minutes for Azure
     pool_size=5,
-    max_overflow=10
+    max_overflow=10,
+    fast_executemany=True  # pyodbc: executemany tek round trip'te parametre dizisi gönderir
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -42,3 +56,142 @@ def test_db_connection() -> bool:
         conn.execute(text("SELECT 1"))
     return True
 
+
+# ===== SLOW QUERY LOG =====
+
+_STRING_LITERAL = re.compile(r"N?'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w@#])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Literal'leri ? ile değiştir, IN listelerini ve boşlukları daralt"""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def describe_params(parameters, executemany: bool = False) -> str:
+    """Parametre değerlerini değil, tiplerini döndür (PII loglanmaz)"""
+    if executemany:
+        rows = list(parameters or [])
+        first = describe_params(rows[0]) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if not parameters:
+        return "()"
+    if isinstance(parameters, dict):
+        items = ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items())
+        return "{" + items + "}"
+    return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+
+
+class SlowQueryLog:
+    """Eşik üstü sorguları tutan thread-safe, sınırlı halka tampon"""
+
+    def __init__(self, max_entries: int):
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def record(self, entry: dict) -> None:
+        with self._lock:
+            self._total += 1
+            self._entries.append(entry)
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """En yeniden eskiye kayıtlar"""
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit] if limit else items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "total_recorded": self._total,
+                "buffered": len(self._entries),
+                "capacity": self._entries.maxlen,
+                "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+                "explain_enabled": settings.SLOW_QUERY_EXPLAIN
+            }
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+# Plan yakalama için havuzsuz ayrı engine: isteğin havuzundan bağlantı almaz,
+# bağlantı durumu (SHOWPLAN_TEXT) kapanınca bağlantıyla birlikte yok olur.
+# Event'ler bu engine'e bağlı olmadığından plan sorguları loglanmaz.
+_plan_engine = create_engine(build_conn_str(), poolclass=NullPool)
+
+
+def _capture_plan(statement: str, parameters) -> Optional[str]:
+    """Dialect'e uygun EXPLAIN / SHOWPLAN çıktısını ayrı, havuzsuz bağlantıda al"""
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+
+    dialect = engine.dialect.name
+    try:
+        if dialect == "mssql":
+            # SHOWPLAN_TEXT sorguyu çalıştırmaz; plan ayrı result set'lerde döner.
+            # Bağlantı havuza dönmez, close() ile kapanır (SHOWPLAN açık kalamaz)
+            raw = _plan_engine.raw_connection()
+            try:
+                cursor = raw.cursor()
+                cursor.execute("SET SHOWPLAN_TEXT ON")
+                cursor.execute(statement, parameters or ())
+                rows = []
+                while True:
+                    if cursor.description:
+                        rows.extend(cursor.fetchall())
+                    if not cursor.nextset():
+                        break
+            finally:
+                raw.close()
+        else:
+            prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+            with _plan_engine.connect() as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        return "\n".join(" | ".join(str(col) for col in row) for row in rows)
+    except Exception as e:
+        logger.debug(f"Slow query plan capture failed: {e}")
+        return None
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration_ms = (time.perf_counter() - start_times.pop()) * 1000
+
+    if not settings.SLOW_QUERY_LOG_ENABLED or duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    request_ctx = get_request_context()
+    normalized = normalize_sql(statement)
+    plan = None
+    if settings.SLOW_QUERY_EXPLAIN and not executemany:
+        plan = _capture_plan(statement, parameters)
+
+    slow_query_log.record({
+        "timestamp": datetime.now().isoformat(),
+        "duration_ms": round(duration_ms, 1),
+        "sql": normalized,
+        "params": describe_params(parameters, executemany),
+        "endpoint": request_ctx["endpoint"],
+        "user_id": request_ctx["user_id"],
+        "plan": plan
+    })
+    logger.warning(
+        f"Slow query ({duration_ms:.0f}ms) at {request_ctx['endpoint']}: {normalized[:200]}"
+    )
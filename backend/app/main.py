@@ -17,7 +17,17 @@ from app.routers.analysis import router as analysis_router
 from app.routers.profile import router as profile_router
 from app.routers.progress import router as progress_router
 from app.routers.engagement import router as engagement_router
+from app.routers.dashboard import router as dashboard_router
+from app.routers.admin import router as admin_router
+from app.routers.rules import router as rules_router
+from app.routers.recommendations import router as recommendations_router
+from app.routers.planner import router as planner_router
+from app.routers.leaderboard import router as leaderboard_router
 from app.core.config import settings
+from app.core.request_context import begin_request, end_request, get_request_context
+from app.core.error_sink import error_log_sink
+from app.services.leaderboard import streak_leaderboard
+from app.services.ai_write_behind import ai_write_behind
 
 # Logging setup
 logging.basicConfig(
@@ -45,8 +55,14 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     start_time = time.time()
+    ctx_token = begin_request(f"{request.method} {request.url.path}")
+    # Exception handler bağlam kapandıktan sonra çalışır; user_id için aynı dict
+    request.state.request_ctx = get_request_context()
     
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    finally:
+        end_request(ctx_token)
     
     process_time = time.time() - start_time
     
@@ -69,6 +85,16 @@ async def global_exception_handler(request: Request, exc: Exception):
     endpoint = f"{request.method} {request.url.path}"
     
     logger.error(f"Unhandled exception at {endpoint}: {error_message}")
+    if settings.ERROR_LOG_ENABLED:
+        # Sadece bellek kuyruğu - DB yazımı arka planda, batch halinde
+        request_ctx = getattr(request.state, "request_ctx", None) or {}
+        route = request.scope.get("route")
+        error_log_sink.record(
+            endpoint,
+            request_ctx.get("user_id"),
+            exc,
+            route=f"{request.method} {route.path}" if route is not None else None
+        )
     
     # Hata detayını döndür (debug için)
     return JSONResponse(
@@ -95,6 +121,35 @@ app.include_router(analysis_router)
 app.include_router(profile_router)
 app.include_router(progress_router)
 app.include_router(engagement_router)
+app.include_router(dashboard_router)
+app.include_router(admin_router)
+app.include_router(rules_router)
+app.include_router(recommendations_router)
+app.include_router(planner_router)
+app.include_router(leaderboard_router)
+
+
+@app.on_event("startup")
+def build_leaderboard():
+    """Streak leaderboard indeksini tablodan kur (DB yoksa ilk istekte kurulur)"""
+    try:
+        with SessionLocal() as db:
+            streak_leaderboard.rebuild(db)
+    except Exception as e:
+        logger.warning(f"Streak leaderboard not built at startup: {e}")
+
+
+@app.on_event("shutdown")
+def flush_background_writes():
+    """Write-behind AI kayıtlarını ve error log kuyruğunu kapanmadan yaz"""
+    try:
+        ai_write_behind.close()
+    except Exception as e:
+        logger.error(f"AI write-behind queue not flushed at shutdown: {e}")
+    try:
+        error_log_sink.close()
+    except Exception as e:
+        logger.error(f"Error log queue not flushed at shutdown: {e}")
 
 
 @app.get("/")
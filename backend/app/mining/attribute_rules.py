@@ -0,0 +1,86 @@
+"""
+Meal Attribute Rules
+
+Notebook'taki apriori analizinin backend karşılığı: meals tablosundan
+attribute transaction'ları kurulur, bitset Eclat ile sık itemset'ler,
+ardından lift filtreli kurallar çıkarılır ve rule store'a yazılır.
+"""
+
+from typing import Optional
+import time
+
+from sqlalchemy.engine import Engine
+
+from app.mining.itemsets import mine_frequent_itemsets, generate_rules
+from app.mining.rule_store import save_rules
+from app.mining.transactions import load_meal_frame, build_attribute_transactions, tercile_edges
+from app.services.catalog import read_catalog_version
+
+RULE_SET_NAME = "meal_attributes"
+
+# Notebook: apriori(min_support=0.05), association_rules(metric="lift", min_threshold=1.0)
+DEFAULT_MIN_SUPPORT = 0.05
+DEFAULT_MIN_CONFIDENCE = 0.0
+DEFAULT_MIN_LIFT = 1.0
+
+
+def mine_attribute_rules(
+    engine: Engine,
+    min_support: float = DEFAULT_MIN_SUPPORT,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    min_lift: float = DEFAULT_MIN_LIFT,
+    max_len: Optional[int] = None,
+    save: bool = True
+) -> dict:
+    """
+    Katalog üzerinde kural madenciliği.
+
+    Returns: {version, n_transactions, n_items, n_itemsets, n_rules, seconds: {...}}
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    with engine.connect() as conn:
+        catalog_version = read_catalog_version(conn)
+    df = load_meal_frame(engine)
+    timings["load"] = time.perf_counter() - start
+
+    step = time.perf_counter()
+    matrix, items = build_attribute_transactions(df)
+    timings["transactions"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    itemsets = mine_frequent_itemsets(matrix, min_support, max_len=max_len)
+    timings["itemsets"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    n_transactions = matrix.shape[0]
+    rules = generate_rules(itemsets, n_transactions, min_confidence=min_confidence, min_lift=min_lift)
+    timings["rules"] = time.perf_counter() - step
+
+    version = None
+    if save:
+        step = time.perf_counter()
+        version = save_rules(RULE_SET_NAME, items, rules, {
+            "source": "meals",
+            "catalog_version": catalog_version,
+            "n_transactions": n_transactions,
+            "min_support": min_support,
+            "min_confidence": min_confidence,
+            "min_lift": min_lift,
+            "max_len": max_len,
+            "n_itemsets": len(itemsets),
+            "tercile_edges": tercile_edges(df)
+        })
+        timings["save"] = time.perf_counter() - step
+
+    timings["total"] = time.perf_counter() - start
+    return {
+        "version": version,
+        "catalog_version": catalog_version,
+        "n_transactions": n_transactions,
+        "n_items": len(items),
+        "n_itemsets": len(itemsets),
+        "n_rules": len(rules),
+        "seconds": {k: round(v, 3) for k, v in timings.items()}
+    }
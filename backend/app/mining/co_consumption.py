@@ -0,0 +1,489 @@
+"""
+Co-consumption Rules (meal_logs)
+
+Her (user_id, log_date) bir transaction: aynı gün birlikte yenen yemekler
+(meal_id item'ları) veya bu yemeklerin attribute'ları (cuisine, kalori
+terciliyle...) üzerinde sık itemset / kural madenciliği.
+
+Partition tabanlı iki geçiş (SON algoritması):
+1. Loglar server-side cursor ile sıralı akıtılır ve transaction sınırında
+   bölünen partition'lara ayrılır. Her partition process pool'da yerel
+   eşikle madenlenir; yerel sık itemset'lerin birleşimi aday kümesidir.
+2. İkinci akışta adayların gerçek destekleri partition başına sayılıp
+   toplanır; global eşiği geçenlerden kurallar üretilir.
+
+Global sık her itemset en az bir partition'da yerel sıktır, sonuç tam
+madencilikle aynıdır. Bellek partition boyutu ve paralel iş sayısıyla sınırlı.
+
+Geçişler arasında loglar eklenip silinebilir; bu yüzden tüm geçişler tek
+bağlantıda, tek snapshot transaction'ında (MSSQL SNAPSHOT, PostgreSQL
+REPEATABLE READ) çalışır ve aynı veriyi görür. Aynı transaction snapshot'ta
+görünen işlenmemiş meal_log_events satırlarını yeni bir batch'e atar
+(claim_events); artımlı mod sonraki turda sadece bu batch'ten sonrasını
+uygular. Snapshot'tan sonra commit edilen olaylar NULL kalır, atlanmaz.
+"""
+
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.models import MealLog, MealLogEvent
+from app.mining.itemsets import (
+    Itemset, pack_pairs, min_support_count, mine_packed_itemsets, count_itemsets,
+    negative_border, generate_rules
+)
+from app.mining.itemset_state import ItemsetState, save_state
+from app.mining.rule_store import save_rules
+from app.mining.transactions import load_meal_frame, build_attribute_transactions, tercile_edges
+from app.services.catalog import read_catalog_version
+
+ITEMS_MEALS = "meals"
+ITEMS_ATTRIBUTES = "attributes"
+RULE_SET_NAMES = {
+    ITEMS_MEALS: "co_meals",
+    ITEMS_ATTRIBUTES: "co_attributes"
+}
+
+DEFAULT_MIN_SUPPORT = 0.005
+DEFAULT_MIN_LIFT = 1.0
+DEFAULT_PARTITION_SIZE = 200_000   # transaction
+DEFAULT_CHUNK_ROWS = 100_000       # cursor'dan tek seferde okunan log satırı
+
+# Uzun okuma işlerinde tutarlı görüntü için izolasyon seviyesi (diğer
+# dialect'lerde varsayılan). MSSQL'de ALLOW_SNAPSHOT_ISOLATION ON olmalı.
+SNAPSHOT_ISOLATION = {"mssql": "SNAPSHOT", "postgresql": "REPEATABLE READ"}
+
+# Son partition bundan küçükse bir öncekiyle birleştirilir (yerel eşik 1'e
+# yaklaşınca aday sayısı patlar)
+MIN_PARTITION_RATIO = 0.5
+
+
+class Partition:
+    """Bir grup transaction: yerel transaction index'leri + item id'leri (çiftler)"""
+
+    def __init__(self, tx: np.ndarray, items: np.ndarray, n_transactions: int):
+        self.tx = tx
+        self.items = items
+        self.n_transactions = n_transactions
+
+
+# ---------------------------------------------------------------------------
+# Item sözlüğü
+# ---------------------------------------------------------------------------
+
+class ItemVocabulary:
+    """
+    meal_id → item id eşlemesi. meals modunda her yemek bir item;
+    attributes modunda bir yemek birden çok attribute item'ına açılır (CSR).
+    """
+
+    def __init__(self, meal_ids: np.ndarray, names: List[str], indptr: np.ndarray, indices: np.ndarray):
+        order = np.argsort(meal_ids)
+        self.meal_ids = meal_ids[order]
+        self.names = names
+        # Sıralı meal_ids'e göre CSR
+        starts, ends = indptr[:-1][order], indptr[1:][order]
+        lengths = ends - starts
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.indices = np.concatenate(
+            [indices[s:e] for s, e in zip(starts, ends)] or [np.empty(0, dtype=np.int64)]
+        ).astype(np.int64)
+
+    @classmethod
+    def for_meals(cls, meal_ids: np.ndarray) -> "ItemVocabulary":
+        n = len(meal_ids)
+        return cls(
+            meal_ids, [f"meal_id={int(m)}" for m in meal_ids],
+            np.arange(n + 1, dtype=np.int64), np.arange(n, dtype=np.int64)
+        )
+
+    @classmethod
+    def for_attributes(cls, df: pd.DataFrame) -> "ItemVocabulary":
+        matrix, names = build_attribute_transactions(df)
+        rows, cols = np.nonzero(matrix)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(df)))]).astype(np.int64)
+        return cls(df["meal_id"].to_numpy(dtype=np.int64), names, indptr, cols.astype(np.int64))
+
+    def expand(self, tx: np.ndarray, meal_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(tx, meal_id) çiftleri → tekil (tx, item) çiftleri; katalogda olmayan yemek atlanır"""
+        if len(self.meal_ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        pos = np.searchsorted(self.meal_ids, meal_ids)
+        pos_clipped = np.minimum(pos, len(self.meal_ids) - 1)
+        known = (pos < len(self.meal_ids)) & (self.meal_ids[pos_clipped] == meal_ids)
+        tx, pos = tx[known], pos[known]
+
+        starts, lengths = self.indptr[pos], self.indptr[pos + 1] - self.indptr[pos]
+        out_tx = np.repeat(tx, lengths)
+        # Her çift için kendi CSR aralığındaki offset
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        out_items = self.indices[np.repeat(starts, lengths) + offsets]
+
+        # Aynı gün aynı yemek / aynı attribute tekrarları tek sayılır
+        keys = np.unique(out_tx * len(self.names) + out_items)
+        return keys // len(self.names), keys % len(self.names)
+
+
+# ---------------------------------------------------------------------------
+# Log akışı
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def snapshot_connection(engine: Engine) -> Iterator[Connection]:
+    """Tek transaction'lık bağlantı: içindeki tüm okumalar aynı anlık görüntüyü görür"""
+    with engine.connect() as conn:
+        level = SNAPSHOT_ISOLATION.get(engine.dialect.name)
+        if level:
+            conn.execution_options(isolation_level=level)
+        with conn.begin():
+            yield conn
+
+
+def _max_log_id(conn: Connection) -> int:
+    return int(conn.execute(select(func.max(MealLog.id))).scalar() or 0)
+
+
+def to_day_numbers(values: pd.Series) -> np.ndarray:
+    """log_date → gün numarası (epoch'tan gün, int64)"""
+    return pd.to_datetime(values).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def stream_log_chunks(conn: Connection, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    (user_id, log_date, meal_id) satırları sıralı ve parça parça. Geçişlerin
+    aynı veriyi görmesi için conn snapshot_connection'dan gelmeli (id sınırı
+    yetmez: aradaki silmeler sonraki geçişte görünmez).
+    """
+    stmt = select(MealLog.user_id, MealLog.log_date, MealLog.meal_id).order_by(MealLog.user_id, MealLog.log_date)
+
+    result = conn.execute(stmt, execution_options={"stream_results": True, "yield_per": chunk_rows})
+    for rows in result.partitions(chunk_rows):
+        df = pd.DataFrame(rows, columns=["user_id", "log_date", "meal_id"])
+        df["day"] = to_day_numbers(df["log_date"])
+        yield df[["user_id", "day", "meal_id"]]
+
+
+def iter_partitions(
+    conn: Connection,
+    vocabulary: ItemVocabulary,
+    partition_size: int = DEFAULT_PARTITION_SIZE,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[Partition]:
+    """Log akışını transaction sınırında bölünmüş partition'lara çevir"""
+    carry: Optional[pd.DataFrame] = None
+    buffered: List[pd.DataFrame] = []
+    buffered_tx = 0
+    pending: Optional[pd.DataFrame] = None
+
+    def to_partition(df: pd.DataFrame) -> Partition:
+        user = df["user_id"].to_numpy()
+        day = df["day"].to_numpy()
+        new_tx = np.ones(len(df), dtype=bool)
+        new_tx[1:] = (user[1:] != user[:-1]) | (day[1:] != day[:-1])
+        tx = np.cumsum(new_tx) - 1
+        tx_items, items = vocabulary.expand(tx, df["meal_id"].to_numpy(dtype=np.int64))
+        return Partition(tx_items, items, int(tx[-1]) + 1 if len(tx) else 0)
+
+    def count_tx(df: pd.DataFrame) -> int:
+        return int(((df["user_id"].diff() != 0) | (df["day"].diff() != 0)).sum())
+
+    for chunk in stream_log_chunks(conn, chunk_rows):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        # Son transaction sonraki parçada devam edebilir
+        last = (chunk["user_id"] == chunk["user_id"].iat[-1]) & (chunk["day"] == chunk["day"].iat[-1])
+        carry = chunk[last]
+        complete = chunk[~last]
+        if complete.empty:
+            continue
+
+        buffered.append(complete)
+        buffered_tx += count_tx(complete)
+        if buffered_tx >= partition_size:
+            if pending is not None:
+                yield to_partition(pending)
+            pending = pd.concat(buffered, ignore_index=True)
+            buffered, buffered_tx = [], 0
+
+    if carry is not None and not carry.empty:
+        buffered.append(carry)
+        buffered_tx += 1
+
+    if buffered:
+        rest = pd.concat(buffered, ignore_index=True)
+        if pending is not None and buffered_tx < partition_size * MIN_PARTITION_RATIO:
+            pending = pd.concat([pending, rest], ignore_index=True)
+        else:
+            if pending is not None:
+                yield to_partition(pending)
+            pending = rest
+    if pending is not None:
+        yield to_partition(pending)
+
+
+# ---------------------------------------------------------------------------
+# Worker fonksiyonları (process pool - modül seviyesinde olmalı)
+# ---------------------------------------------------------------------------
+
+def _compact_bits(partition: Partition, keep_items: np.ndarray) -> np.ndarray:
+    """Sadece keep_items (sıralı global id) için bitset; satır sırası keep_items ile aynı"""
+    pos = np.searchsorted(keep_items, partition.items)
+    pos_clipped = np.minimum(pos, max(len(keep_items) - 1, 0))
+    mask = (pos < len(keep_items)) & (keep_items[pos_clipped] == partition.items)
+    return pack_pairs(partition.tx[mask], pos[mask], partition.n_transactions, len(keep_items))
+
+
+def _frequent_pair_items(partition: Partition, min_count: int) -> np.ndarray:
+    """
+    Sık bir ikiliye katılan item'lar. Günlük transaction'lar kısa olduğu için
+    ikililer doğrudan sayılır; seyrek veride (meal_id) Eclat'ın her item'ı
+    kalan tüm item'larla AND'lemesi gereksiz iş olur.
+    """
+    tx, items = partition.tx, partition.items  # expand: (tx, item) sıralı ve tekil
+    n_items = int(items.max()) + 1 if len(items) else 0
+    pair_keys = []
+    offset = 1
+    while offset < len(tx):
+        same_tx = tx[offset:] == tx[:-offset]
+        if not same_tx.any():
+            break
+        pair_keys.append(items[:-offset][same_tx] * n_items + items[offset:][same_tx])
+        offset += 1
+    if not pair_keys:
+        return np.empty(0, dtype=np.int64)
+
+    keys, counts = np.unique(np.concatenate(pair_keys), return_counts=True)
+    frequent = keys[counts >= min_count]
+    return np.unique(np.concatenate([frequent // n_items, frequent % n_items]))
+
+
+def _mine_partition(partition: Partition, min_support: float, max_len: Optional[int]) -> Set[Itemset]:
+    """1. geçiş: yerel eşikle sık itemset'ler (global item id'leri)"""
+    min_count = min_support_count(min_support, partition.n_transactions)
+    counts = np.bincount(partition.items)
+    singles = np.flatnonzero(counts >= min_count)
+    result: Set[Itemset] = {(int(i),) for i in singles}
+    if max_len == 1:
+        return result
+
+    keep = np.intersect1d(singles, _frequent_pair_items(partition, min_count))
+    if len(keep) == 0:
+        return result
+
+    local = mine_packed_itemsets(_compact_bits(partition, keep), min_count, max_len)
+    result.update(tuple(int(keep[i]) for i in itemset) for itemset in local)
+    return result
+
+
+def count_in_partition(partition: Partition, candidates: List[Itemset]) -> np.ndarray:
+    """2. geçiş: adayların bu partition'daki destek sayıları"""
+    if not candidates or len(partition.items) == 0:
+        return np.zeros(len(candidates), dtype=np.int64)
+    candidate_items = np.unique(np.fromiter((i for c in candidates for i in c), dtype=np.int64))
+    bits = _compact_bits(partition, candidate_items)
+    local = [tuple(int(x) for x in np.searchsorted(candidate_items, c)) for c in candidates]
+    return count_itemsets(bits, local)
+
+
+# ---------------------------------------------------------------------------
+# Orkestrasyon
+# ---------------------------------------------------------------------------
+
+def _bounded_map(executor: ProcessPoolExecutor, fn, partitions: Iterator[Partition], window: int, *args):
+    """Partition'ları sırayla gönder; aynı anda en fazla `window` iş bellekte"""
+    inflight = []
+    for partition in partitions:
+        inflight.append(executor.submit(fn, partition, *args))
+        if len(inflight) >= window:
+            yield inflight.pop(0).result()
+    for future in inflight:
+        yield future.result()
+
+
+def build_vocabulary(meals: pd.DataFrame, items: str) -> ItemVocabulary:
+    if items == ITEMS_MEALS:
+        return ItemVocabulary.for_meals(meals["meal_id"].to_numpy(dtype=np.int64))
+    return ItemVocabulary.for_attributes(meals)
+
+
+def claim_events(conn: Connection) -> int:
+    """
+    Snapshot'ta görünen, henüz işlenmemiş (batch NULL) olayları yeni batch'e
+    ata. conn'un transaction'ında çalışır; kurallar/durum bu transaction
+    commit edildikten sonra yazılmalı.
+
+    Batch numaraları commit sırasıyla artar: eşzamanlı iki tur aynı NULL
+    satırları güncellemeye çalışırsa biri update conflict ile düşer.
+    Returns: işlenmiş sayılan en büyük batch (durumdaki applied_batch)
+    """
+    latest = int(conn.execute(select(func.max(MealLogEvent.batch))).scalar() or 0)
+    result = conn.execute(update(MealLogEvent).where(MealLogEvent.batch.is_(None)).values(batch=latest + 1))
+    return latest + 1 if result.rowcount else latest
+
+
+def count_candidates(
+    executor: ProcessPoolExecutor,
+    conn: Connection,
+    vocabulary: ItemVocabulary,
+    candidates: List[Itemset],
+    window: int,
+    partition_size: int = DEFAULT_PARTITION_SIZE,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> np.ndarray:
+    """Verilen itemset'lerin tüm loglardaki destek sayıları (tek akış geçişi)"""
+    totals = np.zeros(len(candidates), dtype=np.int64)
+    if candidates:
+        partitions = iter_partitions(conn, vocabulary, partition_size, chunk_rows)
+        for counts in _bounded_map(executor, count_in_partition, partitions, window, candidates):
+            totals += counts
+    return totals
+
+
+def save_co_consumption_rules(
+    items: str,
+    names: List[str],
+    meals: pd.DataFrame,
+    itemsets: Dict[Itemset, int],
+    n_transactions: int,
+    params: dict,
+    extra_metadata: dict
+) -> Tuple[int, int]:
+    """Kuralları üret ve rule store'a yaz. Returns: (versiyon, kural sayısı)"""
+    rules = generate_rules(
+        itemsets, n_transactions,
+        min_confidence=params["min_confidence"], min_lift=params["min_lift"]
+    )
+    version = save_rules(RULE_SET_NAMES[items], names, rules, {
+        "source": "meal_logs",
+        "items": items,
+        "n_transactions": n_transactions,
+        **params,
+        **extra_metadata,
+        "n_itemsets": len(itemsets),
+        "tercile_edges": tercile_edges(meals) if items == ITEMS_ATTRIBUTES else None
+    })
+    return version, len(rules)
+
+
+def mine_co_consumption_rules(
+    engine: Engine,
+    items: str = ITEMS_MEALS,
+    min_support: float = DEFAULT_MIN_SUPPORT,
+    min_confidence: float = 0.0,
+    min_lift: float = DEFAULT_MIN_LIFT,
+    max_len: Optional[int] = None,
+    partition_size: int = DEFAULT_PARTITION_SIZE,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: Optional[int] = None,
+    save: bool = True
+) -> dict:
+    """
+    meal_logs üzerinde co-consumption kural madenciliği (iki geçiş, process pool).
+    save=True ise artımlı mod için sık itemset + negatif sınır sayımları da
+    saklanır (negatif sınır için bir sayım geçişi daha).
+
+    Returns: {version, n_transactions, n_partitions, n_candidates, n_itemsets, n_rules, seconds}
+    """
+    if items not in RULE_SET_NAMES:
+        raise ValueError(f"Bilinmeyen item tipi: {items}")
+
+    timings = {}
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    window = workers * 2
+    params = {
+        "min_support": min_support, "min_confidence": min_confidence,
+        "min_lift": min_lift, "max_len": max_len
+    }
+
+    # Katalog, loglar ve tüm geçişler aynı anlık görüntüden
+    with snapshot_connection(engine) as conn:
+        catalog_version = read_catalog_version(conn)
+        meals = load_meal_frame(conn)
+        vocabulary = build_vocabulary(meals, items)
+        max_log_id = _max_log_id(conn)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # 1️⃣ Yerel sık itemset'ler → adaylar
+            step = time.perf_counter()
+            candidates: Set[Itemset] = set()
+            n_transactions = 0
+            n_partitions = 0
+
+            def counted(partitions):
+                nonlocal n_transactions, n_partitions
+                for partition in partitions:
+                    n_transactions += partition.n_transactions
+                    n_partitions += 1
+                    yield partition
+
+            partitions = counted(iter_partitions(conn, vocabulary, partition_size, chunk_rows))
+            for local in _bounded_map(executor, _mine_partition, partitions, window, min_support, max_len):
+                candidates |= local
+            timings["local_mining"] = time.perf_counter() - step
+
+            # 2️⃣ Adayların global sayımı
+            step = time.perf_counter()
+            candidate_list = sorted(candidates, key=lambda c: (len(c), c))
+            totals = count_candidates(
+                executor, conn, vocabulary, candidate_list, window, partition_size, chunk_rows
+            )
+            timings["counting"] = time.perf_counter() - step
+
+            min_count = min_support_count(min_support, n_transactions) if n_transactions else 1
+            counted_sets = dict(zip(candidate_list, totals.tolist()))
+            itemsets: Dict[Itemset, int] = {c: n for c, n in counted_sets.items() if n >= min_count}
+
+            # 3️⃣ Artımlı mod için negatif sınır sayımları
+            if save:
+                step = time.perf_counter()
+                border = negative_border(set(itemsets), len(vocabulary.names), max_len)
+                missing = sorted((b for b in border if b not in counted_sets), key=lambda c: (len(c), c))
+                border_totals = count_candidates(
+                    executor, conn, vocabulary, missing, window, partition_size, chunk_rows
+                )
+                counted_sets.update(zip(missing, border_totals.tolist()))
+                tracked = {b: counted_sets[b] for b in border}
+                tracked.update(itemsets)
+                timings["border"] = time.perf_counter() - step
+
+        # Sayılan loglara ait olaylar bu turda işlenmiş sayılır
+        if save:
+            applied_batch = claim_events(conn)
+
+    version = None
+    step = time.perf_counter()
+    if save:
+        extra = {"catalog_version": catalog_version, "max_log_id": max_log_id, "n_partitions": n_partitions}
+        version, n_rules = save_co_consumption_rules(
+            items, vocabulary.names, meals, itemsets, n_transactions, params, extra
+        )
+        save_state(RULE_SET_NAMES[items], ItemsetState(vocabulary.names, tracked, {
+            **params,
+            "items": items,
+            "catalog_version": catalog_version,
+            "n_transactions": n_transactions,
+            "applied_batch": applied_batch
+        }))
+    else:
+        n_rules = len(generate_rules(itemsets, n_transactions, min_confidence=min_confidence, min_lift=min_lift))
+    timings["rules"] = time.perf_counter() - step
+
+    timings["total"] = time.perf_counter() - start
+    return {
+        "version": version,
+        "items": items,
+        "n_transactions": n_transactions,
+        "n_partitions": n_partitions,
+        "n_candidates": len(candidate_list),
+        "n_itemsets": len(itemsets),
+        "n_rules": n_rules,
+        "seconds": {k: round(v, 3) for k, v in timings.items()}
+    }
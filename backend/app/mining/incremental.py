@@ -0,0 +1,283 @@
+"""
+Incremental Co-consumption Mining
+
+Her gece sıfırdan madencilik yerine sadece yeni meal_log_events işlenir
+(FUP2 / negatif sınır yaklaşımı):
+
+1. Değişen (user_id, log_date) transaction'larının eski ve yeni içerikleri
+   çıkarılır; eski içerik = güncel içerik - olaylar.
+2. Takip edilen itemset'lerin (sık + negatif sınır) sayımları delta
+   transaction'lar üzerinden güncellenir; sadece delta'daki item'ları
+   içeren itemset'lere dokunulur.
+3. Negatif sınırdan bir itemset sıklaşırsa sınır değişmiştir: yalnızca
+   yeni sınır adayları tüm loglarda sayılır (rescan). Aksi halde tam
+   tarama yapılmaz.
+
+Olaylar, güncel loglar ve rescan'ler tek snapshot transaction'ında okunur;
+aynı transaction görülen olayları yeni bir batch'e atar (claim_events).
+Durumda son işlenen batch (applied_batch) saklanır; commit sonrası durum
+yazılamazsa olaylar sonraki turda yeniden uygulanır.
+
+Durum yoksa, eski formattaysa veya katalog değiştiyse tam madencilik çalışır.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func, delete, or_
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.models import MealLog, MealLogEvent
+from app.mining.co_consumption import (
+    RULE_SET_NAMES, DEFAULT_MIN_SUPPORT, DEFAULT_MIN_LIFT, DEFAULT_PARTITION_SIZE, DEFAULT_CHUNK_ROWS,
+    Partition, build_vocabulary, count_candidates, count_in_partition, claim_events,
+    mine_co_consumption_rules, save_co_consumption_rules, snapshot_connection, to_day_numbers
+)
+from app.mining.itemsets import Itemset, min_support_count, negative_border
+from app.mining.itemset_state import ItemsetState, load_state, save_state
+from app.mining.transactions import load_meal_frame
+from app.services.catalog import read_catalog_version
+
+KEY_COLUMNS = ["user_id", "day", "meal_id"]
+# MSSQL parametre limiti (2100) altında kalsın
+USER_BATCH_SIZE = 1000
+
+
+def _event_deltas(conn: Connection, applied_batch: int) -> pd.DataFrame:
+    """applied_batch'ten sonraki (veya henüz işlenmemiş) olayların (user, gün, meal) bazında net etkisi"""
+    stmt = select(
+        MealLogEvent.user_id, MealLogEvent.log_date, MealLogEvent.meal_id,
+        func.sum(MealLogEvent.delta).label("delta")
+    ).where(
+        or_(MealLogEvent.batch.is_(None), MealLogEvent.batch > applied_batch)
+    ).group_by(MealLogEvent.user_id, MealLogEvent.log_date, MealLogEvent.meal_id)
+
+    df = pd.DataFrame(conn.execute(stmt).all(), columns=["user_id", "log_date", "meal_id", "delta"])
+    df = df.astype({"user_id": "int64", "meal_id": "int64", "delta": "int64"})
+    df["day"] = to_day_numbers(df["log_date"]) if len(df) else np.empty(0, dtype=np.int64)
+    return df[KEY_COLUMNS + ["delta"]]
+
+
+def _current_counts(conn: Connection, keys: pd.DataFrame) -> pd.DataFrame:
+    """Verilen (user, gün) transaction'larının güncel içeriği: (user, gün, meal) → satır sayısı"""
+    frames = []
+    users = keys["user_id"].unique()
+    for i in range(0, len(users), USER_BATCH_SIZE):
+        batch = keys[keys["user_id"].isin(users[i:i + USER_BATCH_SIZE])]
+        days = pd.to_datetime(batch["day"], unit="D")
+        stmt = select(
+            MealLog.user_id, MealLog.log_date, MealLog.meal_id, func.count(MealLog.id).label("n")
+        ).where(
+            MealLog.user_id.in_([int(u) for u in batch["user_id"].unique()]),
+            MealLog.log_date >= days.min().date(),
+            MealLog.log_date <= days.max().date()
+        ).group_by(MealLog.user_id, MealLog.log_date, MealLog.meal_id)
+        frames.append(pd.DataFrame(conn.execute(stmt).all(), columns=["user_id", "log_date", "meal_id", "n"]))
+
+    df = pd.concat(frames, ignore_index=True).astype({"user_id": "int64", "meal_id": "int64", "n": "int64"})
+    df["day"] = to_day_numbers(df["log_date"]) if len(df) else np.empty(0, dtype=np.int64)
+    # Aralık sorgusu fazlasını getirebilir; sadece dokunulan transaction'lar
+    return df[KEY_COLUMNS + ["n"]].merge(keys, on=["user_id", "day"], how="inner")
+
+
+def _delta_partition(vocabulary, rows: pd.DataFrame, keys: pd.DataFrame) -> Partition:
+    """(user, gün, meal) satırları → keys sırasına göre transaction index'li partition"""
+    tx = keys.reset_index(drop=True).reset_index().rename(columns={"index": "tx"})
+    rows = rows.merge(tx, on=["user_id", "day"], how="inner")
+    tx_items, items = vocabulary.expand(
+        rows["tx"].to_numpy(dtype=np.int64), rows["meal_id"].to_numpy(dtype=np.int64)
+    )
+    return Partition(tx_items, items, len(keys))
+
+
+def _full(engine: Engine, items: str, reason: str, params: dict, **kwargs) -> dict:
+    stats = mine_co_consumption_rules(engine, items=items, **params, **kwargs)
+    return {**stats, "mode": "full", "reason": reason}
+
+
+def _apply_events(
+    conn: Connection,
+    state: ItemsetState,
+    vocabulary,
+    events: pd.DataFrame,
+    params: dict,
+    partition_size: int,
+    chunk_rows: int,
+    workers: Optional[int],
+    stats: dict
+) -> Tuple[int, Dict[Itemset, int], Dict[Itemset, int], dict]:
+    """
+    Olayları durum sayımlarına uygula, sınır değiştiyse yeni adayları say.
+    conn snapshot transaction'ı olmalı: güncel içerik ve rescan'ler olaylarla
+    aynı anlık görüntüyü görür.
+    Returns: (n_transactions, takip edilenler, sık itemset'ler, süreler)
+    """
+    # Item id'leri durumdaki sırayla aynı olmalı
+    state_ids = {item: i for i, item in enumerate(state.items)}
+    remap = np.array([state_ids[item] for item in vocabulary.names], dtype=np.int64)
+
+    # 1️⃣ Delta transaction'lar: eski içerik = güncel içerik - olaylar
+    keys = events[["user_id", "day"]].drop_duplicates().reset_index(drop=True)
+    content = _current_counts(conn, keys).merge(events, on=KEY_COLUMNS, how="outer").fillna(0)
+    content["new"] = content["n"]
+    content["old"] = (content["new"] - content["delta"]).clip(lower=0)
+
+    new_rows = content[content["new"] > 0]
+    old_rows = content[content["old"] > 0]
+    new_part = _delta_partition(vocabulary, new_rows, keys)
+    old_part = _delta_partition(vocabulary, old_rows, keys)
+    new_part.items, old_part.items = remap[new_part.items], remap[old_part.items]
+
+    n_transactions = (
+        state.n_transactions
+        + new_rows[["user_id", "day"]].drop_duplicates().shape[0]
+        - old_rows[["user_id", "day"]].drop_duplicates().shape[0]
+    )
+    stats.update(events=int(len(events)), delta_transactions=int(len(keys)), n_transactions=int(n_transactions))
+
+    # 2️⃣ Takip edilen itemset sayımlarını delta ile güncelle
+    step = time.perf_counter()
+    counts: Dict[Itemset, int] = dict(state.counts)
+    delta_items = set(np.concatenate([new_part.items, old_part.items]).tolist())
+    relevant = [t for t in counts if all(i in delta_items for i in t)]
+    change = count_in_partition(new_part, relevant) - count_in_partition(old_part, relevant)
+    for itemset, diff in zip(relevant, change.tolist()):
+        if diff:
+            counts[itemset] += diff
+    stats["touched_itemsets"] = int(np.count_nonzero(change))
+    timings = {"delta": time.perf_counter() - step}
+
+    old_min_count = min_support_count(params["min_support"], state.n_transactions) if state.n_transactions else 1
+    old_frequent = {t for t, c in state.counts.items() if c >= old_min_count}
+
+    # 3️⃣ Sınır değiştiyse sadece yeni adaylar için tarama
+    step = time.perf_counter()
+    min_count = min_support_count(params["min_support"], n_transactions) if n_transactions else 1
+    workers = workers or os.cpu_count() or 1
+    executor: Optional[ProcessPoolExecutor] = None
+    try:
+        while True:
+            frequent: Set[Itemset] = {t for t, c in counts.items() if c >= min_count}
+            border = negative_border(frequent, len(state.items), params["max_len"])
+            unknown = sorted((b for b in border if b not in counts), key=lambda c: (len(c), c))
+            if not unknown:
+                break
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            # Sayımlar durum sırasındaki id'lerle; tarama sözlük sırasıyla yapılır
+            inverse = np.empty(len(remap), dtype=np.int64)
+            inverse[remap] = np.arange(len(remap))
+            local = [tuple(sorted(int(inverse[i]) for i in t)) for t in unknown]
+            totals = count_candidates(
+                executor, conn, vocabulary, local, workers * 2, partition_size, chunk_rows
+            )
+            counts.update(zip(unknown, totals.tolist()))
+            stats["rescans"] += 1
+            stats["rescan_candidates"] += len(unknown)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    timings["rescan"] = time.perf_counter() - step
+
+    # Sınır dışına düşen itemset'ler artık takip edilmez
+    tracked = {t: counts[t] for t in frequent | border}
+    itemsets = {t: counts[t] for t in frequent}
+    stats.update(
+        promoted=len(frequent - old_frequent),
+        demoted=len(old_frequent - frequent),
+        tracked_itemsets=len(tracked),
+        n_itemsets=len(itemsets)
+    )
+    return n_transactions, tracked, itemsets, timings
+
+
+def update_co_consumption_rules(
+    engine: Engine,
+    items: str,
+    partition_size: int = DEFAULT_PARTITION_SIZE,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: Optional[int] = None,
+    **default_params
+) -> dict:
+    """
+    Son çalışmadan beri gelen log olaylarını uygula, kuralları yeni versiyon
+    olarak yaz. default_params (min_support, ...) sadece durum yoksa kullanılır.
+
+    Returns: {mode, events, delta_transactions, touched_itemsets, promoted,
+              demoted, rescans, rescan_candidates, n_itemsets, n_rules, version, seconds}
+    """
+    name = RULE_SET_NAMES[items]
+    start = time.perf_counter()
+    run_kwargs = {"partition_size": partition_size, "chunk_rows": chunk_rows, "workers": workers}
+
+    state = load_state(name)
+    params = {
+        "min_support": default_params.get("min_support", DEFAULT_MIN_SUPPORT),
+        "min_confidence": default_params.get("min_confidence", 0.0),
+        "min_lift": default_params.get("min_lift", DEFAULT_MIN_LIFT),
+        "max_len": default_params.get("max_len")
+    }
+    if state is None:
+        return _full(engine, items, "durum yok", params, **run_kwargs)
+    params = {key: state.metadata[key] for key in params}
+    if state.applied_batch is None:
+        return _full(engine, items, "durum eski", params, **run_kwargs)
+
+    stats = {
+        "mode": "incremental", "items": items, "events": 0, "delta_transactions": 0,
+        "n_transactions": state.n_transactions, "tracked_itemsets": len(state.counts),
+        "touched_itemsets": 0, "promoted": 0, "demoted": 0, "rescans": 0, "rescan_candidates": 0,
+        "n_itemsets": None, "n_rules": None, "version": None
+    }
+    # Olaylar, güncel loglar ve rescan'ler aynı anlık görüntüden; olay
+    # batch'i aynı transaction'da atanır, kurallar commit'ten sonra yazılır
+    with snapshot_connection(engine) as conn:
+        catalog_version = read_catalog_version(conn)
+        meals = load_meal_frame(conn)
+        vocabulary = build_vocabulary(meals, items)
+        changed = catalog_version != state.metadata["catalog_version"] or sorted(vocabulary.names) != sorted(state.items)
+        events = None if changed else _event_deltas(conn, state.applied_batch)
+        if events is not None and len(events):
+            result = _apply_events(conn, state, vocabulary, events, params, partition_size, chunk_rows, workers, stats)
+            applied_batch = claim_events(conn)
+
+    if changed:
+        return _full(engine, items, "katalog değişti", params, **run_kwargs)
+    if not len(events):
+        stats["seconds"] = {"total": round(time.perf_counter() - start, 3)}
+        return stats
+
+    # 4️⃣ Kurallar + yeni durum (kurallar durumdaki item sırasıyla yazılır)
+    n_transactions, tracked, itemsets, timings = result
+    step = time.perf_counter()
+    version, n_rules = save_co_consumption_rules(
+        items, state.items, meals, itemsets, n_transactions, params,
+        {"catalog_version": catalog_version, "mode": "incremental"}
+    )
+    save_state(name, ItemsetState(state.items, tracked, {
+        **state.metadata,
+        "n_transactions": n_transactions,
+        "applied_batch": applied_batch
+    }))
+    timings["rules"] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - start
+
+    stats.update(version=version, n_rules=n_rules, seconds={k: round(v, 3) for k, v in timings.items()})
+    return stats
+
+
+def prune_events(engine: Engine) -> int:
+    """Tüm kural setlerinin işlediği olayları sil. Returns: silinen satır sayısı"""
+    # Durumu olmayan / eski durum ilk çalışmada tam madencilik yapar, olaylara ihtiyacı yok
+    states = [load_state(name) for name in RULE_SET_NAMES.values()]
+    batches = [state.applied_batch for state in states if state is not None and state.applied_batch is not None]
+    if not batches:
+        return 0
+
+    with engine.begin() as conn:
+        result = conn.execute(delete(MealLogEvent).where(MealLogEvent.batch <= min(batches)))
+    return result.rowcount or 0
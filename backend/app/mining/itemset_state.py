@@ -0,0 +1,77 @@
+"""
+Itemset State
+
+Artımlı madencilik için kalıcı sayım durumu: sık itemset'ler ve negatif
+sınırın (negative border) destek sayıları, toplam transaction sayısı ve
+işlenmiş son meal_log_events batch'i (applied_batch).
+
+    {RULE_STORE_DIR}/{name}/state.npz
+
+Item'lar isimleriyle saklanır; katalog değişip sözlük kayarsa durum
+geçersiz sayılır ve tam madencilik yapılır.
+"""
+
+from typing import Dict, List, Optional
+import json
+import os
+
+import numpy as np
+
+from app.mining.itemsets import Itemset, to_csr
+from app.mining.rule_store import store_dir
+
+STATE_FILE = "state.npz"
+
+
+class ItemsetState:
+    def __init__(self, items: List[str], counts: Dict[Itemset, int], metadata: dict):
+        self.items = items
+        self.counts = counts
+        self.metadata = metadata
+
+    @property
+    def n_transactions(self) -> int:
+        return int(self.metadata["n_transactions"])
+
+    @property
+    def applied_batch(self) -> Optional[int]:
+        """Eski (id watermark'lı) durumlarda None - tam madencilik gerekir"""
+        batch = self.metadata.get("applied_batch")
+        return None if batch is None else int(batch)
+
+
+def _state_path(name: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(store_dir(name, base_dir), STATE_FILE)
+
+
+def save_state(name: str, state: ItemsetState, base_dir: Optional[str] = None) -> None:
+    directory = store_dir(name, base_dir)
+    os.makedirs(directory, exist_ok=True)
+
+    itemsets = list(state.counts)
+    itemset_ptr, itemset_items = to_csr(itemsets)
+    path = _state_path(name, base_dir)
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        items=np.array(state.items, dtype=str),
+        itemset_ptr=itemset_ptr,
+        itemset_items=itemset_items,
+        counts=np.fromiter((state.counts[i] for i in itemsets), dtype=np.int64, count=len(itemsets)),
+        metadata=np.array(json.dumps(state.metadata))
+    )
+    os.replace(tmp_path, path)
+
+
+def load_state(name: str, base_dir: Optional[str] = None) -> Optional[ItemsetState]:
+    path = _state_path(name, base_dir)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        items = data["items"].tolist()
+        ptr, members, counts = data["itemset_ptr"], data["itemset_items"].tolist(), data["counts"].tolist()
+        metadata = json.loads(str(data["metadata"]))
+    itemset_counts = {
+        tuple(members[ptr[i]:ptr[i + 1]]): counts[i] for i in range(len(counts))
+    }
+    return ItemsetState(items, itemset_counts, metadata)
@@ -0,0 +1,216 @@
+"""
+Frequent Itemset Engine (bitset Eclat)
+
+Notebook'taki mlxtend apriori'nin yerine geçen motor. Her item için
+transaction'lar üzerinde paketlenmiş bir bitset tutulur; itemset desteği
+bitset'lerin AND'i ve popcount ile bulunur. Derinlik öncelikli arama
+(Eclat) aday üretim turları yapmadığı için düşük min_support değerlerinde
+de hızlıdır.
+
+Item'lar tamsayı id'lerdir; isimlendirme çağıran modülün işidir.
+"""
+
+from itertools import combinations
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+Itemset = Tuple[int, ...]
+
+if hasattr(np, "bitwise_count"):
+    def _popcount_rows(bits: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+else:  # numpy < 2.0
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount_rows(bits: np.ndarray) -> np.ndarray:
+        return _POPCOUNT8[bits].sum(axis=-1, dtype=np.int64)
+
+
+def pack_transactions(matrix: np.ndarray) -> np.ndarray:
+    """(n_transactions, n_items) bool matris → (n_items, ceil(n/8)) uint8 bitset"""
+    return np.ascontiguousarray(np.packbits(matrix.astype(bool), axis=0).T)
+
+
+def pack_pairs(tx: np.ndarray, items: np.ndarray, n_transactions: int, n_items: int) -> np.ndarray:
+    """
+    (transaction, item) çiftlerinden doğrudan bitset; seyrek veride
+    yoğun bool matris kurmadan. Bit sırası np.packbits ile aynı (big-endian).
+    """
+    bits = np.zeros((n_items, (n_transactions + 7) // 8), dtype=np.uint8)
+    masks = np.left_shift(1, 7 - (tx & 7)).astype(np.uint8)
+    np.bitwise_or.at(bits, (items, tx >> 3), masks)
+    return bits
+
+
+def min_support_count(min_support: float, n_transactions: int) -> int:
+    return max(1, ceil(min_support * n_transactions))
+
+
+def mine_frequent_itemsets(
+    matrix: np.ndarray,
+    min_support: float,
+    max_len: Optional[int] = None,
+    min_count: Optional[int] = None
+) -> Dict[Itemset, int]:
+    """
+    Sık itemset'leri ve destek sayılarını bul.
+
+    matrix: (n_transactions, n_items) bool one-hot matris
+    min_count: verilirse min_support yerine mutlak eşik olarak kullanılır
+
+    Returns: {sıralı item id tuple: transaction sayısı}
+    """
+    n_transactions = matrix.shape[0]
+    if n_transactions == 0:
+        return {}
+    if min_count is None:
+        min_count = min_support_count(min_support, n_transactions)
+    return mine_packed_itemsets(pack_transactions(matrix), min_count, max_len)
+
+
+def mine_packed_itemsets(bits: np.ndarray, min_count: int, max_len: Optional[int] = None) -> Dict[Itemset, int]:
+    """Item başına bitset'lerden (n_items, n_bytes) sık itemset'ler"""
+    counts = _popcount_rows(bits)
+
+    # Düşük destekten yükseğe: dallar erken daralır
+    frequent = [i for i in np.argsort(counts, kind="stable") if counts[i] >= min_count]
+    result: Dict[Itemset, int] = {}
+    if not frequent:
+        return result
+
+    items = np.array(frequent, dtype=np.int64)
+    _extend((), items, bits[items], counts[items], min_count, max_len, result)
+    return result
+
+
+def count_itemsets(bits: np.ndarray, itemsets: List[Itemset], batch_size: int = 4096) -> np.ndarray:
+    """
+    Verilen itemset'lerin destek sayıları (aday sayımı).
+    Aynı uzunluktaki itemset'ler batch'ler halinde vektörel AND'lenir.
+    """
+    counts = np.zeros(len(itemsets), dtype=np.int64)
+    by_len: Dict[int, List[int]] = {}
+    for idx, itemset in enumerate(itemsets):
+        by_len.setdefault(len(itemset), []).append(idx)
+
+    for length, indices in by_len.items():
+        members = np.array([itemsets[i] for i in indices], dtype=np.int64).reshape(len(indices), length)
+        positions = np.array(indices, dtype=np.int64)
+        for start in range(0, len(indices), batch_size):
+            block = members[start:start + batch_size]
+            joined = bits[block[:, 0]].copy()
+            for col in range(1, length):
+                joined &= bits[block[:, col]]
+            counts[positions[start:start + batch_size]] = _popcount_rows(joined)
+    return counts
+
+
+def _extend(
+    prefix: Itemset,
+    items: np.ndarray,
+    bits: np.ndarray,
+    counts: np.ndarray,
+    min_count: int,
+    max_len: Optional[int],
+    result: Dict[Itemset, int]
+) -> None:
+    for i in range(len(items)):
+        itemset = prefix + (int(items[i]),)
+        result[tuple(sorted(itemset))] = int(counts[i])
+
+        if (max_len and len(itemset) >= max_len) or i + 1 == len(items):
+            continue
+
+        # Kalan adaylarla kesişimler tek vektörel işlemde
+        joined = bits[i + 1:] & bits[i]
+        joined_counts = _popcount_rows(joined)
+        keep = joined_counts >= min_count
+        if keep.any():
+            _extend(itemset, items[i + 1:][keep], joined[keep], joined_counts[keep], min_count, max_len, result)
+
+
+def negative_border(frequent: Set[Itemset], n_items: int, max_len: Optional[int] = None) -> Set[Itemset]:
+    """
+    Sık olmayan ama tüm alt kümeleri sık olan itemset'ler (apriori-gen).
+    Artımlı bakımda sayımları tutulur: sınırdaki bir itemset sıklaşmadıkça
+    yeni bir sık itemset ortaya çıkamaz.
+    """
+    border = {(i,) for i in range(n_items) if (i,) not in frequent}
+
+    by_prefix: Dict[Itemset, List[int]] = {}
+    for itemset in frequent:
+        if max_len and len(itemset) >= max_len:
+            continue
+        by_prefix.setdefault(itemset[:-1], []).append(itemset[-1])
+
+    for prefix, lasts in by_prefix.items():
+        lasts.sort()
+        for a_idx, a in enumerate(lasts):
+            for b in lasts[a_idx + 1:]:
+                candidate = prefix + (a, b)
+                if candidate in frequent:
+                    continue
+                # prefix+(a,) ve prefix+(b,) zaten sık; diğer alt kümeler
+                if all(candidate[:i] + candidate[i + 1:] in frequent for i in range(len(prefix))):
+                    border.add(candidate)
+    return border
+
+
+def to_csr(groups: Iterable[Iterable[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Item id grupları → (indptr int64, indices int32)"""
+    groups = [list(g) for g in groups]
+    lengths = np.fromiter((len(g) for g in groups), dtype=np.int64, count=len(groups))
+    indptr = np.zeros(len(groups) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((i for g in groups for i in g), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+def generate_rules(
+    itemset_counts: Dict[Itemset, int],
+    n_transactions: int,
+    min_confidence: float = 0.0,
+    min_lift: float = 0.0
+) -> List[dict]:
+    """
+    Sık itemset'lerden birliktelik kuralları (mlxtend association_rules metrikleri).
+
+    Returns: [{antecedents, consequents, support, confidence, lift, leverage, conviction}]
+    """
+    rules = []
+    if n_transactions == 0:
+        return rules
+
+    for itemset, count in itemset_counts.items():
+        if len(itemset) < 2:
+            continue
+        support = count / n_transactions
+        for size in range(1, len(itemset)):
+            for antecedent in combinations(itemset, size):
+                consequent = tuple(i for i in itemset if i not in antecedent)
+                antecedent_support = itemset_counts[antecedent] / n_transactions
+                consequent_support = itemset_counts[consequent] / n_transactions
+
+                confidence = support / antecedent_support
+                if confidence < min_confidence:
+                    continue
+                lift = confidence / consequent_support
+                if lift < min_lift:
+                    continue
+
+                rules.append({
+                    "antecedents": list(antecedent),
+                    "consequents": list(consequent),
+                    "antecedent_support": antecedent_support,
+                    "consequent_support": consequent_support,
+                    "support": support,
+                    "confidence": confidence,
+                    "lift": lift,
+                    "leverage": support - antecedent_support * consequent_support,
+                    "conviction": (1 - consequent_support) / (1 - confidence) if confidence < 1 else float("inf")
+                })
+
+    rules.sort(key=lambda r: (r["lift"], r["confidence"]), reverse=True)
+    return rules
@@ -0,0 +1,310 @@
+"""
+Rule Store
+
+Madencilik çıktısı versiyonlu, kompakt binary dosyalar olarak saklanır:
+
+    {RULE_STORE_DIR}/{name}/v0001.npz
+    {RULE_STORE_DIR}/{name}/LATEST      ← aktif versiyon numarası
+
+Item isimleri bir kez yazılır, kurallar item id'leri (int32) üzerinden CSR
+dizileri olarak tutulur; metrikler kolon bazında float dizileridir.
+Kurallar antecedent'a göre gruplu saklanır ve çapa item → kural ters
+indeksi de dosyadadır, böylece "bu item'lara uyan kurallar" sorgusu tüm
+kuralları taramadan çözülür.
+
+Script yeni versiyonu yazar ve LATEST'i atomik olarak değiştirir; API
+sadece LATEST değiştiğinde dosyayı yeniden okur.
+"""
+
+from datetime import datetime
+from itertools import combinations
+from math import comb
+from typing import Dict, Iterable, List, Optional
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from app.core.config import settings
+from app.mining.itemsets import to_csr
+
+LATEST_FILE = "LATEST"
+# Verilen küme bundan fazla alt küme sorgusu gerektirirse çapa indeksine düşülür
+MAX_SUBSET_LOOKUPS = 4096
+METRICS = (
+    "support", "confidence", "lift", "leverage", "conviction",
+    "antecedent_support", "consequent_support"
+)
+
+
+def _anchor_items(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Her kural için ters indekste tek bir "çapa" antecedent item: en az
+    kuralda geçen item. Kural en seçici item'ının listesinde bir kez yer
+    alır; diğer antecedent item'ları eşleşmede maske ile doğrulanır.
+    """
+    n_rules = len(indptr) - 1
+    if n_rules == 0:
+        return np.empty(0, dtype=np.int32)
+    frequency = np.bincount(indices)
+    rule_ids = np.repeat(np.arange(n_rules), np.diff(indptr))
+    # Kural içinde (frekans, item) sırası; ilk eleman çapa
+    order = np.lexsort((indices, frequency[indices], rule_ids))
+    return indices[order][indptr[:-1]]
+
+
+def _invert(anchors: np.ndarray, n_items: int, order: np.ndarray):
+    """çapa item → kural id CSR; her item'ın listesi `order` sırasında (lift azalan)"""
+    ranked_anchors = anchors[order]
+    sort = np.argsort(ranked_anchors, kind="stable")
+    counts = np.bincount(anchors, minlength=n_items)
+    index_ptr = np.zeros(n_items + 1, dtype=np.int64)
+    np.cumsum(counts, out=index_ptr[1:])
+    return index_ptr, order[sort].astype(np.int32)
+
+
+class RuleSet:
+    """Yüklenmiş bir kural versiyonu (interned item'lar + CSR kurallar + ters indeks)"""
+
+    def __init__(self, name: str, version: int, arrays: Dict[str, np.ndarray], metadata: dict):
+        self.name = name
+        self.version = version
+        self.metadata = metadata
+        self.items: List[str] = arrays["items"].tolist()
+        self.item_ids: Dict[str, int] = {item: i for i, item in enumerate(self.items)}
+
+        self.antecedent_ptr = arrays["antecedent_ptr"]
+        self.antecedent_items = arrays["antecedent_items"]
+        self.consequent_ptr = arrays["consequent_ptr"]
+        self.consequent_items = arrays["consequent_items"]
+        self.antecedent_len = np.diff(self.antecedent_ptr)
+        self.index_ptr = arrays["index_ptr"]
+        self.index_rules = arrays["index_rules"]
+        self.metrics = {m: arrays[m] for m in METRICS}
+
+        # antecedent (sıralı item id tuple) → [başlangıç, bitiş) kural aralığı
+        group_ptr = arrays["group_ptr"]
+        self.antecedent_groups: Dict[tuple, tuple] = {}
+        for start, end in zip(group_ptr[:-1].tolist(), group_ptr[1:].tolist()):
+            key = tuple(self.antecedent_items[self.antecedent_ptr[start]:self.antecedent_ptr[start + 1]].tolist())
+            self.antecedent_groups[key] = (start, end)
+        self.max_antecedent_len = int(self.antecedent_len.max()) if self.n_rules else 0
+
+    @property
+    def n_rules(self) -> int:
+        return len(self.antecedent_len)
+
+    def intern(self, names: Iterable[str]) -> List[int]:
+        """Bilinen item isimlerini id'lere çevir (kural setinde olmayanlar atlanır)"""
+        return [self.item_ids[n] for n in names if n in self.item_ids]
+
+    def rule_to_dict(self, rule_id: int) -> dict:
+        antecedents = self.antecedent_items[self.antecedent_ptr[rule_id]:self.antecedent_ptr[rule_id + 1]]
+        consequents = self.consequent_items[self.consequent_ptr[rule_id]:self.consequent_ptr[rule_id + 1]]
+        rule = {
+            "antecedents": [self.items[i] for i in antecedents],
+            "consequents": [self.items[i] for i in consequents]
+        }
+        for metric, values in self.metrics.items():
+            value = float(values[rule_id])
+            # float32 saklanır; gürültülü basamaklar gösterilmez
+            rule[metric] = round(value, 6) if math.isfinite(value) else None
+        return rule
+
+    @staticmethod
+    def _all_in(rule_ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Kuralın (antecedent veya consequent) tüm item'ları maskede mi?"""
+        if len(rule_ids) == 0:
+            return np.zeros(0, dtype=bool)
+        starts, lengths = indptr[rule_ids], indptr[rule_ids + 1] - indptr[rule_ids]
+        group_starts = np.cumsum(lengths) - lengths
+        offsets = np.arange(lengths.sum()) - np.repeat(group_starts, lengths)
+        present = mask[indices[np.repeat(starts, lengths) + offsets]].astype(np.int64)
+        return np.add.reduceat(present, group_starts) == lengths
+
+    def _threshold_mask(self, rule_ids: np.ndarray, min_support: float, min_confidence: float, min_lift: float):
+        return (
+            (self.metrics["support"][rule_ids] >= min_support)
+            & (self.metrics["confidence"][rule_ids] >= min_confidence)
+            & (self.metrics["lift"][rule_ids] >= min_lift)
+        )
+
+    def _top(self, rule_ids: np.ndarray, sort_by: str, limit: int) -> np.ndarray:
+        values = self.metrics[sort_by][rule_ids]
+        if len(rule_ids) > limit:
+            part = np.argpartition(-values, limit - 1)[:limit]
+            rule_ids, values = rule_ids[part], values[part]
+        return rule_ids[np.argsort(-values, kind="stable")]
+
+    def query(
+        self,
+        min_support: float = 0.0,
+        min_confidence: float = 0.0,
+        min_lift: float = 0.0,
+        sort_by: str = "lift",
+        limit: int = 50
+    ):
+        """Eşikleri geçen tüm kurallardan en iyi `limit` tanesi. Returns: (rule_ids, total)"""
+        rule_ids = np.arange(self.n_rules)
+        rule_ids = rule_ids[self._threshold_mask(rule_ids, min_support, min_confidence, min_lift)]
+        return self._top(rule_ids, sort_by, limit), len(rule_ids)
+
+    def match(
+        self,
+        item_ids: List[int],
+        min_support: float = 0.0,
+        min_confidence: float = 0.0,
+        min_lift: float = 0.0,
+        sort_by: str = "lift",
+        limit: int = 20,
+        exclude_known: bool = True
+    ):
+        """
+        Antecedent'ı verilen item kümesinin alt kümesi olan kurallar.
+        Küçük kümelerde alt kümeler antecedent hash'inde aranır; büyük
+        kümelerde adaylar çapa listelerinden gelir (her kural tek listede)
+        ve antecedent'ın geri kalanı item maskesiyle doğrulanır.
+        exclude_known: sonucu zaten kümede olan kurallar atlanır.
+
+        Returns: (rule_ids, total)
+        """
+        if not item_ids:
+            return np.empty(0, dtype=np.int64), 0
+
+        given = np.unique(np.asarray(item_ids, dtype=np.int64))
+        given_mask = np.zeros(len(self.items), dtype=bool)
+        given_mask[given] = True
+
+        max_len = min(len(given), self.max_antecedent_len)
+        if sum(comb(len(given), k) for k in range(1, max_len + 1)) <= MAX_SUBSET_LOOKUPS:
+            # Kümenin her alt kümesi için antecedent hash'i (küçük kümeler)
+            members = given.tolist()
+            ranges = [
+                self.antecedent_groups[subset]
+                for k in range(1, max_len + 1)
+                for subset in combinations(members, k)
+                if subset in self.antecedent_groups
+            ]
+            rule_ids = np.concatenate(
+                [np.arange(start, end) for start, end in ranges] or [np.empty(0, dtype=np.int64)]
+            )
+        else:
+            # Büyük kümeler: çapa listelerinden adaylar + antecedent doğrulaması
+            starts, ends = self.index_ptr[given], self.index_ptr[given + 1]
+            rule_ids = np.concatenate([self.index_rules[s:e] for s, e in zip(starts, ends)]).astype(np.int64)
+            rule_ids = rule_ids[self._all_in(rule_ids, self.antecedent_ptr, self.antecedent_items, given_mask)]
+
+        if exclude_known:
+            rule_ids = rule_ids[~self._all_in(rule_ids, self.consequent_ptr, self.consequent_items, given_mask)]
+
+        rule_ids = rule_ids[self._threshold_mask(rule_ids, min_support, min_confidence, min_lift)]
+        return self._top(rule_ids, sort_by, limit), len(rule_ids)
+
+
+def store_dir(name: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(base_dir or settings.RULE_STORE_DIR, name)
+
+
+def _version_path(name: str, version: int, base_dir: Optional[str] = None) -> str:
+    return os.path.join(store_dir(name, base_dir), f"v{version:04d}.npz")
+
+
+def latest_version(name: str, base_dir: Optional[str] = None) -> Optional[int]:
+    try:
+        with open(os.path.join(store_dir(name, base_dir), LATEST_FILE)) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_rules(
+    name: str,
+    items: List[str],
+    rules: List[dict],
+    metadata: dict,
+    base_dir: Optional[str] = None
+) -> int:
+    """
+    Yeni versiyonu yaz, LATEST'i güncelle. rules: generate_rules çıktısı
+    (item id'leri `items` listesine index). Returns: versiyon numarası
+    """
+    directory = store_dir(name, base_dir)
+    os.makedirs(directory, exist_ok=True)
+    version = (latest_version(name, base_dir) or 0) + 1
+
+    # Aynı antecedent'a sahip kurallar ardışık (antecedent → kural aralığı)
+    rules = sorted(rules, key=lambda r: (len(r["antecedents"]), r["antecedents"]))
+    group_starts = [
+        i for i, r in enumerate(rules)
+        if i == 0 or r["antecedents"] != rules[i - 1]["antecedents"]
+    ]
+    group_ptr = np.array(group_starts + [len(rules)], dtype=np.int64)
+
+    antecedent_ptr, antecedent_items = to_csr([r["antecedents"] for r in rules])
+    consequent_ptr, consequent_items = to_csr([r["consequents"] for r in rules])
+    metrics = {
+        m: np.fromiter((r[m] for r in rules), dtype=np.float32, count=len(rules))
+        for m in METRICS
+    }
+    order = np.lexsort((-metrics["confidence"], -metrics["lift"]))
+    index_ptr, index_rules = _invert(_anchor_items(antecedent_ptr, antecedent_items), len(items), order)
+
+    metadata = {**metadata, "created_at": datetime.utcnow().isoformat(), "n_rules": len(rules)}
+    path = _version_path(name, version, base_dir)
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        items=np.array(items, dtype=str),
+        antecedent_ptr=antecedent_ptr, antecedent_items=antecedent_items,
+        consequent_ptr=consequent_ptr, consequent_items=consequent_items,
+        index_ptr=index_ptr, index_rules=index_rules,
+        group_ptr=group_ptr,
+        metadata=np.array(json.dumps(metadata)),
+        **metrics
+    )
+    os.replace(tmp_path, path)
+
+    # Okuyucular yarım yazılmış pointer görmesin
+    tmp_latest = os.path.join(directory, LATEST_FILE + ".tmp")
+    with open(tmp_latest, "w") as f:
+        f.write(str(version))
+    os.replace(tmp_latest, os.path.join(directory, LATEST_FILE))
+    return version
+
+
+def load_rules(name: str, version: Optional[int] = None, base_dir: Optional[str] = None) -> Optional[RuleSet]:
+    """Verilen (default: LATEST) versiyonu yükle; store boşsa None"""
+    version = version or latest_version(name, base_dir)
+    if version is None:
+        return None
+    with np.load(_version_path(name, version, base_dir)) as data:
+        arrays = {key: data[key] for key in data.files}
+    metadata = json.loads(str(arrays.pop("metadata")))
+    return RuleSet(name, version, arrays, metadata)
+
+
+class RuleSetCache:
+    """Kural setlerini bellekte tutar; LATEST değişince yeniden yükler"""
+
+    def __init__(self):
+        self._sets = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[RuleSet]:
+        version = latest_version(name)
+        if version is None:
+            return None
+        cached = self._sets.get(name)
+        if cached and cached.version == version:
+            return cached
+        with self._lock:
+            cached = self._sets.get(name)
+            if not cached or cached.version != version:
+                cached = load_rules(name, version)
+                self._sets[name] = cached
+            return cached
+
+
+rule_set_cache = RuleSetCache()
@@ -0,0 +1,120 @@
+"""
+Transaction Builder
+
+Kural madenciliği için one-hot transaction matrisleri.
+
+Meal attribute transaction'ları notebook'taki hazırlıkla aynıdır: her
+yemek bir transaction; sayısal kolonlar tercile (pd.qcut, q=3) göre
+low/medium/high, kategorik kolonlar "kolon=değer" item'ı olur. Satır
+döngüsü (iterrows) yok; item kodları kolon bazında vektörel üretilir.
+"""
+
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.models import Meal
+
+# Notebook: numeric_cols + "_cat" tercile etiketleri
+NUMERIC_COLUMNS = [
+    "calories", "protein_g", "carbs_g", "fat_g", "fiber_g", "sugar_g",
+    "sodium_mg", "cholesterol_mg"
+]
+CATEGORICAL_COLUMNS = ["cuisine", "meal_type", "diet_type", "cooking_method"]
+TERCILE_LABELS = ["low", "medium", "high"]
+
+
+def load_meal_frame(bind: Union[Engine, Connection]) -> pd.DataFrame:
+    """
+    meals tablosundan madencilik için gereken kolonlar (tek SELECT).
+    Connection verilirse onun transaction'ında (snapshot) okunur.
+    """
+    columns = [Meal.meal_id] + [getattr(Meal, col) for col in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS]
+    return pd.read_sql(select(*columns), bind)
+
+
+def tercile_codes(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """
+    Tercile bucket kodları (0/1/2, eksik değer -1) ve etiketleri.
+    Sınırlar çakışırsa (çok tekrar eden değer) bucket sayısı azalır.
+    """
+    codes, bins = pd.qcut(values, q=3, labels=False, retbins=True, duplicates="drop")
+    n_buckets = len(bins) - 1
+    labels = TERCILE_LABELS if n_buckets == 3 else TERCILE_LABELS[:max(n_buckets, 0)]
+    return codes.fillna(-1).to_numpy(dtype=np.int64), labels
+
+
+def category_codes(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """Kategorik kolon kodları (eksik değer -1) ve değerleri"""
+    categorical = pd.Categorical(values.where(values.notna() & (values != ""), None))
+    return categorical.codes.astype(np.int64), [str(c) for c in categorical.categories]
+
+
+def build_attribute_transactions(df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+    """
+    Meal DataFrame'inden (n_meals, n_items) bool matris ve item isimleri.
+
+    Item isimleri notebook ile aynı: "calories_cat=low", "cuisine=Italian" ...
+    DataFrame'de olmayan kolonlar atlanır.
+    """
+    blocks = []
+    item_names: List[str] = []
+
+    for col in NUMERIC_COLUMNS:
+        if col not in df:
+            continue
+        codes, labels = tercile_codes(pd.to_numeric(df[col], errors="coerce"))
+        blocks.append((codes, len(labels)))
+        item_names.extend(f"{col}_cat={label}" for label in labels)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col not in df:
+            continue
+        codes, values = category_codes(df[col])
+        blocks.append((codes, len(values)))
+        item_names.extend(f"{col}={value}" for value in values)
+
+    n_rows = len(df)
+    matrix = np.zeros((n_rows, len(item_names)), dtype=bool)
+    rows = np.arange(n_rows)
+    offset = 0
+    for codes, width in blocks:
+        present = codes >= 0
+        matrix[rows[present], offset + codes[present]] = True
+        offset += width
+
+    return matrix, item_names
+
+
+def tercile_edges(df: pd.DataFrame) -> Dict[str, List[float]]:
+    """
+    Sayısal kolonların tercile sınırları. Kural setiyle birlikte saklanır ki
+    tek bir yemek madencilikteki bucket'larla etiketlenebilsin.
+    """
+    edges = {}
+    for col in NUMERIC_COLUMNS:
+        if col not in df:
+            continue
+        _, bins = pd.qcut(pd.to_numeric(df[col], errors="coerce"), q=3, retbins=True, duplicates="drop")
+        edges[col] = [float(b) for b in bins]
+    return edges
+
+
+def meal_attribute_items(meal: dict, edges: Dict[str, List[float]]) -> List[str]:
+    """Tek yemeğin attribute item isimleri (build_attribute_transactions ile aynı adlandırma)"""
+    items = []
+    for col, bins in edges.items():
+        value = meal.get(col)
+        if value is None or len(bins) < 2:
+            continue
+        # qcut aralıkları (e0, e1], (e1, e2], ... ; aralık dışı uçlara sıkıştırılır
+        bucket = int(np.clip(np.searchsorted(bins, float(value), side="left") - 1, 0, len(bins) - 2))
+        items.append(f"{col}_cat={TERCILE_LABELS[bucket]}")
+    for col in CATEGORICAL_COLUMNS:
+        value = meal.get(col)
+        if value:
+            items.append(f"{col}={value}")
+    return items
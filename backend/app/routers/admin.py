@@ -0,0 +1,67 @@
+"""
+Admin Router
+Operasyonel izleme endpoint'leri (sadece ADMIN_USER_IDS)
+"""
+from fastapi import APIRouter, Depends, Query
+
+from app.db.session import slow_query_log
+from app.core.security import get_admin_user_id
+from app.core.idempotency import idempotency_store
+from app.core.error_sink import error_log_sink
+from app.core.token_cache import token_cache
+from app.services.ai_write_behind import ai_write_behind
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Sonuç limiti"),
+    admin_id: int = Depends(get_admin_user_id)
+):
+    """Eşik üstü sorgular (en yeni önce) + tampon istatistikleri"""
+    return {
+        "stats": slow_query_log.stats(),
+        "queries": slow_query_log.entries(limit)
+    }
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries(
+    admin_id: int = Depends(get_admin_user_id)
+):
+    """Slow query tamponunu temizle"""
+    slow_query_log.clear()
+    return {"ok": True}
+
+
+@router.get("/idempotency")
+def get_idempotency_stats(
+    admin_id: int = Depends(get_admin_user_id)
+):
+    """Idempotency-Key deposu: bu process'teki tekrar (hit) / ilk istek (miss) sayıları"""
+    return idempotency_store.stats()
+
+
+@router.get("/ai-writes")
+def get_ai_write_stats(
+    admin_id: int = Depends(get_admin_user_id)
+):
+    """AI write-behind kuyruğu: bekleyen / yazılan / atılan kayıtlar"""
+    return ai_write_behind.stats()
+
+
+@router.get("/error-log")
+def get_error_log_stats(
+    admin_id: int = Depends(get_admin_user_id)
+):
+    """Error log sink: kuyruğa alınan / tekrar / hız sınırı / atılan hata sayıları"""
+    return error_log_sink.stats()
+
+
+@router.get("/token-cache")
+def get_token_cache_stats(
+    admin_id: int = Depends(get_admin_user_id)
+):
+    """Doğrulanmış JWT cache'i: hit / miss / süresi dolan / atılan sayıları"""
+    return token_cache.stats()
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 import json
+import numpy as np
 from datetime import date
 
 from app.db.session import get_db
-from app.db.models import Meal, MealLog, FavoriteMeal, AIInteraction, AIAcceptance
+from app.db.models import Meal, MealLog, FavoriteMeal
 from app.core.security import get_current_user_id
 from app.core.config import settings
 from app.core.rate_limiter import ai_rate_limiter
+from app.core.idempotency import run_idempotent
+from app.services.ai_history import ai_stats, owns_interaction, record_acceptance, record_interaction, top_accepted_meals
+from app.services.ai_write_behind import WriteBehindFull
 from app.services.ai_context import build_ai_context, format_context_for_prompt
+from app.services.meal_vectors import meal_vectors_cache
+from app.services.user_context import UserContext, get_user_context
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -85,6 +91,7 @@ Yanıtını MUTLAKA aşağıdaki JSON formatında ver:
 def ai_chat(
     req: ChatRequest,
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """
@@ -94,8 +101,6 @@ def ai_chat(
     AI yorumlar, yönlendirir, fark ettirir.
     Backend = matematik, AI = koç
     """
-    from sqlalchemy import func
-    
     # 🔒 Rate limit kontrolü
     is_allowed, rate_limit_message = ai_rate_limiter.check_rate_limit(user_id)
     if not is_allowed:
@@ -111,7 +116,7 @@ def ai_chat(
     today = date.today()
     
     # 1️⃣ Build AI Context (tüm hesaplamalar burada)
-    context = build_ai_context(user_id, today, db)
+    context = build_ai_context(user_id, today, db, user_ctx=ctx)
     context_text = format_context_for_prompt(context)
     
     # 2️⃣ Mevcut öğün listesini al (öneri için) - RANDOM SAMPLE
@@ -124,22 +129,9 @@ def ai_chat(
     ])
     
     # 3️⃣ Geçmişte kabul edilen öğünleri al
-    past_acceptances = db.query(
-        AIAcceptance.meal_id,
-        func.count(AIAcceptance.id).label("count")
-    ).filter(
-        AIAcceptance.user_id == user_id
-    ).group_by(
-        AIAcceptance.meal_id
-    ).order_by(
-        func.count(AIAcceptance.id).desc()
-    ).limit(5).all()
-    
-    accepted_meals = []
-    for meal_id, count in past_acceptances:
-        meal = db.query(Meal).filter(Meal.meal_id == meal_id).first()
-        if meal:
-            accepted_meals.append(f"{meal.meal_name} ({count} kez)")
+    accepted_meals = [
+        f"{m['meal_name']} ({m['count']} kez)" for m in top_accepted_meals(db, user_id)
+    ]
     
     # 4️⃣ User prompt oluştur
     user_prompt = f"""
@@ -207,22 +199,19 @@ Mevcut öğün listesi (sadece buradan öner):
         # 8️⃣ AI Interaction'ı DB'ye kaydet
         suggested_ids = [s.meal_id for s in meal_suggestions if s.meal_id]
         
-        interaction = AIInteraction(
-            user_id=user_id,
+        interaction_id = record_interaction(
+            user_id,
             prompt_text=req.user_message,
             response_text=json.dumps(ai_response, ensure_ascii=False)[:500],
             suggested_meal_ids=json.dumps(suggested_ids)
         )
-        db.add(interaction)
-        db.commit()
-        db.refresh(interaction)
         
         return StructuredAIResponse(
             summary=ai_response.get("summary", ""),
             warnings=ai_response.get("warnings", []),
             meal_suggestions=meal_suggestions,
             tips=ai_response.get("tips", []),
-            interaction_id=interaction.id,
+            interaction_id=interaction_id,
             raw_context=context  # Debug için
         )
         
@@ -242,19 +231,24 @@ Mevcut öğün listesi (sadece buradan öner):
 @router.post("/accept")
 def accept_suggestion(
     req: AcceptRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    """AI önerisinin kabul edildiğini kaydet (yedim/favori)"""
-    acceptance = AIAcceptance(
-        ai_interaction_id=req.ai_interaction_id,
-        user_id=user_id,
-        meal_id=req.meal_id
-    )
-    db.add(acceptance)
-    db.commit()
-    
-    return {"ok": True}
+    """AI önerisinin kabul edildiğini kaydet (yedim/favori, Idempotency-Key destekli)"""
+    def write():
+        # Kayıt arka planda yazılır; geçersiz kabul kuyruğa girmeden reddedilir
+        if meal_vectors_cache.get(db).positions(np.array([req.meal_id]))[0] < 0:
+            raise HTTPException(status_code=404, detail="Yemek bulunamadı")
+        if not owns_interaction(db, user_id, req.ai_interaction_id):
+            raise HTTPException(status_code=404, detail="AI etkileşimi bulunamadı")
+        try:
+            record_acceptance(user_id, req.ai_interaction_id, req.meal_id)
+        except WriteBehindFull:
+            raise HTTPException(status_code=503, detail="AI kayıtları şu anda yazılamıyor, lütfen tekrar deneyin")
+        return {"ok": True}
+
+    return run_idempotent(db, user_id, "POST /ai/accept", idempotency_key, req.model_dump(), write)
 
 
 # ===== STATS ENDPOINT =====
@@ -265,23 +259,7 @@ def get_ai_stats(
     db: Session = Depends(get_db)
 ):
     """AI kabul oranı istatistikleri"""
-    from sqlalchemy import func
-    
-    total_interactions = db.query(func.count(AIInteraction.id)).filter(
-        AIInteraction.user_id == user_id
-    ).scalar() or 0
-    
-    accepted_count = db.query(func.count(AIAcceptance.id)).filter(
-        AIAcceptance.user_id == user_id
-    ).scalar() or 0
-    
-    acceptance_rate = accepted_count / total_interactions if total_interactions > 0 else 0
-    
-    return {
-        "total_interactions": total_interactions,
-        "accepted_count": accepted_count,
-        "acceptance_rate": round(acceptance_rate, 2)
-    }
+    return ai_stats(db, user_id)
 
 
 # ===== TOP MEALS ENDPOINT =====
@@ -292,29 +270,10 @@ def get_top_ai_meals(
     db: Session = Depends(get_db)
 ):
     """En çok kabul edilen AI öğünleri"""
-    from sqlalchemy import func
-    
-    results = db.query(
-        AIAcceptance.meal_id,
-        func.count(AIAcceptance.id).label("count")
-    ).filter(
-        AIAcceptance.user_id == user_id
-    ).group_by(
-        AIAcceptance.meal_id
-    ).order_by(
-        func.count(AIAcceptance.id).desc()
-    ).limit(5).all()
-    
-    top_meals = []
-    for meal_id, count in results:
-        meal = db.query(Meal).filter(Meal.meal_id == meal_id).first()
-        if meal:
-            top_meals.append({
-                "meal_name": meal.meal_name,
-                "count": count
-            })
-    
-    return top_meals
+    return [
+        {"meal_name": m["meal_name"], "count": m["count"]}
+        for m in top_accepted_meals(db, user_id)
+    ]
 
 
 # ===== CONTEXT DEBUG ENDPOINT =====
@@ -322,11 +281,12 @@ def get_top_ai_meals(
 @router.get("/context")
 def get_ai_context(
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """Debug: AI context'ini göster"""
     today = date.today()
-    context = build_ai_context(user_id, today, db)
+    context = build_ai_context(user_id, today, db, user_ctx=ctx)
     return context
 
 
@@ -368,6 +328,7 @@ class WeeklyCoachResponse(BaseModel):
 @router.get("/weekly-coach", response_model=WeeklyCoachResponse)
 def get_weekly_coach(
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """
@@ -383,7 +344,7 @@ def get_weekly_coach(
     if not is_allowed:
         # Summary yine de döndür ama AI yorumu yapma
         today = date.today()
-        summary = get_weekly_summary(user_id, today, db)
+        summary = get_weekly_summary(user_id, today, db, user_ctx=ctx)
         return WeeklyCoachResponse(
             praise="AI limiti aşıldı - biraz bekleyin.",
             critique=rate_limit_message,
@@ -393,7 +354,7 @@ def get_weekly_coach(
         )
     
     today = date.today()
-    summary = get_weekly_summary(user_id, today, db)
+    summary = get_weekly_summary(user_id, today, db, user_ctx=ctx)
     summary_text = format_weekly_summary_for_ai(summary)
     
     try:
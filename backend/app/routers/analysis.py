@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime
 import statistics
 
 from app.db.session import get_db
-from app.db.models import MealLog, Meal, UserGoals, AIInteraction, AIAcceptance, DailyActivity, UserProfile
+from app.db.models import MealLog, Meal, AIInteraction, AIAcceptance
 from app.core.security import get_current_user_id
-from app.services.metabolism import get_full_calculations
 from app.services.warnings import generate_daily_warnings
 from app.services.weekly_coach import get_weekly_summary
+from app.services.user_context import UserContext, get_user_context
+from app.services.daily_totals import get_day_totals
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
@@ -21,12 +21,13 @@ PROTEIN_CAP = 1.5  # Protein oranı tavanı
 @router.get("/progress")
 def get_user_progress(
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """Kullanıcının AI öncesi ve sonrası gelişimini analiz et (normalize edilmiş)"""
     
     # Kullanıcı hedeflerini al
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
+    goals = ctx.goals
     if not goals or goals.daily_protein_target <= 0 or goals.daily_calorie_target <= 0:
         return {"error": "Geçerli hedef bulunamadı"}
     
@@ -174,60 +175,41 @@ def get_user_progress(
 @router.get("/warnings")
 def get_daily_warnings(
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """
     Kullanıcı için bugünkü deterministik uyarıları getirir.
     """
-    today = datetime.now().date()
+    today = ctx.activity_date
     
-    # 1. Profil ve Hedefleri Al (Target Calculation)
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    activity = db.query(DailyActivity).filter(
-        DailyActivity.user_id == user_id, 
-        DailyActivity.activity_date == today
-    ).first()
+    # Tüketilenleri Hesapla (tek aggregate sorgu)
+    totals = get_day_totals(db, user_id, today)
     
-    steps = activity.steps if activity else 0
-    goal_type = goals.goal_type if goals else "koruma"
+    return build_daily_warnings(ctx, totals["calories"], totals["protein"])
+
+
+def build_daily_warnings(ctx: UserContext, consumed_kcal: float, consumed_protein: float) -> list:
+    """
+    Context + tüketimden warning listesi (DB erişimi yok).
+    /dashboard da aynı listeyi kullanır.
+    """
+    # 1. Profil ve Hedefleri Al (Target Calculation) - tek sorguda yüklendi
+    steps = ctx.steps
     
     target_kcal = 2000 # Default fallback
     protein_target = 80 # Default fallback
     
-    if profile:
-        calcs = get_full_calculations(
-            weight_kg=profile.weight_kg,
-            height_cm=profile.height_cm,
-            birth_year=profile.birth_year,
-            gender=profile.gender,
-            steps=steps,
-            goal_type=goal_type
-        )
+    if ctx.profile:
+        calcs = ctx.calculations()
         target_kcal = calcs["target_calories"]
         protein_target = calcs["target_protein"]
-    elif goals:
+    elif ctx.goals:
         # Profil yoksa ama manuel hedef varsa
-        target_kcal = goals.daily_calorie_target
-        protein_target = goals.daily_protein_target
-
-    # 2. Tüketilenleri Hesapla (Log Aggregation)
-    today_logs = db.query(MealLog).filter(
-        MealLog.user_id == user_id,
-        MealLog.log_date == today
-    ).all()
-    
-    consumed_kcal = 0
-    consumed_protein = 0
-    
-    # Meal bilgilerini de çekerek hesapla
-    for log in today_logs:
-        meal = db.query(Meal).filter(Meal.meal_id == log.meal_id).first()
-        if meal:
-            consumed_kcal += meal.calories * log.portion
-            consumed_protein += meal.protein_g * log.portion
+        target_kcal = ctx.goals.daily_calorie_target
+        protein_target = ctx.goals.daily_protein_target
             
-    # 3. Warning Engine Çalıştır
+    # 2. Warning Engine Çalıştır
     warnings = generate_daily_warnings(
         target_kcal=int(target_kcal),
         consumed_kcal=int(consumed_kcal),
@@ -242,6 +224,7 @@ def get_daily_warnings(
 @router.get("/weekly-summary")
 def get_weekly_summary_endpoint(
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """
@@ -249,6 +232,6 @@ def get_weekly_summary_endpoint(
     Son 7 günün detaylı analizi.
     """
     today = datetime.now().date()
-    summary = get_weekly_summary(user_id, today, db)
+    summary = get_weekly_summary(user_id, today, db, user_ctx=ctx)
     return summary
 
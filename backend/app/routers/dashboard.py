@@ -0,0 +1,187 @@
+"""
+Dashboard Router
+Dashboard'un ilk açılışındaki tüm widget verileri tek istekte.
+
+/progress/daily, /engagement/streak, /analysis/warnings,
+/engagement/meal-suggestions, /profile/stats ve /logs ayrı ayrı auth +
+session + hedef/profil sorgusu ödüyordu. Burada kullanıcı context'i bir kez
+yüklenir, birbirinden bağımsız okumalar ayrı session'larla paralel çalışır.
+
+Paralel okumalar tüm istekler arasında paylaşılan DASHBOARD_MAX_WORKERS
+slot ile sınırlı; slot yoksa okuma isteğin kendi session'ında sırayla
+yapılır. Böylece eşzamanlı dashboard istekleri bağlantı havuzunu tüketmez.
+"""
+from fastapi import APIRouter, Depends, Query
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+import contextvars
+import threading
+
+from app.db.session import SessionLocal, get_db
+from app.db.models import MealLog, UserStreak
+from app.core.security import get_current_user_id
+from app.services.user_context import UserContext, get_user_context
+from app.services.daily_totals import get_totals_by_date, empty_totals
+from app.services.favorites import list_favorites
+from app.routers.progress import build_daily_progress
+from app.routers.analysis import build_daily_warnings
+from app.routers.engagement import build_streak_status, build_meal_suggestions
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Tüm isteklerde aynı anda en fazla bu kadar paralel okuma - her biri
+# pool'dan ek bir bağlantı alır (pool_size=5 + max_overflow=10, istek
+# session'ları da aynı havuzdan)
+DASHBOARD_MAX_WORKERS = 4
+_executor = ThreadPoolExecutor(max_workers=DASHBOARD_MAX_WORKERS, thread_name_prefix="dashboard")
+_slots = threading.BoundedSemaphore(DASHBOARD_MAX_WORKERS)
+
+
+def _run_with_session(fn, *args):
+    """Session thread-safe değil; her paralel okuma kendi session'ını açar"""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+        _slots.release()
+
+
+def _submit(db: Session, fn, *args) -> Future:
+    """Boş slot varsa paralel çalıştır, yoksa isteğin session'ında hemen çalıştır"""
+    if _slots.acquire(blocking=False):
+        # İstek bağlamı (slow query log: endpoint/user) worker thread'e taşınsın
+        ctx = contextvars.copy_context()
+        try:
+            return _executor.submit(ctx.run, _run_with_session, fn, *args)
+        except Exception:
+            _slots.release()
+            raise
+
+    future = Future()
+    try:
+        future.set_result(fn(db, *args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _load_streak(db, user_id: int) -> Optional[UserStreak]:
+    streak = db.query(UserStreak).filter(UserStreak.user_id == user_id).first()
+    if streak:
+        db.expunge(streak)
+    return streak
+
+
+def _load_logs(db, user_id: int, log_date: date) -> list:
+    rows = db.query(MealLog.id, MealLog.meal_id, MealLog.portion).filter(
+        MealLog.user_id == user_id,
+        MealLog.log_date == log_date
+    ).all()
+    return [
+        {"id": r.id, "meal_id": r.meal_id, "portion": r.portion, "log_date": log_date.isoformat()}
+        for r in rows
+    ]
+
+
+def _load_favorites(db, user_id: int) -> list:
+    return list_favorites(db, user_id)
+
+
+def _profile_stats(ctx: UserContext) -> dict:
+    """/profile/stats ile aynı payload"""
+    profile = ctx.profile
+    if not profile:
+        return {"has_profile": False}
+
+    calcs = ctx.calculations()
+    return {
+        "has_profile": True,
+        "profile": {
+            "height_cm": profile.height_cm,
+            "weight_kg": profile.weight_kg,
+            "gender": profile.gender,
+            "age": datetime.now().year - profile.birth_year
+        },
+        "activity": {
+            "steps": ctx.steps,
+            "level": calcs["activity_level"],
+            "multiplier": calcs["activity_multiplier"]
+        },
+        "calculations": {
+            "bmr": calcs["bmr"],
+            "tdee": calcs["tdee"],
+            "target_calories": calcs["target_calories"],
+            "target_protein": calcs["target_protein"],
+            "goal_type": ctx.goal_type
+        }
+    }
+
+
+@router.get("")
+def get_dashboard(
+    target_date: Optional[date] = Query(None, description="Tarih (default: bugün)"),
+    user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
+    db: Session = Depends(get_db)
+):
+    """
+    Dashboard widget'larının hepsi tek yanıtta.
+    Hedef/profil/aktivite bir kez yüklenir; günlük toplamlar, streak, loglar
+    ve favoriler paralel okunur (slot yoksa db üzerinde sırayla). Öneriler
+    kalan kaloriye bağlı olduğu için toplamlardan sonra çalışır.
+    """
+    today = date.today()
+    target_date = target_date or today
+    week_start = target_date - timedelta(days=6)
+
+    # 1️⃣ Bağımsız okumalar (paralel)
+    weekly_future = _submit(db, get_totals_by_date, user_id, week_start, target_date)
+    today_future = None
+    if not (week_start <= today <= target_date):
+        today_future = _submit(db, get_totals_by_date, user_id, today, today)
+    streak_future = _submit(db, _load_streak, user_id)
+    logs_future = _submit(db, _load_logs, user_id, target_date)
+    favorites_future = _submit(db, _load_favorites, user_id)
+
+    weekly_totals = weekly_future.result()
+    today_totals_map = today_future.result() if today_future else weekly_totals
+    target_totals = weekly_totals.get(target_date, empty_totals())
+    today_totals = today_totals_map.get(today, empty_totals())
+
+    # 2️⃣ Kalan hedefe göre öneriler (bugünkü toplamlara bağlı)
+    remaining_cal = max(0, ctx.calorie_target - today_totals["calories"])
+    remaining_prot = max(0, ctx.protein_target - today_totals["protein"])
+    suggestions = build_meal_suggestions(db, remaining_cal, remaining_prot)
+
+    weekly = []
+    for i in range(6, -1, -1):
+        day = target_date - timedelta(days=i)
+        day_totals = weekly_totals.get(day, empty_totals())
+        weekly.append({
+            "date": day.isoformat(),
+            "calories": round(day_totals["calories"], 1),
+            "protein": round(day_totals["protein"], 1)
+        })
+
+    goals = {
+        "daily_calorie_target": ctx.calorie_target,
+        "daily_protein_target": ctx.protein_target,
+        "goal_type": ctx.goal_type
+    }
+
+    return {
+        "date": target_date.isoformat(),
+        "has_profile": ctx.profile is not None,
+        "goals": goals,
+        "profile_stats": _profile_stats(ctx),
+        "progress": build_daily_progress(target_date, ctx.calorie_target, ctx.protein_target, target_totals),
+        "warnings": build_daily_warnings(ctx, today_totals["calories"], today_totals["protein"]),
+        "streak": build_streak_status(streak_future.result(), today_totals["log_count"] > 0),
+        "suggestions": suggestions,
+        "logs": logs_future.result(),
+        "favorites": favorites_future.result(),
+        "weekly": weekly
+    }
@@ -9,8 +9,11 @@ from datetime import date, timedelta
 from typing import Optional, List
 
 from app.db.session import get_db
-from app.db.models import UserStreak, MealLog, Meal, UserGoals
+from app.db.models import UserStreak, MealLog, Meal
 from app.core.security import get_current_user_id
+from app.services.user_context import UserContext, get_user_context
+from app.services.streaks import lock_streak, recompute_user_streak
+from app.services.leaderboard import streak_leaderboard
 
 router = APIRouter(prefix="/engagement", tags=["engagement"])
 
@@ -21,43 +24,45 @@ def get_streak(
     user_id: int = Depends(get_current_user_id)
 ):
     """Kullanıcının günlük streak bilgisini getir"""
+    # Sadece okuma: satır ilk log yazımında oluşur (yoksa build_streak_status "new" döner)
     streak = db.query(UserStreak).filter(UserStreak.user_id == user_id).first()
     
-    if not streak:
-        # İlk kez streak kontrolü, oluştur
-        streak = UserStreak(user_id=user_id, current_streak=0, max_streak=0)
-        db.add(streak)
-        db.commit()
-        db.refresh(streak)
-    
-    # Streak durumunu kontrol et ve güncelle
-    today = date.today()
-    yesterday = today - timedelta(days=1)
-    
     # Bugün log var mı?
     today_has_log = db.query(MealLog).filter(
         MealLog.user_id == user_id,
-        MealLog.log_date == today
+        MealLog.log_date == date.today()
     ).first() is not None
     
+    return build_streak_status(streak, today_has_log)
+
+
+def build_streak_status(streak: Optional[UserStreak], today_has_log: bool) -> dict:
+    """Streak satırından mesaj/durum payload'u (DB erişimi yok)"""
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    
+    current_streak = streak.current_streak if streak else 0
+    max_streak = streak.max_streak if streak else 0
+    last_logged_date = streak.last_logged_date if streak else None
+    
     # Streak mesajı
     if today_has_log:
-        message = f"🔥 {streak.current_streak} gündür düzenlisin!"
+        message = f"🔥 {current_streak} gündür düzenlisin!"
         status = "active"
-    elif streak.last_logged_date == yesterday:
+    elif last_logged_date == yesterday:
         message = "Bugün henüz bir şey girmedin. Streak'ini koru!"
         status = "warning"
-    elif streak.last_logged_date and streak.last_logged_date < yesterday:
-        message = f"Streak kırıldı! Son giriş: {streak.last_logged_date}"
+    elif last_logged_date and last_logged_date < yesterday:
+        message = f"Streak kırıldı! Son giriş: {last_logged_date}"
         status = "broken"
     else:
         message = "Bugün ilk öğününü ekle ve streak başlat!"
         status = "new"
     
     return {
-        "current_streak": streak.current_streak,
-        "max_streak": streak.max_streak,
-        "last_logged_date": streak.last_logged_date.isoformat() if streak.last_logged_date else None,
+        "current_streak": current_streak,
+        "max_streak": max_streak,
+        "last_logged_date": last_logged_date.isoformat() if last_logged_date else None,
         "today_has_log": today_has_log,
         "message": message,
         "status": status
@@ -69,38 +74,19 @@ def update_streak(
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    """Öğün eklendiğinde streak güncelle (logs.py'dan çağrılır)"""
-    today = date.today()
-    yesterday = today - timedelta(days=1)
-    
-    streak = db.query(UserStreak).filter(UserStreak.user_id == user_id).first()
-    
-    if not streak:
-        streak = UserStreak(user_id=user_id, current_streak=1, max_streak=1, last_logged_date=today)
-        db.add(streak)
-    else:
-        if streak.last_logged_date == today:
-            # Bugün zaten güncellendi
-            pass
-        elif streak.last_logged_date == yesterday:
-            # Streak devam ediyor
-            streak.current_streak += 1
-            if streak.current_streak > streak.max_streak:
-                streak.max_streak = streak.current_streak
-        else:
-            # Streak kırıldı, yeniden başla
-            streak.current_streak = 1
-        
-        streak.last_logged_date = today
-    
+    """Streak'i log tarihlerinden yeniden hesapla (POST /logs zaten günceller)"""
+    lock_streak(db, user_id)
+    streak = recompute_user_streak(db, user_id)
     db.commit()
+    streak_leaderboard.update(user_id, streak.current_streak, streak.max_streak, streak.last_logged_date)
     return {"ok": True, "current_streak": streak.current_streak}
 
 
 @router.get("/weekly-summary")
 def get_weekly_summary(
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context)
 ):
     """Son 7 günün özeti"""
     today = date.today()
@@ -140,9 +126,8 @@ def get_weekly_summary(
         })
     
     # Hedefleri al
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    calorie_target = goals.daily_calorie_target if goals else 2000
-    protein_target = goals.daily_protein_target if goals else 100
+    calorie_target = ctx.calorie_target
+    protein_target = ctx.protein_target
     
     # En iyi ve en kötü gün
     best_day = max(daily_stats, key=lambda x: x["protein"]) if daily_stats else None
@@ -169,7 +154,8 @@ def get_weekly_summary(
 @router.get("/meal-suggestions")
 def get_meal_suggestions(
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context)
 ):
     """Kalan hedefe göre yemek önerisi (AI'sız, akıllı query)"""
     today = date.today()
@@ -189,13 +175,17 @@ def get_meal_suggestions(
     consumed_prot = float(today_totals.protein or 0)
     
     # Hedefleri al
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    calorie_target = goals.daily_calorie_target if goals else 2000
-    protein_target = goals.daily_protein_target if goals else 100
+    calorie_target = ctx.calorie_target
+    protein_target = ctx.protein_target
     
     remaining_cal = max(0, calorie_target - consumed_cal)
     remaining_prot = max(0, protein_target - consumed_prot)
     
+    return build_meal_suggestions(db, remaining_cal, remaining_prot)
+
+
+def build_meal_suggestions(db: Session, remaining_cal: float, remaining_prot: float) -> dict:
+    """Kalan kaloriye sığan rastgele 5 öğün"""
     # Akıllı sorgu: Kalan kaloriye sığan yemekler, rastgele sıralanmış
     from sqlalchemy import text
     suggestions = db.query(Meal).filter(
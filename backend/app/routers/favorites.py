@@ -1,31 +1,65 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
+from typing import List, Optional
 
 from app.db.session import get_db
-from app.db.models import FavoriteMeal
 from app.core.security import get_current_user_id
+from app.core.idempotency import run_idempotent
+from app.services.favorites import MAX_BULK, add_favorites, list_favorites, remove_favorites
 
 router = APIRouter(prefix="/favorites", tags=["favorites"])
 
+
+class BulkFavoritesRequest(BaseModel):
+    meal_ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK)
+
+
 @router.post("")
 def add_favorite(
     meal_id: int,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Favoriye ekle (zaten favoriyse tekrar eklenmez)"""
+    def write():
+        added, missing = add_favorites(db, user_id, [meal_id])
+        if missing:
+            raise HTTPException(status_code=404, detail="Yemek bulunamadı")
+        return {"ok": True, "added": added > 0}
+
+    return run_idempotent(db, user_id, "POST /favorites", idempotency_key, {"meal_id": meal_id}, write)
+
+
+@router.post("/bulk")
+def add_favorites_bulk(
+    req: BulkFavoritesRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Birden fazla yemeği favoriye ekle (tek upsert)"""
+    added, missing = add_favorites(db, user_id, req.meal_ids)
+    return {"ok": True, "added": added, "not_found": missing}
+
+
+@router.post("/bulk-delete")
+def remove_favorites_bulk(
+    req: BulkFavoritesRequest,
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    fav = FavoriteMeal(user_id=user_id, meal_id=meal_id)
-    db.add(fav)
-    db.commit()
-    return {"ok": True}
+    """Birden fazla favoriyi kaldır (tek DELETE)"""
+    return {"ok": True, "removed": remove_favorites(db, user_id, req.meal_ids)}
+
 
 @router.get("")
-def list_favorites(
+def get_favorites(
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    return db.query(FavoriteMeal).filter(
-        FavoriteMeal.user_id == user_id
-    ).all()
+    """Favoriler yemek adı ve makrolarıyla"""
+    return list_favorites(db, user_id)
 
 
 @router.delete("/{meal_id}")
@@ -35,14 +69,7 @@ def remove_favorite(
     db: Session = Depends(get_db)
 ):
     """Favoriyi kaldır"""
-    fav = db.query(FavoriteMeal).filter(
-        FavoriteMeal.user_id == user_id,
-        FavoriteMeal.meal_id == meal_id
-    ).first()
-    
-    if fav:
-        db.delete(fav)
-        db.commit()
+    if remove_favorites(db, user_id, [meal_id]):
         return {"ok": True}
     
     return {"ok": False, "error": "Favori bulunamadı"}
@@ -0,0 +1,161 @@
+"""
+Streak Leaderboard Router
+Global ve arkadaş kapsamlı current_streak / max_streak sıralaması.
+Arkadaş kapsamı sadece karşı tarafın kabul ettiği arkadaşlıkları içerir.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import false, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.db.models import Friendship, User
+from app.core.security import get_current_user_id
+from app.services.leaderboard import rank_group, streak_leaderboard
+
+router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+
+
+def _friend_ids(db: Session, user_id: int) -> list:
+    return [
+        f for (f,) in db.query(Friendship.friend_id).filter(
+            Friendship.user_id == user_id, Friendship.accepted == true()
+        ).all()
+    ]
+
+
+@router.get("")
+def get_leaderboard(
+    metric: str = Query("current_streak", pattern="^(current_streak|max_streak)$"),
+    scope: str = Query("global", pattern="^(global|friends)$"),
+    limit: int = Query(10, ge=1, le=100, description="İlk N kullanıcı"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Streak sıralaması: ilk N ve kullanıcının kendi sırası"""
+    streak_leaderboard.ensure(db)
+
+    if scope == "friends":
+        ranked = rank_group(streak_leaderboard.scores(metric, _friend_ids(db, user_id) + [user_id]))
+        total = len(ranked)
+        me = next((rank, score) for rank, u, score in ranked if u == user_id)
+        top = ranked[:limit]
+    else:
+        top, total = streak_leaderboard.top(metric, limit)
+        me = streak_leaderboard.rank(metric, user_id)
+
+    return {
+        "metric": metric,
+        "scope": scope,
+        "total_users": total,
+        "top": [
+            {"rank": rank, "user_id": u, "score": score, "is_me": u == user_id}
+            for rank, u, score in top
+        ],
+        "me": {"rank": me[0], "score": me[1]}
+    }
+
+
+@router.get("/friends")
+def list_friends(
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Arkadaş listesi (kabul edilmiş)"""
+    rows = db.query(User.id, User.email).join(Friendship, Friendship.friend_id == User.id).filter(
+        Friendship.user_id == user_id,
+        Friendship.accepted == true()
+    ).all()
+    return [{"user_id": u, "email": email} for u, email in rows]
+
+
+@router.get("/friends/requests")
+def list_friend_requests(
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Bekleyen gelen arkadaşlık istekleri"""
+    rows = db.query(User.id, User.email).join(Friendship, Friendship.user_id == User.id).filter(
+        Friendship.friend_id == user_id,
+        Friendship.accepted == false()
+    ).all()
+    return [{"user_id": u, "email": email} for u, email in rows]
+
+
+def _accept(db: Session, user_id: int, requester_id: int):
+    """Bekleyen isteği iki yönlü, kabul edilmiş arkadaşlığa çevir (commit etmez)"""
+    db.query(Friendship).filter(
+        Friendship.user_id == requester_id, Friendship.friend_id == user_id
+    ).update({Friendship.accepted: True}, synchronize_session=False)
+    reverse = db.get(Friendship, (user_id, requester_id))
+    if reverse is None:
+        db.add(Friendship(user_id=user_id, friend_id=requester_id, accepted=True))
+    else:
+        reverse.accepted = True
+
+
+@router.post("/friends")
+def add_friend(
+    email: str = Query(..., description="Arkadaşın e-posta adresi"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Arkadaşlık isteği gönder. Karşı taraf kabul edene kadar iki kullanıcı da
+    birbirinin sıralamasında görünmez. Cevap e-postanın kayıtlı olup
+    olmadığını açığa vermez; karşı taraf zaten istek gönderdiyse arkadaşlık
+    kurulur.
+    """
+    friend = db.query(User.id).filter(User.email == email).first()
+    if friend is not None and friend.id == user_id:
+        raise HTTPException(status_code=400, detail="Kendini arkadaş olarak ekleyemezsin")
+
+    if friend is not None:
+        incoming = db.get(Friendship, (friend.id, user_id))
+        if incoming is not None and not incoming.accepted:
+            _accept(db, user_id, friend.id)
+        elif incoming is None and db.get(Friendship, (user_id, friend.id)) is None:
+            db.add(Friendship(user_id=user_id, friend_id=friend.id, accepted=False))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Eşzamanlı istek - satır zaten var
+            db.rollback()
+    return {"ok": True, "detail": "Kullanıcı kayıtlıysa arkadaşlık isteği gönderildi"}
+
+
+@router.post("/friends/{requester_id}/accept")
+def accept_friend(
+    requester_id: int,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Gelen arkadaşlık isteğini kabul et"""
+    request = db.get(Friendship, (requester_id, user_id))
+    if request is None:
+        raise HTTPException(status_code=404, detail="Arkadaşlık isteği bulunamadı")
+    if not request.accepted:
+        _accept(db, user_id, requester_id)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Eşzamanlı kabul - satır zaten var
+            db.rollback()
+    return {"ok": True, "friend_id": requester_id}
+
+
+@router.delete("/friends/{friend_id}")
+def remove_friend(
+    friend_id: int,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Arkadaşlığı kaldır / isteği reddet veya geri çek (iki yönde)"""
+    deleted = db.query(Friendship).filter(
+        ((Friendship.user_id == user_id) & (Friendship.friend_id == friend_id)) |
+        ((Friendship.user_id == friend_id) & (Friendship.friend_id == user_id))
+    ).delete(synchronize_session=False)
+    db.commit()
+    if not deleted:
+        return {"ok": False, "error": "Arkadaş bulunamadı"}
+    return {"ok": True}
@@ -1,87 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import date, timedelta
+from datetime import date
+from typing import Optional
 import logging
 
-from app.db.session import get_db
-from app.db.models import MealLog, UserStreak
+from app.db.session import engine, get_db
 from app.core.security import get_current_user_id
+from app.core.idempotency import run_idempotent
+from app.services.meal_logs import (
+    JSON_MAX_DAYS, add_meal_log, delete_meal_log, log_history_query, log_row, stream_log_history
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/logs", tags=["logs"])
 
 
-def update_user_streak(db: Session, user_id: int, log_date: date):
-    """Streak güncelleme mantığı"""
-    today = log_date
-    yesterday = today - timedelta(days=1)
-    
-    streak = db.query(UserStreak).filter(UserStreak.user_id == user_id).first()
-    
-    if not streak:
-        streak = UserStreak(user_id=user_id, current_streak=1, max_streak=1, last_logged_date=today)
-        db.add(streak)
-    else:
-        if streak.last_logged_date == today:
-            # Bugün zaten güncellendi
-            return streak
-        elif streak.last_logged_date == yesterday:
-            # Streak devam ediyor
-            streak.current_streak += 1
-        else:
-            # Streak kırıldı veya ilk kez
-            streak.current_streak = 1
-        
-        if streak.current_streak > streak.max_streak:
-            streak.max_streak = streak.current_streak
-        streak.last_logged_date = today
-    
-    db.commit()
-    return streak
-
-
 @router.post("")
 def add_log(
     meal_id: int,
     portion: float = 1.0,
     log_date: date = date.today(),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    """Yemek logu ekle (transaction-safe, streak güncellemeli)"""
-    try:
-        log = MealLog(
-            user_id=user_id,
-            meal_id=meal_id,
-            portion=portion,
-            log_date=log_date
-        )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-        
-        # Streak güncelle
-        streak = update_user_streak(db, user_id, log_date)
-        
-        logger.info(f"Meal log added: user={user_id}, meal={meal_id}, date={log_date}, streak={streak.current_streak}")
-        return {"ok": True, "log_id": log.id, "streak": streak.current_streak}
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Meal log failed: user={user_id}, meal={meal_id}, error={str(e)}")
-        raise HTTPException(status_code=500, detail="Öğün kaydedilemedi")
+    """Yemek logu ekle (transaction-safe, streak güncellemeli, Idempotency-Key destekli)"""
+    def write():
+        try:
+            log, streak = add_meal_log(db, user_id, meal_id, portion, log_date)
+            logger.info(f"Meal log added: user={user_id}, meal={meal_id}, date={log_date}, streak={streak.current_streak}")
+            return {"ok": True, "log_id": log.id, "streak": streak.current_streak}
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Meal log failed: user={user_id}, meal={meal_id}, error={str(e)}")
+            raise HTTPException(status_code=500, detail="Öğün kaydedilemedi")
+
+    params = {"meal_id": meal_id, "portion": portion, "log_date": log_date}
+    return run_idempotent(db, user_id, "POST /logs", idempotency_key, params, write)
 
 @router.get("")
 def get_logs(
-    log_date: date,
+    log_date: Optional[date] = Query(None, description="Tek gün (start/end yerine)"),
+    start: Optional[date] = Query(None, description="Aralık başlangıcı (dahil)"),
+    end: Optional[date] = Query(None, description="Aralık sonu (dahil)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson: satır satır akış (uzun aralıklar)"),
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    logs = db.query(MealLog).filter(
-        MealLog.user_id == user_id,
-        MealLog.log_date == log_date
-    ).all()
+    """
+    Loglar yemek adı / tipi ve porsiyonlu makrolarla (tek JOIN sorgusu).
+    format=ndjson cevabı server-side cursor'dan akıtır.
+    """
+    if log_date:
+        start = end = log_date
+    if not start or not end:
+        raise HTTPException(status_code=400, detail="log_date veya start/end gerekli")
+    if start > end:
+        raise HTTPException(status_code=400, detail="start, end'den sonra olamaz")
 
-    return logs
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_log_history(engine, user_id, start, end),
+            media_type="application/x-ndjson"
+        )
+
+    if (end - start).days + 1 > JSON_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"JSON için en fazla {JSON_MAX_DAYS} gün; daha uzun aralıklar için format=ndjson kullanın"
+        )
+    return [log_row(row) for row in db.execute(log_history_query(user_id, start, end))]
 
 
 @router.delete("/{log_id}")
@@ -91,14 +80,7 @@ def delete_log(
     db: Session = Depends(get_db)
 ):
     """Öğün kaydını sil"""
-    log = db.query(MealLog).filter(
-        MealLog.id == log_id,
-        MealLog.user_id == user_id
-    ).first()
-    
-    if log:
-        db.delete(log)
-        db.commit()
+    if delete_meal_log(db, user_id, log_id) is not None:
         return {"ok": True}
     
     return {"ok": False, "error": "Log bulunamadı"}
@@ -1,14 +1,32 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
+
+import numpy as np
 
 from app.db.session import get_db
 from app.db.models import Meal
 from app.core.security import get_current_user_id
+from app.services.catalog import IndexNotReady
+from app.services.meal_similarity import similarity_index_cache
+from app.services.meal_facets import meal_facets_cache
+from app.services.meal_search import search_index_cache, top_matches
+from app.services.meal_vectors import meal_vectors_cache
 
 router = APIRouter(prefix="/meals", tags=["meals"])
 
 
+def _search_index(db: Session):
+    """Arama indeksi; kurulurken 503 (istek kurulumu beklemez)"""
+    try:
+        return search_index_cache.get(db)
+    except IndexNotReady:
+        raise HTTPException(
+            status_code=503, detail="Arama indeksi hazırlanıyor, lütfen tekrar deneyin",
+            headers={"Retry-After": "10"}
+        )
+
+
 @router.get("")
 def list_meals(
     search: Optional[str] = Query(None, description="Yemek adında arama"),
@@ -61,3 +79,142 @@ def list_meals(
         for m in meals
     ]
 
+
+@router.get("/search")
+def search_meals(
+    q: str = Query(..., min_length=1, max_length=200, description="Serbest metin: 'high protein breakfast', 'light chicken dinner'"),
+    min_calories: Optional[float] = Query(None, description="Minimum kalori"),
+    max_calories: Optional[float] = Query(None, description="Maksimum kalori"),
+    min_protein: Optional[float] = Query(None, description="Minimum protein (g)"),
+    max_carbs: Optional[float] = Query(None, description="Maksimum karbonhidrat (g)"),
+    max_fat: Optional[float] = Query(None, description="Maksimum yağ (g)"),
+    meal_type: Optional[str] = Query(None, description="Öğün tipi: Breakfast, Lunch, Dinner, Snack"),
+    diet_type: Optional[str] = Query(None, description="Diyet tipi"),
+    limit: int = Query(20, ge=1, le=100, description="Sonuç limiti"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Anlamsal yemek araması: ad + özellikler üzerinde TF-IDF benzerliği,
+    makro filtreleri bellekteki vektörlerde uygulanır.
+    """
+    index = _search_index(db)
+    vectors = meal_vectors_cache.get(db)
+
+    mask = vectors.category_mask("meal_type", [meal_type] if meal_type else [])
+    mask &= vectors.category_mask("diet_type", [diet_type] if diet_type else [])
+    calories, protein, carbs, fat = vectors.macros.T
+    if min_calories is not None:
+        mask &= calories >= min_calories
+    if max_calories is not None:
+        mask &= calories <= max_calories
+    if min_protein is not None:
+        mask &= protein >= min_protein
+    if max_carbs is not None:
+        mask &= carbs <= max_carbs
+    if max_fat is not None:
+        mask &= fat <= max_fat
+
+    matches = top_matches(index, vectors, q, mask, limit)
+    meals = {
+        m.meal_id: m for m in db.query(Meal).filter(Meal.meal_id.in_([n for n, _ in matches])).all()
+    }
+    return {
+        "query": q,
+        "results": [
+            {
+                "meal_id": n,
+                "meal_name": meals[n].meal_name,
+                "calories": meals[n].calories,
+                "protein_g": meals[n].protein_g,
+                "carbs_g": meals[n].carbs_g,
+                "fat_g": meals[n].fat_g,
+                "meal_type": meals[n].meal_type,
+                "cuisine": meals[n].cuisine,
+                "diet_type": meals[n].diet_type,
+                "score": round(score, 4)
+            }
+            for n, score in matches
+            if n in meals
+        ]
+    }
+
+
+@router.get("/facets")
+def get_meal_facets(
+    q: Optional[str] = Query(None, max_length=200, description="Serbest metin araması (GET /meals/search ile aynı)"),
+    cuisine: Optional[List[str]] = Query(None, description="Mutfak (birden fazla verilebilir)"),
+    diet_type: Optional[List[str]] = Query(None, description="Diyet tipi"),
+    meal_type: Optional[List[str]] = Query(None, description="Öğün tipi"),
+    cooking_method: Optional[List[str]] = Query(None, description="Pişirme yöntemi"),
+    calorie_bucket: Optional[List[str]] = Query(None, description="Kalori aralığı: 0-200, 200-400, ..., 800+"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Seçili filtreler altında facet başına değer sayıları.
+    Bir facet'in sayıları diğer facet'lerin seçimleriyle hesaplanır.
+    """
+    facets = meal_facets_cache.get(db)
+    base = None
+    if q:
+        index = _search_index(db)
+        matched = index.meal_ids[index.scores(q) > 0]
+        base = facets.mask_bitmap(np.isin(facets.meal_ids, matched))
+
+    return facets.counts(
+        {
+            "cuisine": cuisine,
+            "diet_type": diet_type,
+            "meal_type": meal_type,
+            "cooking_method": cooking_method,
+            "calorie_bucket": calorie_bucket
+        },
+        base
+    )
+
+
+@router.get("/{meal_id}/similar")
+def get_similar_meals(
+    meal_id: int,
+    limit: int = Query(10, ge=1, le=50, description="Sonuç limiti"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Besin profili ve cuisine/diet/meal_type'a göre en benzer yemekler.
+    Önceden hesaplanmış komşu tablosundan okunur.
+    """
+    try:
+        index = similarity_index_cache.get(db)
+    except IndexNotReady:
+        raise HTTPException(
+            status_code=503, detail="Benzerlik indeksi hazırlanıyor, lütfen tekrar deneyin",
+            headers={"Retry-After": "10"}
+        )
+    neighbors = index.similar(meal_id, limit)
+    if neighbors is None:
+        raise HTTPException(status_code=404, detail="Yemek bulunamadı")
+
+    meals = {
+        m.meal_id: m for m in db.query(Meal).filter(Meal.meal_id.in_([n for n, _ in neighbors])).all()
+    }
+    return {
+        "meal_id": meal_id,
+        "similar": [
+            {
+                "meal_id": n,
+                "meal_name": meals[n].meal_name,
+                "calories": meals[n].calories,
+                "protein_g": meals[n].protein_g,
+                "carbs_g": meals[n].carbs_g,
+                "fat_g": meals[n].fat_g,
+                "meal_type": meals[n].meal_type,
+                "cuisine": meals[n].cuisine,
+                "diet_type": meals[n].diet_type,
+                "similarity": round(score, 4)
+            }
+            for n, score in neighbors
+            if n in meals
+        ]
+    }
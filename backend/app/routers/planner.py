@@ -0,0 +1,126 @@
+"""
+Planner Router
+Günün kalanı için kalori / makro hedefine en yakın öğün kombinasyonları
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.db.models import Meal, WeeklyMealPlan
+from app.core.config import settings
+from app.core.security import get_current_user_id
+from app.services.user_context import UserContext, get_user_context
+from app.services.daily_totals import get_day_totals
+from app.services.meal_vectors import MACRO_COLUMNS, meal_vectors_cache
+from app.services.meal_planner import DEFAULT_PORTIONS, MAX_SLOTS, plan_meals
+from app.services.weekly_planner import SLOT_SHARES
+
+router = APIRouter(prefix="/planner", tags=["planner"])
+
+
+@router.get("/today")
+def plan_rest_of_day(
+    slots: Optional[List[str]] = Query(None, description="Öğün tipleri, örn. slots=Lunch&slots=Dinner (max 3)"),
+    diet_type: Optional[List[str]] = Query(None, description="İzin verilen diet_type'lar"),
+    portions: Optional[List[float]] = Query(None, description="Porsiyon katları (default: 0.5, 1, 1.5, 2)"),
+    max_meals: int = Query(MAX_SLOTS, ge=1, le=MAX_SLOTS, description="slots yoksa en fazla öğün"),
+    limit: int = Query(5, ge=1, le=20, description="Plan sayısı"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context)
+):
+    """
+    Bugünkü kalan kalori / protein / karbonhidrat / yağa en yakın 1-3
+    öğünlük planlar (kalori üst sınırı %10 toleranslı).
+    """
+    if slots and len(slots) > MAX_SLOTS:
+        raise HTTPException(status_code=400, detail=f"En fazla {MAX_SLOTS} öğün planlanabilir")
+    if portions and any(p <= 0 or p > 5 for p in portions):
+        raise HTTPException(status_code=400, detail="Porsiyon 0-5 arasında olmalı")
+
+    remaining = ctx.remaining(get_day_totals(db, user_id, date.today()))
+    vectors = meal_vectors_cache.get(db)
+    result = plan_meals(
+        vectors, remaining,
+        slots=slots,
+        diet_types=diet_type,
+        portions=portions or DEFAULT_PORTIONS,
+        max_meals=max_meals,
+        limit=limit,
+        budget_ms=settings.MEAL_PLAN_BUDGET_MS
+    )
+
+    meal_ids = {int(vectors.meal_ids[pos]) for _, plan in result.plans for pos, _ in plan}
+    names = dict(
+        db.query(Meal.meal_id, Meal.meal_name).filter(Meal.meal_id.in_(meal_ids)).all()
+    ) if meal_ids else {}
+
+    plans = []
+    for error, plan in result.plans:
+        items = []
+        for pos, portion in plan:
+            macros = (vectors.macros[pos] * portion).tolist()
+            items.append({
+                "meal_id": int(vectors.meal_ids[pos]),
+                "meal_name": names.get(int(vectors.meal_ids[pos])),
+                "meal_type": vectors.meal_type_names[vectors.meal_type_codes[pos]] or None,
+                "portion": portion,
+                **{col: round(value, 1) for col, value in zip(MACRO_COLUMNS, macros)}
+            })
+        plans.append({
+            "meals": items,
+            "totals": {col: round(sum(i[col] for i in items), 1) for col in MACRO_COLUMNS},
+            "error": round(error, 4)
+        })
+
+    return {
+        "remaining": {key: round(value, 1) for key, value in remaining.items()},
+        "plans": plans,
+        "complete": result.complete,
+        "evaluated": result.evaluated,
+        "elapsed_ms": round(result.elapsed_ms, 1)
+    }
+
+
+@router.get("/week")
+def get_weekly_plan(
+    week_start: Optional[date] = Query(None, description="Haftanın Pazartesi'si (default: bu hafta)"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Batch job'un ürettiği 7 günlük plan (scripts/generate_weekly_plans.py)"""
+    if week_start is None:
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+
+    rows = db.query(
+        WeeklyMealPlan.plan_date, WeeklyMealPlan.meal_type, WeeklyMealPlan.portion,
+        Meal.meal_id, Meal.meal_name, Meal.calories, Meal.protein_g, Meal.carbs_g, Meal.fat_g
+    ).join(
+        Meal, Meal.meal_id == WeeklyMealPlan.meal_id
+    ).filter(
+        WeeklyMealPlan.user_id == user_id,
+        WeeklyMealPlan.week_start == week_start
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Bu hafta için plan bulunamadı")
+
+    slot_order = list(SLOT_SHARES)
+    days = {}
+    for row in sorted(rows, key=lambda r: (r.plan_date, slot_order.index(r.meal_type) if r.meal_type in slot_order else len(slot_order))):
+        day = days.setdefault(row.plan_date, {"date": row.plan_date.isoformat(), "meals": [], "totals": dict.fromkeys(MACRO_COLUMNS, 0.0)})
+        meal = {
+            "meal_type": row.meal_type,
+            "meal_id": row.meal_id,
+            "meal_name": row.meal_name,
+            "portion": row.portion,
+            **{col: round((getattr(row, col) or 0) * row.portion, 1) for col in MACRO_COLUMNS}
+        }
+        day["meals"].append(meal)
+        for col in MACRO_COLUMNS:
+            day["totals"][col] = round(day["totals"][col] + meal[col], 1)
+
+    return {"week_start": week_start.isoformat(), "days": list(days.values())}
@@ -4,16 +4,10 @@ from pydantic import BaseModel, Field
 from datetime import date, datetime
 
 from app.db.session import get_db
-from app.db.models import UserProfile, DailyActivity, UserGoals
+from app.db.models import UserProfile, DailyActivity
 from app.core.security import get_current_user_id
-from app.services.metabolism import (
-    calculate_bmr,
-    calculate_activity_multiplier,
-    calculate_tdee,
-    calculate_daily_target,
-    calculate_protein_target,
-    get_full_calculations
-)
+from app.services.metabolism import calculate_bmr
+from app.services.user_context import UserContext, get_user_context, invalidate_user_context
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -32,11 +26,10 @@ class ActivityRequest(BaseModel):
 
 @router.get("")
 def get_profile(
-    user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    ctx: UserContext = Depends(get_user_context)
 ):
     """Kullanıcı profilini getir"""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    profile = ctx.profile
     
     if not profile:
         return {"has_profile": False}
@@ -81,6 +74,7 @@ def create_or_update_profile(
         db.add(profile)
     
     db.commit()
+    invalidate_user_context(user_id)
     
     current_year = datetime.now().year
     age = current_year - req.birth_year
@@ -101,29 +95,18 @@ def create_or_update_profile(
 def log_activity(
     req: ActivityRequest,
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """Günlük aktivite kaydet ve BMR/TDEE/hedefi DB'ye kaydet"""
     activity_date = req.activity_date or date.today()
     
-    # Profili al
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    if not profile:
+    # Profil zorunlu
+    if not ctx.profile:
         raise HTTPException(status_code=400, detail="Önce profil oluşturun")
     
-    # Hedefi al
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    goal_type = goals.goal_type if goals else "koruma"
-    
     # Tüm hesapları tek seferde yap (metabolism service)
-    calcs = get_full_calculations(
-        weight_kg=profile.weight_kg,
-        height_cm=profile.height_cm,
-        birth_year=profile.birth_year,
-        gender=profile.gender,
-        steps=req.steps,
-        goal_type=goal_type
-    )
+    calcs = ctx.calculations(steps=req.steps)
     
     # Mevcut kaydı güncelle veya yeni kayıt
     activity = db.query(DailyActivity).filter(
@@ -150,6 +133,7 @@ def log_activity(
         db.add(activity)
     
     db.commit()
+    invalidate_user_context(user_id)
     
     return {
         "ok": True,
@@ -167,22 +151,25 @@ def log_activity(
 def get_activity(
     activity_date: date = None,
     user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context),
     db: Session = Depends(get_db)
 ):
     """Günlük aktivite getir (önce DB'den, yoksa hesapla)"""
     activity_date = activity_date or date.today()
     
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    if not profile:
+    if not ctx.profile:
         return {"has_profile": False}
     
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    goal_type = goals.goal_type if goals else "koruma"
+    goal_type = ctx.goal_type
     
-    activity = db.query(DailyActivity).filter(
-        DailyActivity.user_id == user_id,
-        DailyActivity.activity_date == activity_date
-    ).first()
+    # Bugün context'te hazır, geçmiş günler için ayrı sorgu
+    if activity_date == ctx.activity_date:
+        activity = ctx.activity
+    else:
+        activity = db.query(DailyActivity).filter(
+            DailyActivity.user_id == user_id,
+            DailyActivity.activity_date == activity_date
+        ).first()
     
     # DB'de kayıtlı değerler varsa onları döndür (historical accuracy)
     if activity and activity.bmr and activity.tdee:
@@ -199,14 +186,7 @@ def get_activity(
     
     # Yoksa runtime hesapla
     steps = activity.steps if activity else 0
-    calcs = get_full_calculations(
-        weight_kg=profile.weight_kg,
-        height_cm=profile.height_cm,
-        birth_year=profile.birth_year,
-        gender=profile.gender,
-        steps=steps,
-        goal_type=goal_type
-    )
+    calcs = ctx.calculations(steps=steps)
     
     return {
         "steps": steps,
@@ -222,36 +202,20 @@ def get_activity(
 
 @router.get("/stats")
 def get_full_stats(
-    user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    ctx: UserContext = Depends(get_user_context)
 ):
     """Tam kullanıcı istatistikleri (BMR, TDEE, hedef)"""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    profile = ctx.profile
     if not profile:
         return {"has_profile": False}
     
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    goal_type = goals.goal_type if goals else "koruma"
-    
-    today = date.today()
-    activity = db.query(DailyActivity).filter(
-        DailyActivity.user_id == user_id,
-        DailyActivity.activity_date == today
-    ).first()
-    
-    steps = activity.steps if activity else 0
+    goal_type = ctx.goal_type
+    steps = ctx.steps
     
     current_year = datetime.now().year
     age = current_year - profile.birth_year
     
-    calcs = get_full_calculations(
-        weight_kg=profile.weight_kg,
-        height_cm=profile.height_cm,
-        birth_year=profile.birth_year,
-        gender=profile.gender,
-        steps=steps,
-        goal_type=goal_type
-    )
+    calcs = ctx.calculations()
     
     return {
         "has_profile": True,
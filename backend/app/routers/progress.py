@@ -4,13 +4,14 @@ Kalori ve protein hedef takibi + kural tabanlı uyarılar
 """
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import date
 from typing import Optional, List
 
 from app.db.session import get_db
-from app.db.models import MealLog, Meal, UserGoals
 from app.core.security import get_current_user_id
+from app.services.user_context import UserContext, get_user_context
+from app.services.daily_totals import get_day_totals
+from app.services.metabolism import calculate_macro_targets, calculate_remaining
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 
@@ -19,7 +20,8 @@ router = APIRouter(prefix="/progress", tags=["progress"])
 def get_daily_progress(
     target_date: Optional[date] = Query(None, description="Tarih (default: bugün)"),
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context)
 ):
     """
     Günlük hedef vs alınan karşılaştırması.
@@ -29,28 +31,26 @@ def get_daily_progress(
         target_date = date.today()
     
     # Kullanıcı hedeflerini al (yoksa default)
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    calorie_target = goals.daily_calorie_target if goals else 2000
-    protein_target = goals.daily_protein_target if goals else 100
+    calorie_target = ctx.calorie_target
+    protein_target = ctx.protein_target
     
     # Bugün yenilen toplamları hesapla
-    daily_totals = db.query(
-        func.sum(Meal.calories * MealLog.portion).label("total_calories"),
-        func.sum(Meal.protein_g * MealLog.portion).label("total_protein"),
-        func.sum(Meal.carbs_g * MealLog.portion).label("total_carbs"),
-        func.sum(Meal.fat_g * MealLog.portion).label("total_fat")
-    ).join(
-        MealLog, Meal.meal_id == MealLog.meal_id
-    ).filter(
-        MealLog.user_id == user_id,
-        MealLog.log_date == target_date
-    ).first()
+    totals = get_day_totals(db, user_id, target_date)
     
-    # Değerleri al (None ise 0)
-    calories_consumed = float(daily_totals.total_calories or 0)
-    protein_consumed = float(daily_totals.total_protein or 0)
-    carbs_consumed = float(daily_totals.total_carbs or 0)
-    fat_consumed = float(daily_totals.total_fat or 0)
+    return build_daily_progress(target_date, calorie_target, protein_target, totals)
+
+
+def build_daily_progress(target_date: date, calorie_target: int, protein_target: int, totals: dict) -> dict:
+    """
+    Günlük toplamlardan progress payload'u üret (DB erişimi yok).
+    /dashboard da aynı payload'u kullanır.
+    """
+    calories_consumed = totals["calories"]
+    protein_consumed = totals["protein"]
+    carbs_consumed = totals["carbs"]
+    fat_consumed = totals["fat"]
+    carbs_target, fat_target = calculate_macro_targets(calorie_target, protein_target)
+    remaining = calculate_remaining(calorie_target, protein_target, totals)
     
     # Yüzde hesapla
     calorie_pct = round((calories_consumed / calorie_target) * 100, 1) if calorie_target > 0 else 0
@@ -75,8 +75,11 @@ def get_daily_progress(
         "protein_target": protein_target,
         "protein_consumed": round(protein_consumed, 1),
         "protein_pct": protein_pct,
+        "carbs_target": carbs_target,
         "carbs_consumed": round(carbs_consumed, 1),
+        "fat_target": fat_target,
         "fat_consumed": round(fat_consumed, 1),
+        "remaining": {key: round(value, 1) for key, value in remaining.items()},
         "status": status,
         "warnings": warnings
     }
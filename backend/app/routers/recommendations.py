@@ -0,0 +1,84 @@
+"""
+Recommendations Router
+Implicit ALS modeliyle kişisel yemek önerileri (kalan makrolara sığanlar)
+"""
+from datetime import date
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.db.models import Meal
+from app.core.security import get_current_user_id
+from app.services.user_context import UserContext, get_user_context
+from app.services.daily_totals import get_day_totals
+from app.services.meal_vectors import meal_vectors_cache
+from app.services.recommender import recommender_model_cache
+from app.services.favorites import favorite_bitsets
+
+router = APIRouter(prefix="/recommendations", tags=["recommendations"])
+
+# Üst sınır olarak uygulanan makrolar (protein hedefi aşılabilir)
+CAPPED_MACROS = ["calories", "carbs", "fat"]
+
+
+@router.get("")
+def get_recommendations(
+    limit: int = Query(10, ge=1, le=100, description="Öneri sayısı"),
+    fit_remaining: bool = Query(True, description="Sadece bugünkü kalan makrolara sığan yemekler"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+    ctx: UserContext = Depends(get_user_context)
+):
+    """
+    Kullanıcı vektörü × tüm yemek faktörleri (tek mat-vec), kalan
+    kalori / karbonhidrat / yağı aşan yemekler elenir.
+    Modelde olmayan kullanıcıya popüler yemekler döner.
+    """
+    model = recommender_model_cache.get()
+    if model is None:
+        raise HTTPException(status_code=404, detail="Öneri modeli henüz eğitilmedi")
+
+    remaining = ctx.remaining(get_day_totals(db, user_id, date.today()))
+    scores, personalized = model.scores(user_id)
+
+    vectors = meal_vectors_cache.get(db)
+    positions = vectors.positions(model.meal_ids)
+    # Model eğitildikten sonra katalogdan çıkan yemekler elenir
+    mask = positions >= 0
+    if fit_remaining:
+        mask[mask] &= vectors.within(remaining, CAPPED_MACROS)[positions[mask]]
+
+    candidates = np.flatnonzero(mask)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    meal_ids = model.meal_ids[candidates].tolist()
+    favorites = favorite_bitsets.get(db, user_id)
+    is_favorite = [favorites.contains(int(positions[c])) for c in candidates]
+    meals = {
+        m.meal_id: m for m in db.query(Meal).filter(Meal.meal_id.in_(meal_ids)).all()
+    } if meal_ids else {}
+
+    return {
+        "personalized": personalized,
+        "model_trained_at": model.metadata.get("trained_at"),
+        "remaining": {key: round(value, 1) for key, value in remaining.items()},
+        "recommendations": [
+            {
+                "meal_id": meal_id,
+                "meal_name": meals[meal_id].meal_name,
+                "calories": meals[meal_id].calories,
+                "protein_g": meals[meal_id].protein_g,
+                "carbs_g": meals[meal_id].carbs_g,
+                "fat_g": meals[meal_id].fat_g,
+                "meal_type": meals[meal_id].meal_type,
+                "is_favorite": favorite,
+                "score": round(float(score), 4)
+            }
+            for meal_id, score, favorite in zip(meal_ids, scores[candidates].tolist(), is_favorite)
+            if meal_id in meals
+        ]
+    }
@@ -0,0 +1,105 @@
+"""
+Rules Router
+Birliktelik kuralları (rule store'daki son versiyonlar)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.session import get_db
+from app.db.models import Meal
+from app.core.security import get_current_user_id
+from app.mining.attribute_rules import RULE_SET_NAME
+from app.mining.co_consumption import RULE_SET_NAMES as CO_CONSUMPTION_RULE_SETS, ITEMS_MEALS
+from app.mining.rule_store import RuleSet, rule_set_cache
+from app.mining.transactions import NUMERIC_COLUMNS, CATEGORICAL_COLUMNS, meal_attribute_items
+
+router = APIRouter(prefix="/rules", tags=["rules"])
+
+SORT_FIELDS = ("lift", "confidence", "support")
+RULE_SETS = (RULE_SET_NAME, *CO_CONSUMPTION_RULE_SETS.values())
+MEAL_ID_RULE_SET = CO_CONSUMPTION_RULE_SETS[ITEMS_MEALS]
+
+
+def _load_rule_set(rule_set: str, sort_by: str) -> RuleSet:
+    if sort_by not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail="Geçersiz sıralama alanı")
+    if rule_set not in RULE_SETS:
+        raise HTTPException(status_code=400, detail="Geçersiz kural seti")
+
+    loaded = rule_set_cache.get(rule_set)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Kural seti henüz oluşturulmadı")
+    return loaded
+
+
+def _meal_items(db: Session, meal_id: int, loaded: RuleSet) -> List[str]:
+    """Yemeği kural setinin item'larına çevir (meal_id veya attribute item'ları)"""
+    if loaded.name == MEAL_ID_RULE_SET:
+        return [f"meal_id={meal_id}"]
+
+    columns = [getattr(Meal, col) for col in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS]
+    row = db.query(*columns).filter(Meal.meal_id == meal_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Yemek bulunamadı")
+    return meal_attribute_items(row._asdict(), loaded.metadata.get("tercile_edges") or {})
+
+
+@router.get("")
+def list_rules(
+    rule_set: str = Query(RULE_SET_NAME, description="meal_attributes, co_meals, co_attributes"),
+    min_support: float = Query(0.0, ge=0, le=1, description="Minimum support"),
+    min_confidence: float = Query(0.0, ge=0, le=1, description="Minimum confidence"),
+    min_lift: float = Query(0.0, ge=0, description="Minimum lift"),
+    sort_by: str = Query("lift", description="Sıralama: lift, confidence, support"),
+    limit: int = Query(50, ge=1, le=1000, description="Sonuç limiti"),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Eşikleri geçen kurallar, sort_by'a göre azalan sırada"""
+    loaded = _load_rule_set(rule_set, sort_by)
+    rule_ids, total = loaded.query(min_support, min_confidence, min_lift, sort_by, limit)
+
+    return {
+        "rule_set": rule_set,
+        "version": loaded.version,
+        "metadata": loaded.metadata,
+        "total": total,
+        "rules": [loaded.rule_to_dict(int(r)) for r in rule_ids]
+    }
+
+
+@router.get("/match")
+def match_rules(
+    meal_id: Optional[int] = Query(None, description="Bu yemeğin item'ları"),
+    items: Optional[List[str]] = Query(None, description="Item'lar, örn. cuisine=Italian, calories_cat=low"),
+    rule_set: str = Query(RULE_SET_NAME, description="meal_attributes, co_meals, co_attributes"),
+    min_support: float = Query(0.0, ge=0, le=1, description="Minimum support"),
+    min_confidence: float = Query(0.0, ge=0, le=1, description="Minimum confidence"),
+    min_lift: float = Query(1.0, ge=0, description="Minimum lift"),
+    sort_by: str = Query("lift", description="Sıralama: lift, confidence, support"),
+    limit: int = Query(20, ge=1, le=500, description="Sonuç limiti"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Antecedent'ı verilen yemeğin/item'ların alt kümesi olan kurallar.
+    Ters indeks üzerinden çözülür; sonucu zaten kümede olan kurallar atlanır.
+    """
+    if meal_id is None and not items:
+        raise HTTPException(status_code=400, detail="meal_id veya items gerekli")
+
+    loaded = _load_rule_set(rule_set, sort_by)
+    names = list(items or [])
+    if meal_id is not None:
+        names.extend(_meal_items(db, meal_id, loaded))
+
+    item_ids = loaded.intern(names)
+    rule_ids, total = loaded.match(item_ids, min_support, min_confidence, min_lift, sort_by, limit)
+
+    return {
+        "rule_set": rule_set,
+        "version": loaded.version,
+        "items": [loaded.items[i] for i in item_ids],
+        "total": total,
+        "rules": [loaded.rule_to_dict(int(r)) for r in rule_ids]
+    }
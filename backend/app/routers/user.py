@@ -6,6 +6,7 @@ from typing import Optional
 from app.db.session import get_db
 from app.db.models import UserGoals
 from app.core.security import get_current_user_id
+from app.services.user_context import UserContext, get_user_context, invalidate_user_context
 
 router = APIRouter(prefix="/user", tags=["user"])
 
@@ -24,11 +25,10 @@ class GoalsResponse(BaseModel):
 
 @router.get("/goals", response_model=GoalsResponse)
 def get_goals(
-    user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    ctx: UserContext = Depends(get_user_context)
 ):
     """Kullanıcının hedeflerini getir"""
-    goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
+    goals = ctx.goals
     
     if not goals:
         # Varsayılan değerler döndür
@@ -71,6 +71,7 @@ def create_goals(
     
     db.commit()
     db.refresh(goals)
+    invalidate_user_context(user_id)
     
     return GoalsResponse(
         daily_calorie_target=goals.daily_calorie_target,
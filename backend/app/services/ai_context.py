@@ -11,33 +11,40 @@ Tüm hesaplamalar backend'de yapılır, AI sadece yorum yapar.
 from datetime import date, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.db.models import (
-    UserGoals, UserProfile, DailyActivity, 
-    MealLog, Meal, AIInteraction, AIAcceptance
+    DailyActivity, MealLog, Meal
 )
-from app.services.metabolism import get_full_calculations
+from app.services.ai_history import ai_history_summary
 from app.services.warnings import generate_daily_warnings
+from app.services.user_context import UserContext, get_user_context_for
 
 
-def build_ai_context(user_id: int, target_date: date, db: Session) -> dict:
+def build_ai_context(
+    user_id: int,
+    target_date: date,
+    db: Session,
+    user_ctx: Optional[UserContext] = None
+) -> dict:
     """
     AI için kullanıcı context'i oluşturur.
     
     📌 Hesap yok
     📌 Sadece backend'den gelen gerçek değerler
     
+    user_ctx: Verilirse (UserContext) hedef/profil/aktivite tekrar sorgulanmaz.
+    
     Returns:
         dict: AI'ye gönderilecek structured context
     """
+    if user_ctx is None:
+        user_ctx = get_user_context_for(user_id, db)
     
     # 1️⃣ HEDEFLER
-    user_goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
     goals = {
-        "calorie": user_goals.daily_calorie_target if user_goals else 2000,
-        "protein": user_goals.daily_protein_target if user_goals else 100,
-        "goal_type": user_goals.goal_type if user_goals else "koruma"
+        "calorie": user_ctx.calorie_target,
+        "protein": user_ctx.protein_target,
+        "goal_type": user_ctx.goal_type
     }
     
     # 2️⃣ BUGÜNKÜ TÜKETİM
@@ -56,24 +63,19 @@ def build_ai_context(user_id: int, target_date: date, db: Session) -> dict:
             today_data["fat"] += int(meal.fat_g * log.portion)
     
     # 3️⃣ AKTİVİTE VE METABOLİZMA
-    user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-    today_activity = db.query(DailyActivity).filter(
-        DailyActivity.user_id == user_id,
-        DailyActivity.activity_date == target_date
-    ).first()
+    if target_date == user_ctx.activity_date:
+        today_activity = user_ctx.activity
+    else:
+        today_activity = db.query(DailyActivity).filter(
+            DailyActivity.user_id == user_id,
+            DailyActivity.activity_date == target_date
+        ).first()
     
     activity = {"steps": 0, "level": "sedanter", "tdee": 2000, "bmr": 1600}
     
-    if user_profile:
+    if user_ctx.profile:
         steps = today_activity.steps if today_activity else 0
-        calcs = get_full_calculations(
-            weight_kg=user_profile.weight_kg,
-            height_cm=user_profile.height_cm,
-            birth_year=user_profile.birth_year,
-            gender=user_profile.gender,
-            steps=steps,
-            goal_type=goals["goal_type"]
-        )
+        calcs = user_ctx.calculations(steps=steps)
         activity = {
             "steps": steps,
             "level": calcs["activity_level"],
@@ -128,31 +130,7 @@ def build_ai_context(user_id: int, target_date: date, db: Session) -> dict:
     warning_messages = [w["message"] for w in warnings_list if w["type"] == "warning"]
     
     # 6️⃣ AI GEÇMİŞİ
-    total_interactions = db.query(func.count(AIInteraction.id)).filter(
-        AIInteraction.user_id == user_id
-    ).scalar() or 0
-    
-    accepted_count = db.query(func.count(AIAcceptance.id)).filter(
-        AIAcceptance.user_id == user_id
-    ).scalar() or 0
-    
-    # En son öneri kabul edilmiş mi?
-    last_interaction = db.query(AIInteraction).filter(
-        AIInteraction.user_id == user_id
-    ).order_by(AIInteraction.created_at.desc()).first()
-    
-    last_accepted = False
-    if last_interaction:
-        last_acceptance = db.query(AIAcceptance).filter(
-            AIAcceptance.ai_interaction_id == last_interaction.id
-        ).first()
-        last_accepted = last_acceptance is not None
-    
-    ai_history = {
-        "last_suggestion_accepted": last_accepted,
-        "acceptance_rate": round(accepted_count / total_interactions, 2) if total_interactions > 0 else 0,
-        "total_interactions": total_interactions
-    }
+    ai_history = ai_history_summary(db, user_id)
     
     # 7️⃣ RETURN
     return {
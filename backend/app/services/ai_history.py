@@ -0,0 +1,98 @@
+"""
+AI History Service
+
+AI etkileşim / kabul geçmişi okumaları ve yazımları tek yerde:
+  - top_accepted_meals: kabul sayısına göre yemekler, Meal ile tek JOIN +
+    GROUP BY sorgusu (satır başına Meal sorgusu yok)
+  - ai_stats: user_ai_stats satırından tek PK okuması; ai_history_summary
+    buna son etkileşimin kabul durumunu (tek sorgu) ekler
+  - record_interaction / record_acceptance: satırı write-behind kuyruğuna
+    ekler (ai_write_behind); satır ve sayaç artışı aynı transaction'da
+    batch olarak yazılır. ai_stats kuyruktaki kayıtları sayaca ekler;
+    JOIN'li okumalar flush'a kadar (AI_WRITE_FLUSH_SECONDS) geride kalabilir
+
+Böylece /ai/chat geçmişi, /ai/stats ve /ai/top-meals kullanıcının geçmiş
+boyutundan bağımsız, sabit sayıda sorgu çalıştırır.
+"""
+
+from typing import List
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import AIAcceptance, AIInteraction, Meal, UserAIStats
+from app.services.ai_write_behind import ai_write_behind
+
+
+def record_interaction(user_id: int, prompt_text: str, response_text: str, suggested_meal_ids: str) -> int:
+    """AI etkileşimini write-behind kuyruğuna ekle. Returns: interaction id"""
+    return ai_write_behind.add_interaction(user_id, prompt_text, response_text, suggested_meal_ids)
+
+
+def record_acceptance(user_id: int, ai_interaction_id: int, meal_id: int) -> int:
+    """AI önerisi kabulünü write-behind kuyruğuna ekle. Returns: acceptance id"""
+    return ai_write_behind.add_acceptance(user_id, ai_interaction_id, meal_id)
+
+
+def owns_interaction(db: Session, user_id: int, interaction_id: int) -> bool:
+    """
+    Interaction kullanıcının mı? Önce bu process'in yazılmamış kuyruğu, sonra
+    tablo (kuyruktan çıkan satır commit edilmiş olur, bu sıra yarışsızdır)
+    """
+    if ai_write_behind.has_interaction(user_id, interaction_id):
+        return True
+    return db.execute(
+        select(AIInteraction.id).where(AIInteraction.id == interaction_id, AIInteraction.user_id == user_id)
+    ).first() is not None
+
+
+def ai_stats(db: Session, user_id: int) -> dict:
+    """Etkileşim / kabul sayıları ve kabul oranı (tek PK okuması + kuyruktakiler)"""
+    row = db.execute(
+        select(UserAIStats.interaction_count, UserAIStats.acceptance_count).where(UserAIStats.user_id == user_id)
+    ).first()
+    interactions, accepted = (row.interaction_count, row.acceptance_count) if row else (0, 0)
+    pending_interactions, pending_accepted = ai_write_behind.pending_counts(user_id)
+    interactions += pending_interactions
+    accepted += pending_accepted
+    return {
+        "total_interactions": interactions,
+        "accepted_count": accepted,
+        "acceptance_rate": round(accepted / interactions, 2) if interactions > 0 else 0
+    }
+
+
+def ai_history_summary(db: Session, user_id: int) -> dict:
+    """
+    AI context'i için geçmiş özeti: sayaçlar (PK okuması) + son etkileşimin
+    kabul edilip edilmediği (tek sorgu, CASE WHEN EXISTS alt sorgusu)
+    """
+    stats = ai_stats(db, user_id)
+    last_accepted = db.execute(
+        select(
+            # MSSQL select listesinde çıplak EXISTS kabul etmez → CASE WHEN EXISTS
+            case((select(AIAcceptance.id).where(AIAcceptance.ai_interaction_id == AIInteraction.id).exists(), 1), else_=0)
+        ).where(
+            AIInteraction.user_id == user_id
+        ).order_by(AIInteraction.created_at.desc(), AIInteraction.id.desc()).limit(1)
+    ).scalar()
+    return {
+        "last_suggestion_accepted": bool(last_accepted),
+        "acceptance_rate": stats["acceptance_rate"],
+        "total_interactions": stats["total_interactions"]
+    }
+
+
+def top_accepted_meals(db: Session, user_id: int, limit: int = 5) -> List[dict]:
+    """En çok kabul edilen yemekler: [{meal_id, meal_name, count}] (tek JOIN sorgusu)"""
+    count = func.count(AIAcceptance.id).label("count")
+    rows = db.execute(
+        select(Meal.meal_id, Meal.meal_name, count).select_from(AIAcceptance).join(
+            Meal, Meal.meal_id == AIAcceptance.meal_id
+        ).where(
+            AIAcceptance.user_id == user_id
+        ).group_by(
+            Meal.meal_id, Meal.meal_name
+        ).order_by(count.desc(), Meal.meal_id).limit(limit)
+    ).all()
+    return [dict(row._mapping) for row in rows]
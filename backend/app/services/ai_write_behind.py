@@ -0,0 +1,351 @@
+"""
+AI Write-Behind Queue
+
+/ai/chat ve /ai/accept, AIInteraction / AIAcceptance satırını DB'ye yazmayı
+beklemez: id hi-lo ayırıcıdan (id_blocks) hemen alınır, satır bellekteki
+kuyruğa eklenir ve cevap döner. Arka plan thread'i kuyruğu
+AI_WRITE_FLUSH_SECONDS'ta bir ya da AI_WRITE_BATCH_SIZE kayıt birikince
+tek transaction'da yazar:
+
+  - interaction'lar, sonra acceptance'lar (FK sırası) executemany INSERT
+    (MSSQL'de açık id için IDENTITY_INSERT), user_ai_stats sayaçları
+    kullanıcı başına toplanmış artışlarla tek executemany upsert
+  - /ai/accept kuyruğa eklemeden önce yemeği ve interaction'ın kullanıcıya
+    ait olduğunu (tablo veya has_interaction ile bu process'in kuyruğu)
+    doğrular; başka bir worker'ın henüz yazmadığı interaction flush'a kadar
+    bulunamaz
+  - batch IntegrityError verirse satır satır yazılır. Hatalı interaction
+    loglanıp atılır; hatalı acceptance ise tekrar denenir (doğrulamayla
+    flush arasında değişen katalog / satırlar). Bekleyen kabuller ana
+    batch'ten ayrı, satır satır denenir ve AI_WRITE_RETRY_SECONDS dolunca
+    atılır
+  - DB'ye ulaşılamazsa satırlar kuyruğun başına geri konur ve sonraki
+    turda tekrar denenir; kuyruk AI_WRITE_MAX_PENDING'e ulaşırsa yazan
+    istek senkron flush dener, yine doluysa WriteBehindFull fırlatılır
+
+Uygulama kapanırken (shutdown event) close() kuyruğu boşaltır. Kuyruk sadece
+bellektedir: process graceful shutdown olmadan ölürse (kill -9, OOM, çökme)
+henüz yazılmamış kayıtlar kaybolur - en fazla son AI_WRITE_FLUSH_SECONDS'ın
+yazımları (DB erişilemiyorsa AI_WRITE_MAX_PENDING kadar). created_at /
+accepted_at DB'nin server default'u olduğundan flush anını gösterir.
+"""
+
+from typing import Dict, List, Tuple
+import logging
+import threading
+import time
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.id_blocks import IdBlockAllocator
+from app.db.models import AIAcceptance, AIInteraction
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindFull(RuntimeError):
+    """Kuyruk dolu ve DB'ye yazılamıyor"""
+
+
+def _counter_sql(dialect: str) -> str:
+    if dialect == "mssql":
+        return (
+            "MERGE user_ai_stats WITH (HOLDLOCK) AS t USING (SELECT :user_id AS user_id) AS s "
+            "ON t.user_id = s.user_id "
+            "WHEN MATCHED THEN UPDATE SET t.interaction_count = t.interaction_count + :interactions, "
+            "t.acceptance_count = t.acceptance_count + :acceptances "
+            "WHEN NOT MATCHED THEN INSERT (user_id, interaction_count, acceptance_count) "
+            "VALUES (s.user_id, :interactions, :acceptances);"
+        )
+    return (
+        "INSERT INTO user_ai_stats (user_id, interaction_count, acceptance_count) "
+        "VALUES (:user_id, :interactions, :acceptances) "
+        "ON CONFLICT (user_id) DO UPDATE SET "
+        "interaction_count = user_ai_stats.interaction_count + excluded.interaction_count, "
+        "acceptance_count = user_ai_stats.acceptance_count + excluded.acceptance_count"
+    )
+
+
+def write_batch(conn: Connection, interactions: List[dict], acceptances: List[dict]) -> None:
+    """Satırları ve sayaç artışlarını verilen transaction'da yaz"""
+    dialect = conn.dialect.name
+    for model, rows in ((AIInteraction, interactions), (AIAcceptance, acceptances)):
+        if not rows:
+            continue
+        if dialect == "mssql":
+            conn.exec_driver_sql(f"SET IDENTITY_INSERT {model.__tablename__} ON")
+            try:
+                conn.execute(insert(model), rows)
+            finally:
+                conn.exec_driver_sql(f"SET IDENTITY_INSERT {model.__tablename__} OFF")
+        else:
+            conn.execute(insert(model), rows)
+
+    # user_id → [interaction artışı, acceptance artışı]
+    deltas: Dict[int, List[int]] = {}
+    for row in interactions:
+        deltas.setdefault(row["user_id"], [0, 0])[0] += 1
+    for row in acceptances:
+        deltas.setdefault(row["user_id"], [0, 0])[1] += 1
+    # Sabit sıra: eşzamanlı flush'lar sayaç satırlarını aynı sırada kilitler
+    conn.execute(text(_counter_sql(dialect)), [
+        {"user_id": user_id, "interactions": i, "acceptances": a}
+        for user_id, (i, a) in sorted(deltas.items())
+    ])
+
+
+class AIWriteBehind:
+    def __init__(self, engine: Engine, allocator: IdBlockAllocator, flush_seconds: float, batch_size: int, max_pending: int, retry_seconds: float):
+        self.engine = engine
+        self.allocator = allocator
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.retry_seconds = retry_seconds
+        self._interactions: List[dict] = []
+        self._acceptances: List[dict] = []
+        # Flush'ın aldığı, henüz commit edilmemiş interaction'lar (has_interaction için)
+        self._flushing: List[dict] = []
+        # IntegrityError alan kabuller ve atılma anları (acceptance id → monotonic);
+        # _deadlines sadece flush içinde (_flush_lock altında) kullanılır
+        self._retrying: List[dict] = []
+        self._deadlines: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        # Aynı anda tek flush (arka plan thread'i / senkron / close)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._counts = {"queued": 0, "written": 0, "dropped": 0, "retried": 0, "batches": 0, "failed_flushes": 0}
+
+    def _pending(self) -> int:
+        return len(self._interactions) + len(self._acceptances) + len(self._retrying)
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._closed:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="ai-write-behind", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"AI write-behind flush failed: {e}")
+
+    def _enqueue(self, bucket: str, row: dict):
+        with self._lock:
+            full = self._pending() >= self.max_pending
+        if full:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"AI write-behind flush failed: {e}")
+            with self._lock:
+                if self._pending() >= self.max_pending:
+                    raise WriteBehindFull("AI write-behind queue is full")
+
+        with self._lock:
+            getattr(self, bucket).append(row)
+            self._counts["queued"] += 1
+            pending = self._pending()
+        if self._closed:
+            # Kapanıştan sonra gelen yazım beklemeden yazılır
+            self.flush()
+            return
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def add_interaction(self, user_id: int, prompt_text: str, response_text: str, suggested_meal_ids: str) -> int:
+        """AI etkileşimini kuyruğa ekle. Returns: ayrılmış interaction id"""
+        interaction_id = self.allocator.next_id(AIInteraction.__tablename__)
+        self._enqueue("_interactions", {
+            "id": interaction_id,
+            "user_id": user_id,
+            "prompt_text": prompt_text,
+            "response_text": response_text,
+            "suggested_meal_ids": suggested_meal_ids
+        })
+        return interaction_id
+
+    def add_acceptance(self, user_id: int, ai_interaction_id: int, meal_id: int) -> int:
+        """Öneri kabulünü kuyruğa ekle. Returns: ayrılmış acceptance id"""
+        acceptance_id = self.allocator.next_id(AIAcceptance.__tablename__)
+        self._enqueue("_acceptances", {
+            "id": acceptance_id,
+            "ai_interaction_id": ai_interaction_id,
+            "user_id": user_id,
+            "meal_id": meal_id
+        })
+        return acceptance_id
+
+    def pending_counts(self, user_id: int) -> Tuple[int, int]:
+        """Henüz yazılmamış (interaction, acceptance) sayısı - sayaçlara eklenir"""
+        with self._lock:
+            return (
+                sum(1 for row in self._interactions if row["user_id"] == user_id),
+                sum(1 for row in self._acceptances + self._retrying if row["user_id"] == user_id)
+            )
+
+    def has_interaction(self, user_id: int, interaction_id: int) -> bool:
+        """
+        Interaction bu process'in kuyruğunda (veya yazılmakta) ve kullanıcının mı?
+        Kuyrukta yoksa ya hiç eklenmemiştir ya da commit edilmiştir.
+        """
+        with self._lock:
+            return any(
+                row["id"] == interaction_id and row["user_id"] == user_id
+                for row in self._interactions + self._flushing
+            )
+
+    def _requeue(self, interactions: List[dict], acceptances: List[dict]):
+        with self._lock:
+            self._interactions = interactions + self._interactions
+            self._acceptances = acceptances + self._acceptances
+            self._counts["failed_flushes"] += 1
+
+    def _retry_later(self, row: dict, error: IntegrityError):
+        """Acceptance'ı bekleyenlere koy; süresi dolduysa at"""
+        now = time.monotonic()
+        deadline = self._deadlines.setdefault(row["id"], now + self.retry_seconds)
+        if now < deadline:
+            with self._lock:
+                self._retrying.append(row)
+                self._counts["retried"] += 1
+            return
+        del self._deadlines[row["id"]]
+        self._drop(row, error)
+
+    def _drop(self, row: dict, error: IntegrityError):
+        with self._lock:
+            self._counts["dropped"] += 1
+        logger.error(f"AI write-behind dropped row id={row['id']} user_id={row['user_id']}: {error.orig}")
+
+    def _write_rows(self, interactions: List[dict], acceptances: List[dict]) -> int:
+        """
+        Satır satır yaz (her satır kendi transaction'ında). Hatalı interaction
+        atılır, hatalı acceptance tekrar denenmek üzere bekletilir.
+        """
+        written = 0
+        rows = [(row, None) for row in interactions] + [(None, row) for row in acceptances]
+        for position, (interaction, acceptance) in enumerate(rows):
+            try:
+                with self.engine.begin() as conn:
+                    write_batch(conn, [interaction] if interaction else [], [acceptance] if acceptance else [])
+                written += 1
+                if acceptance:
+                    self._deadlines.pop(acceptance["id"], None)
+            except IntegrityError as e:
+                if acceptance:
+                    self._retry_later(acceptance, e)
+                else:
+                    self._drop(interaction, e)
+            except Exception:
+                rest = rows[position:]
+                self._requeue([i for i, _ in rest if i], [a for _, a in rest if a])
+                raise
+        return written
+
+    def _write_retrying(self, count: int) -> int:
+        """Bekleyen ilk count kabulü satır satır tekrar dene"""
+        with self._lock:
+            rows, self._retrying = self._retrying[:count], self._retrying[count:]
+        written = 0
+        for position, row in enumerate(rows):
+            try:
+                with self.engine.begin() as conn:
+                    write_batch(conn, [], [row])
+                written += 1
+                self._deadlines.pop(row["id"], None)
+            except IntegrityError as e:
+                self._retry_later(row, e)
+            except Exception:
+                with self._lock:
+                    self._retrying = rows[position:] + self._retrying
+                raise
+        return written
+
+    def flush(self) -> int:
+        """Kuyruktakileri yaz. Returns: yazılan satır sayısı"""
+        with self._flush_lock:
+            with self._lock:
+                interactions, acceptances = self._interactions, self._acceptances
+                self._interactions, self._acceptances = [], []
+                self._flushing = interactions
+                # Bu turda hata alıp bekletilenler bir sonraki flush'ta denenir
+                n_retrying = len(self._retrying)
+            if not interactions and not acceptances and not n_retrying:
+                return 0
+
+            written = 0
+            if interactions or acceptances:
+                try:
+                    with self.engine.begin() as conn:
+                        write_batch(conn, interactions, acceptances)
+                    written = len(interactions) + len(acceptances)
+                except IntegrityError:
+                    written = self._write_rows(interactions, acceptances)
+                except Exception:
+                    self._requeue(interactions, acceptances)
+                    raise
+                finally:
+                    with self._lock:
+                        self._flushing = []
+            # Bekleyen kabuller ana batch'i IntegrityError'a düşürmesin diye ayrı
+            if n_retrying:
+                written += self._write_retrying(n_retrying)
+
+            with self._lock:
+                self._counts["written"] += written
+                self._counts["batches"] += 1
+            return written
+
+    def close(self, timeout: float = 10.0):
+        """
+        Graceful shutdown: thread'i durdur ve kuyruğu boşalt. Bekleyen kabuller
+        (interaction'ı başka worker'da) timeout boyunca tekrar denenir.
+        """
+        deadline = time.monotonic() + timeout
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        while self._retrying and time.monotonic() < deadline:
+            time.sleep(self.flush_seconds)
+            self.flush()
+        if self._retrying:
+            logger.error(f"AI write-behind closed with {len(self._retrying)} unwritten acceptances")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "pending": self._pending(),
+                "max_pending": self.max_pending,
+                "retrying": len(self._retrying),
+                "batch_size": self.batch_size,
+                "flush_seconds": self.flush_seconds,
+                "retry_seconds": self.retry_seconds
+            }
+
+
+ai_write_behind = AIWriteBehind(
+    engine,
+    IdBlockAllocator(engine, settings.AI_ID_BLOCK_SIZE),
+    settings.AI_WRITE_FLUSH_SECONDS,
+    settings.AI_WRITE_BATCH_SIZE,
+    settings.AI_WRITE_MAX_PENDING,
+    settings.AI_WRITE_RETRY_SECONDS
+)
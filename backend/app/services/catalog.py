@@ -0,0 +1,151 @@
+"""
+Catalog Version Service
+
+meals tablosu import/sync ile değiştiğinde catalog_version sayacı artar.
+Katalogdan türetilen in-memory yapılar (indeksler, matrisler) VersionedCache
+ile tutulur ve sadece versiyon değiştiğinde yeniden kurulur. Diskteki
+indeksler (benzerlik, arama) istek yolunda hesaplanmaz: yoksa
+BackgroundBuilder arka planda kurar, istek IndexNotReady alır.
+"""
+
+from typing import Callable, Generic, Optional, Set, TypeVar
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_ID = 1
+
+T = TypeVar("T")
+
+
+def read_catalog_version(db) -> int:
+    """Güncel katalog versiyonu (Session veya Connection); satır yoksa 0"""
+    version = db.execute(
+        text("SELECT version FROM catalog_version WHERE id = :id"),
+        {"id": CATALOG_VERSION_ID}
+    ).scalar()
+    return int(version or 0)
+
+
+def bump_catalog_version(conn: Connection) -> int:
+    """Sayacı atomik olarak artır (import/sync transaction'ı içinde çağır)"""
+    result = conn.execute(
+        text(
+            "UPDATE catalog_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP "
+            "WHERE id = :id"
+        ),
+        {"id": CATALOG_VERSION_ID}
+    )
+    if result.rowcount == 0:
+        conn.execute(
+            text("INSERT INTO catalog_version (id, version) VALUES (:id, 1)"),
+            {"id": CATALOG_VERSION_ID}
+        )
+    return read_catalog_version(conn)
+
+
+class CatalogVersionCache:
+    """Versiyonu her istekte sorgulamamak için kısa TTL'li okuma"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> int:
+        with self._lock:
+            if self._version is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+                return self._version
+        version = read_catalog_version(db)
+        with self._lock:
+            self._version = version
+            self._checked_at = time.monotonic()
+        return version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version = None
+
+
+catalog_version_cache = CatalogVersionCache(settings.CATALOG_VERSION_CHECK_SECONDS)
+
+
+class VersionedCache(Generic[T]):
+    """
+    Katalogdan türetilen bir yapıyı tutar; builder(db, catalog_version)
+    sadece katalog versiyonu değiştiğinde (veya ilk erişimde) çalışır.
+    Builder hata fırlatırsa (ör. IndexNotReady) hiçbir şey önbelleğe alınmaz.
+    """
+
+    def __init__(self, name: str, builder: Callable[[Session, int], T]):
+        self.name = name
+        self._builder = builder
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> T:
+        version = catalog_version_cache.get(db)
+        if self._version == version and self._value is not None:
+            return self._value
+        with self._lock:
+            # Başka thread bu arada kurmuş olabilir
+            if self._version != version or self._value is None:
+                self._value = self._builder(db, version)
+                self._version = version
+            return self._value
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._version = None
+
+
+class IndexNotReady(RuntimeError):
+    """Katalog versiyonunun disk indeksi henüz yok; arka planda kuruluyor"""
+
+
+class BackgroundBuilder:
+    """
+    Disk indeksini catalog_version başına tek arka plan thread'inde kurar;
+    istek yolu sadece start() çağırıp IndexNotReady döner.
+    build(catalog_version) indeksi o versiyonun dizinine yazmalı.
+    """
+
+    def __init__(self, name: str, build: Callable[[int], dict]):
+        self.name = name
+        self._build = build
+        self._running: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def start(self, catalog_version: int) -> None:
+        with self._lock:
+            if catalog_version in self._running:
+                return
+            self._running.add(catalog_version)
+        threading.Thread(
+            target=self._run, args=(catalog_version,), name=f"{self.name}-build", daemon=True
+        ).start()
+
+    def _run(self, catalog_version: int):
+        try:
+            stats = self._build(catalog_version)
+            logger.info(f"{self.name} index built: {stats}")
+        except Exception as e:
+            logger.error(f"{self.name} index build failed (v{catalog_version}): {e}")
+        finally:
+            with self._lock:
+                self._running.discard(catalog_version)
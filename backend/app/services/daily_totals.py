@@ -0,0 +1,59 @@
+"""
+Daily Totals Service
+
+Gün bazlı kalori / makro toplamları tek GROUP BY sorgusuyla.
+Log başına Meal sorgusu (N+1) yerine kullanılır.
+"""
+
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models import MealLog, Meal
+
+
+def empty_totals() -> dict:
+    """Log olmayan gün için sıfır toplamlar"""
+    return {"log_count": 0, "calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
+
+
+def get_totals_by_date(db: Session, user_id: int, start_date: date, end_date: date) -> Dict[date, dict]:
+    """
+    [start_date, end_date] aralığında log olan günlerin toplamları.
+
+    Returns: {log_date: {log_count, calories, protein, carbs, fat}}
+    """
+    rows = db.query(
+        MealLog.log_date,
+        func.count(MealLog.id).label("log_count"),
+        func.sum(Meal.calories * MealLog.portion).label("calories"),
+        func.sum(Meal.protein_g * MealLog.portion).label("protein"),
+        func.sum(Meal.carbs_g * MealLog.portion).label("carbs"),
+        func.sum(Meal.fat_g * MealLog.portion).label("fat")
+    ).join(
+        Meal, Meal.meal_id == MealLog.meal_id
+    ).filter(
+        MealLog.user_id == user_id,
+        MealLog.log_date >= start_date,
+        MealLog.log_date <= end_date
+    ).group_by(
+        MealLog.log_date
+    ).all()
+
+    return {
+        row.log_date: {
+            "log_count": row.log_count,
+            "calories": float(row.calories or 0),
+            "protein": float(row.protein or 0),
+            "carbs": float(row.carbs or 0),
+            "fat": float(row.fat or 0)
+        }
+        for row in rows
+    }
+
+
+def get_day_totals(db: Session, user_id: int, target_date: date) -> dict:
+    """Tek günün toplamları (log yoksa sıfırlar)"""
+    return get_totals_by_date(db, user_id, target_date, target_date).get(target_date, empty_totals())
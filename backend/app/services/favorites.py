@@ -0,0 +1,154 @@
+"""
+Favorites Service
+
+favorite_meals (user_id, meal_id) tekildir; ekleme upsert'tür (MSSQL
+MERGE WITH (HOLDLOCK), diğerlerinde INSERT ... ON CONFLICT DO NOTHING),
+toplu ekleme / silme tek ifadedir. Liste Meal ile tek JOIN sorgusudur.
+
+Öneri kodu için kullanıcı başına favori bitset'i (MealVectors satır
+pozisyonları üzerinde, packbits) bellekte tutulur: pozisyon verilince
+"favori mi?" O(1), vektörel maske için unpack. Yazımlar invalidate eder;
+diğer worker'lar FAVORITES_CACHE_TTL_SECONDS içinde yakalar.
+"""
+
+from collections import OrderedDict
+from typing import List, Tuple
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import FavoriteMeal, Meal
+from app.services.meal_vectors import MealVectors, meal_vectors_cache
+
+# Tek istekte eklenebilecek / silinebilecek en fazla favori
+MAX_BULK = 500
+
+
+def _upsert_sql(dialect: str, n: int) -> str:
+    params = [f":m{i}" for i in range(n)]
+    if dialect == "mssql":
+        values = ", ".join(f"({p})" for p in params)
+        return (
+            f"MERGE favorite_meals WITH (HOLDLOCK) AS t USING (VALUES {values}) AS s (meal_id) "
+            "ON t.user_id = :user_id AND t.meal_id = s.meal_id "
+            "WHEN NOT MATCHED THEN INSERT (user_id, meal_id) VALUES (:user_id, s.meal_id);"
+        )
+    values = ", ".join(f"(:user_id, {p})" for p in params)
+    return f"INSERT INTO favorite_meals (user_id, meal_id) VALUES {values} ON CONFLICT (user_id, meal_id) DO NOTHING"
+
+
+def add_favorites(db: Session, user_id: int, meal_ids: List[int]) -> Tuple[int, List[int]]:
+    """
+    Favorilere ekle (zaten favori olanlar atlanır, commit dahil).
+    Returns: (yeni eklenen sayısı, katalogda olmayan meal_id'ler)
+    """
+    wanted = sorted(set(meal_ids))
+    known = set(db.execute(select(Meal.meal_id).where(Meal.meal_id.in_(wanted))).scalars().all()) if wanted else set()
+    missing = [m for m in wanted if m not in known]
+    added = 0
+    if known:
+        ids = sorted(known)
+        result = db.execute(
+            text(_upsert_sql(db.get_bind().dialect.name, len(ids))),
+            {"user_id": user_id, **{f"m{i}": m for i, m in enumerate(ids)}}
+        )
+        added = max(result.rowcount, 0)
+        db.commit()
+        favorite_bitsets.invalidate(user_id)
+    return added, missing
+
+
+def remove_favorites(db: Session, user_id: int, meal_ids: List[int]) -> int:
+    """Favorilerden çıkar (commit dahil). Returns: silinen sayısı"""
+    if not meal_ids:
+        return 0
+    result = db.execute(
+        delete(FavoriteMeal).where(FavoriteMeal.user_id == user_id, FavoriteMeal.meal_id.in_(set(meal_ids)))
+    )
+    db.commit()
+    favorite_bitsets.invalidate(user_id)
+    return result.rowcount
+
+
+def list_favorites(db: Session, user_id: int) -> List[dict]:
+    """Favoriler + yemek alanları (tek JOIN)"""
+    rows = db.execute(
+        select(
+            FavoriteMeal.id,
+            FavoriteMeal.meal_id,
+            Meal.meal_name,
+            Meal.calories,
+            Meal.protein_g,
+            Meal.carbs_g,
+            Meal.fat_g,
+            Meal.meal_type,
+            Meal.cuisine,
+            Meal.diet_type
+        ).join(
+            Meal, Meal.meal_id == FavoriteMeal.meal_id
+        ).where(
+            FavoriteMeal.user_id == user_id
+        ).order_by(FavoriteMeal.id)
+    ).all()
+    return [dict(row._mapping) for row in rows]
+
+
+class FavoriteBitset:
+    """Kullanıcının favorileri, MealVectors pozisyonları üzerinde bitset"""
+
+    def __init__(self, vectors: MealVectors, meal_ids: List[int]):
+        self.vectors = vectors
+        positions = vectors.positions(np.array(meal_ids, dtype=np.int64))
+        mask = np.zeros(len(vectors), dtype=bool)
+        mask[positions[positions >= 0]] = True
+        self.bits = np.packbits(mask, bitorder="little")
+        self.count = int(mask.sum())
+
+    def contains(self, position: int) -> bool:
+        """O(1): MealVectors satır pozisyonu favori mi"""
+        return bool((self.bits[position >> 3] >> (position & 7)) & 1)
+
+    def mask(self) -> np.ndarray:
+        """(n_meals,) bool - vektörel filtre / skor artırımı için"""
+        return np.unpackbits(self.bits, count=len(self.vectors), bitorder="little").astype(bool)
+
+
+class FavoriteBitsetCache:
+    """Thread-safe, TTL'li, en fazla max_users kullanıcılık LRU"""
+
+    def __init__(self, ttl_seconds: int, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        # {user_id: (expires_at, FavoriteBitset)}
+        self._entries: "OrderedDict[int, Tuple[float, FavoriteBitset]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> FavoriteBitset:
+        vectors = meal_vectors_cache.get(db)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            # Katalog versiyonu değiştiyse pozisyonlar da değişir
+            if entry and entry[0] > time.monotonic() and entry[1].vectors is vectors:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        meal_ids = db.execute(select(FavoriteMeal.meal_id).where(FavoriteMeal.user_id == user_id)).scalars().all()
+        bitset = FavoriteBitset(vectors, meal_ids)
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._entries[user_id] = (time.monotonic() + self.ttl_seconds, bitset)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return bitset
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+favorite_bitsets = FavoriteBitsetCache(settings.FAVORITES_CACHE_TTL_SECONDS, settings.FAVORITES_CACHE_MAX_USERS)
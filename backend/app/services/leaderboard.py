@@ -0,0 +1,195 @@
+"""
+Streak Leaderboard
+
+current_streak ve max_streak için bellek içi sıralı indeks. Her metrik
+için (-skor, user_id) anahtarlarından oluşan sıralı bir liste tutulur:
+
+  - top-N: listenin ilk N elemanı
+  - sıra (rank): bisect ile skoru kesin büyük olanların sayısı + 1, O(log n)
+    (eşit skorlar aynı sırayı paylaşır)
+  - güncelleme: eski anahtar bisect ile bulunup silinir, yenisi insort
+
+İndeks açılışta ve LEADERBOARD_REBUILD_SECONDS'ta bir user_streaks
+tablosundan kurulur; log yazımları streak değişince update() çağırır.
+Yeniden kurulum sorgusu kilit dışında çalışır; bu sırada gelen update()'ler
+kaydedilir ve yeni satırlar devreye alınınca üzerine tekrar uygulanır.
+current_streak sadece son log dün veya bugünse geçerlidir (aksi halde
+seri kırılmıştır ve 0 sayılır); gün değişince indeks bellekteki
+satırlardan yeniden sıralanır.
+"""
+
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import UserStreak
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("current_streak", "max_streak")
+
+
+class RankedIndex:
+    """(-skor, user_id) sıralı listesi ve user_id → skor"""
+
+    def __init__(self, scores: Dict[int, int]):
+        self.scores = dict(scores)
+        self.keys: List[Tuple[int, int]] = sorted((-score, user_id) for user_id, score in self.scores.items())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def set(self, user_id: int, score: int):
+        old = self.scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (-old, user_id))]
+        self.scores[user_id] = score
+        insort(self.keys, (-score, user_id))
+
+    def rank(self, score: int) -> int:
+        """Skoru kesin büyük olanların sayısı + 1"""
+        return bisect_left(self.keys, (-score, -1)) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, int, int]]:
+        """[(sıra, user_id, skor)]"""
+        result = []
+        for position, (neg_score, user_id) in enumerate(self.keys[:limit]):
+            if result and result[-1][2] == -neg_score:
+                rank = result[-1][0]
+            else:
+                rank = position + 1
+            result.append((rank, user_id, -neg_score))
+        return result
+
+
+def _effective_current(current: int, last_logged_date: Optional[date], today: date) -> int:
+    if last_logged_date is None or last_logged_date < today - timedelta(days=1):
+        return 0
+    return current or 0
+
+
+class StreakLeaderboard:
+    def __init__(self):
+        # user_id → (current_streak, max_streak, last_logged_date)
+        self._rows: Dict[int, Tuple[int, int, Optional[date]]] = {}
+        self._indexes: Dict[str, RankedIndex] = {}
+        self._day: Optional[date] = None
+        self._built_at = 0.0
+        # Yeniden kurulum sürerken gelen güncellemeler (None = kurulum yok)
+        self._pending: Optional[Dict[int, Tuple[int, int, Optional[date]]]] = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def _reindex(self, today: date):
+        self._indexes = {
+            "current_streak": RankedIndex({
+                u: _effective_current(c, last, today) for u, (c, _, last) in self._rows.items()
+            }),
+            "max_streak": RankedIndex({u: m or 0 for u, (_, m, _) in self._rows.items()})
+        }
+        self._day = today
+
+    def _stale(self) -> bool:
+        return not self._built_at or time.monotonic() - self._built_at > settings.LEADERBOARD_REBUILD_SECONDS
+
+    def _rebuild(self, db: Session):
+        """_rebuild_lock tutulurken çağrılır"""
+        with self._lock:
+            self._pending = {}
+        try:
+            rows = db.execute(
+                select(UserStreak.user_id, UserStreak.current_streak, UserStreak.max_streak, UserStreak.last_logged_date)
+            ).all()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._rows = {u: (c or 0, m or 0, last) for u, c, m, last in rows}
+            # Sorgu sırasında commit edilen streak'ler sorgudan kaçmış olabilir
+            self._rows.update(self._pending)
+            self._pending = None
+            self._reindex(date.today())
+            self._built_at = time.monotonic()
+        logger.info(f"Streak leaderboard built: {len(rows)} users")
+
+    def rebuild(self, db: Session):
+        """user_streaks tablosundan tek sorgu ile yeniden kur"""
+        with self._rebuild_lock:
+            self._rebuild(db)
+
+    def ensure(self, db: Session):
+        """
+        İlk kullanımda / TTL dolunca tablodan, gün değişince bellekten yeniden
+        kur. TTL dolunca tek bir istek yeniden kurar; kurulum sürerken diğer
+        istekler mevcut indeksten cevap alır.
+        """
+        if not self._built_at:
+            # Henüz indeks yok: ilk kurulumu herkes bekler, biri kurar
+            with self._rebuild_lock:
+                if not self._built_at:
+                    self._rebuild(db)
+        elif self._stale() and self._rebuild_lock.acquire(blocking=False):
+            try:
+                if self._stale():
+                    self._rebuild(db)
+            finally:
+                self._rebuild_lock.release()
+
+        today = date.today()
+        if self._day != today:
+            with self._lock:
+                if self._day != today:
+                    self._reindex(today)
+
+    def update(self, user_id: int, current_streak: int, max_streak: int, last_logged_date: Optional[date]):
+        """Streak değişikliği (commit sonrası)"""
+        row = (current_streak or 0, max_streak or 0, last_logged_date)
+        with self._lock:
+            if self._pending is not None:
+                self._pending[user_id] = row
+            if not self._built_at:
+                return
+            self._rows[user_id] = row
+            self._indexes["current_streak"].set(user_id, _effective_current(current_streak, last_logged_date, self._day))
+            self._indexes["max_streak"].set(user_id, max_streak or 0)
+
+    def top(self, metric: str, limit: int) -> Tuple[List[Tuple[int, int, int]], int]:
+        """Returns: ([(sıra, user_id, skor)], toplam kullanıcı)"""
+        with self._lock:
+            index = self._indexes[metric]
+            return index.top(limit), len(index)
+
+    def rank(self, metric: str, user_id: int) -> Tuple[int, int]:
+        """Returns: (sıra, skor) - satırı olmayan kullanıcı 0 skorla sıralanır"""
+        with self._lock:
+            index = self._indexes[metric]
+            score = index.scores.get(user_id, 0)
+            return index.rank(score), score
+
+    def scores(self, metric: str, user_ids: Iterable[int]) -> Dict[int, int]:
+        with self._lock:
+            index = self._indexes[metric]
+            return {u: index.scores.get(u, 0) for u in user_ids}
+
+
+streak_leaderboard = StreakLeaderboard()
+
+
+def rank_group(scores: Dict[int, int]) -> List[Tuple[int, int, int]]:
+    """Küçük grup (arkadaşlar) için sıralama: [(sıra, user_id, skor)]"""
+    ordered = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    result = []
+    for position, (user_id, score) in enumerate(ordered):
+        rank = result[-1][0] if result and result[-1][2] == score else position + 1
+        result.append((rank, user_id, score))
+    return result
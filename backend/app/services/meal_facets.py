@@ -0,0 +1,122 @@
+"""
+Meal Facets
+
+Arama ekranındaki facet sayıları (cuisine, diet_type, meal_type,
+cooking_method, kalori aralığı) için katalog üzerinde değer başına bir
+bitmap tutulur: yemek i → bit i, uint64 kelimelere paketli.
+
+Bir facet'in sayıları, DİĞER facet'lerin seçimleri (facet içinde OR,
+facet'ler arası AND) altında hesaplanır; böylece seçili facet'in diğer
+değerleri de sayısıyla görünür. Her facet için tek AND + popcount:
+
+    count(f=v) = popcount(bitmap[f=v] & AND_{g≠f} OR_{s∈sel(g)} bitmap[g=s])
+
+Bitmap'ler VersionedCache ile katalog versiyonu değişince yeniden kurulur.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Meal
+from app.services.catalog import VersionedCache
+
+CATEGORY_FACETS = ["cuisine", "diet_type", "meal_type", "cooking_method"]
+CALORIE_FACET = "calorie_bucket"
+FACETS = CATEGORY_FACETS + [CALORIE_FACET]
+# Kalori aralıkları [alt, üst)
+CALORIE_EDGES = [0, 200, 400, 600, 800]
+
+
+def calorie_bucket_labels() -> List[str]:
+    labels = [f"{lo}-{hi}" for lo, hi in zip(CALORIE_EDGES, CALORIE_EDGES[1:])]
+    return labels + [f"{CALORIE_EDGES[-1]}+"]
+
+
+class FacetIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.meal_ids = df["meal_id"].to_numpy(dtype=np.int64)
+        self.n_words = (len(self.meal_ids) + 63) // 64
+        self.universe = self._pack(np.ones(len(self.meal_ids), dtype=bool))
+
+        # facet → değerler ve (n_values, n_words) uint64 bitmap'ler
+        self.values: Dict[str, List[str]] = {}
+        self.bitmaps: Dict[str, np.ndarray] = {}
+        for facet in CATEGORY_FACETS:
+            categorical = pd.Categorical(df[facet].where(df[facet].notna() & (df[facet] != ""), None))
+            self._add(facet, [str(c) for c in categorical.categories], categorical.codes)
+
+        calories = pd.to_numeric(df["calories"], errors="coerce").to_numpy(dtype=np.float64)
+        codes = np.searchsorted(CALORIE_EDGES, calories, side="right") - 1
+        codes[np.isnan(calories) | (calories < CALORIE_EDGES[0])] = -1
+        self._add(CALORIE_FACET, calorie_bucket_labels(), codes)
+
+    def __len__(self) -> int:
+        return len(self.meal_ids)
+
+    def _pack(self, mask: np.ndarray) -> np.ndarray:
+        packed = np.zeros(self.n_words * 8, dtype=np.uint8)
+        bits = np.packbits(mask, bitorder="little")
+        packed[:len(bits)] = bits
+        return packed.view(np.uint64)
+
+    def _add(self, facet: str, values: List[str], codes: np.ndarray):
+        self.values[facet] = values
+        self.bitmaps[facet] = np.stack(
+            [self._pack(codes == i) for i in range(len(values))]
+        ) if values else np.zeros((0, self.n_words), dtype=np.uint64)
+
+    def mask_bitmap(self, mask: np.ndarray) -> np.ndarray:
+        """meal_ids sırasıyla bool maske → bitmap (arama sonucu vb. için)"""
+        return self._pack(mask) & self.universe
+
+    def selection(self, facet: str, selected: List[str]) -> Optional[np.ndarray]:
+        """Seçili değerlerin OR'u (büyük/küçük harf duyarsız); seçim yoksa None"""
+        if not selected:
+            return None
+        wanted = {v.lower() for v in selected}
+        rows = [i for i, v in enumerate(self.values[facet]) if v.lower() in wanted]
+        if not rows:
+            return np.zeros(self.n_words, dtype=np.uint64)
+        return np.bitwise_or.reduce(self.bitmaps[facet][rows], axis=0)
+
+    def counts(self, filters: Dict[str, List[str]], base: Optional[np.ndarray] = None) -> dict:
+        """
+        filters: facet → seçili değerler. base: ek kısıt bitmap'i (ör. metin araması)
+        Returns: {"total": n, "facets": {facet: [{"value", "count", "selected"}]}}
+        """
+        selections = {facet: self.selection(facet, filters.get(facet) or []) for facet in FACETS}
+        start = self.universe if base is None else self.universe & base
+
+        facets = {}
+        for facet in FACETS:
+            mask = start
+            for other, bitmap in selections.items():
+                if other != facet and bitmap is not None:
+                    mask = mask & bitmap
+            counts = np.bitwise_count(self.bitmaps[facet] & mask).sum(axis=1, dtype=np.int64)
+            wanted = {v.lower() for v in filters.get(facet) or []}
+            facets[facet] = [
+                {"value": value, "count": int(count), "selected": value.lower() in wanted}
+                for value, count in zip(self.values[facet], counts.tolist())
+            ]
+            if facet != CALORIE_FACET:
+                facets[facet].sort(key=lambda f: (-f["count"], f["value"]))
+
+        total = start
+        for bitmap in selections.values():
+            if bitmap is not None:
+                total = total & bitmap
+        return {"total": int(np.bitwise_count(total).sum()), "facets": facets}
+
+
+def _build_facets(db: Session, catalog_version: int) -> FacetIndex:
+    columns = [Meal.meal_id, Meal.calories] + [getattr(Meal, c) for c in CATEGORY_FACETS]
+    df = pd.read_sql(select(*columns).order_by(Meal.meal_id), db.get_bind())
+    return FacetIndex(df)
+
+
+meal_facets_cache = VersionedCache("meal_facets", _build_facets)
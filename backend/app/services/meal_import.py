@@ -0,0 +1,320 @@
+"""
+Meal Catalog Bulk Import
+
+CSV'yi parça parça (chunk) okur, tipleri vektörel dönüştürür ve her parçayı
+staging tablosuna tek executemany ile yazıp set-based upsert yapar:
+
+- MSSQL: #temp staging + fast_executemany + MERGE
+- Diğer (SQLite / PostgreSQL, lokal geliştirme): UPDATE ... FROM + INSERT ... WHERE NOT EXISTS
+
+Satır başına SELECT + INSERT/UPDATE (db.merge) yapılmaz.
+
+Sync modu (sync_meals) her satırın içerik hash'ini DB'deki content_hash ile
+karşılaştırır; sadece eklenen / değişen / silinen satırlar yazılır ve
+değişiklik varsa catalog_version artırılır.
+"""
+
+from typing import Iterator, List
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Table, MetaData, Column, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.models import Meal
+from app.services.catalog import bump_catalog_version
+
+
+# CSV → meals kolonları
+STRING_COLUMNS = ["meal_name", "cuisine", "meal_type", "diet_type", "cooking_method"]
+FLOAT_COLUMNS = [
+    "calories", "protein_g", "carbs_g", "fat_g", "fiber_g", "sugar_g",
+    "sodium_mg", "cholesterol_mg", "rating"
+]
+INT_COLUMNS = ["prep_time_min", "cook_time_min"]
+BOOL_COLUMNS = ["is_healthy"]
+DATA_COLUMNS = STRING_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS + BOOL_COLUMNS
+HASH_COLUMN = "content_hash"
+# DB'ye yazılan kolonlar (anahtar hariç)
+WRITE_COLUMNS = DATA_COLUMNS + [HASH_COLUMN]
+
+# Upsert anahtarları
+KEY_MEAL_ID = "meal_id"                # CSV'deki meal_id korunur
+KEY_NAME_CALORIES = "name_calories"    # (meal_name, calories) - id DB'de üretilir
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def key_columns(key: str) -> List[str]:
+    if key == KEY_MEAL_ID:
+        return ["meal_id"]
+    if key == KEY_NAME_CALORIES:
+        return ["meal_name", "calories"]
+    raise ValueError(f"Bilinmeyen upsert anahtarı: {key}")
+
+
+def read_meal_chunks(csv_path: str, key: str = KEY_MEAL_ID, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """CSV'yi sabit bellekle parça parça oku, sadece gereken kolonları al"""
+    columns = DATA_COLUMNS + (["meal_id"] if key == KEY_MEAL_ID else [])
+    dtypes = {col: "string" for col in STRING_COLUMNS}
+
+    for chunk in pd.read_csv(csv_path, usecols=columns, dtype=dtypes, chunksize=chunksize):
+        yield prepare_chunk(chunk, key)
+
+
+def prepare_chunk(df: pd.DataFrame, key: str = KEY_MEAL_ID) -> pd.DataFrame:
+    """Tip dönüşümleri (vektörel) + parça içi duplicate temizliği"""
+    out = pd.DataFrame(index=df.index)
+
+    if key == KEY_MEAL_ID:
+        out["meal_id"] = pd.to_numeric(df["meal_id"], errors="coerce")
+
+    for col in STRING_COLUMNS:
+        out[col] = df[col].astype("object").where(df[col].notna(), None)
+    for col in FLOAT_COLUMNS:
+        out[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("float64")
+    for col in INT_COLUMNS:
+        out[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+    for col in BOOL_COLUMNS:
+        out[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(bool)
+
+    keys = key_columns(key)
+    out = out.dropna(subset=keys)
+    if key == KEY_MEAL_ID:
+        out["meal_id"] = out["meal_id"].astype("int64")
+
+    out[HASH_COLUMN] = content_hashes(out)
+
+    # Aynı parçada tekrar eden anahtar MERGE'ü bozar - son satır kazanır
+    return out.drop_duplicates(subset=keys, keep="last")
+
+
+def content_hashes(df: pd.DataFrame) -> pd.Series:
+    """Satır içerik hash'i (64-bit, 16 hane hex) - vektörel, tip dönüşümünden sonra"""
+    hashes = pd.util.hash_pandas_object(df[DATA_COLUMNS], index=False)
+    return hashes.map("{:016x}".format)
+
+
+def _staging_table(dialect: str, key: str) -> Table:
+    """meals kolonlarından türetilmiş geçici staging tablosu"""
+    name = "#meal_import_stage" if dialect == "mssql" else "meal_import_stage"
+    prefixes = [] if dialect == "mssql" else ["TEMPORARY"]
+    columns = (["meal_id"] if key == KEY_MEAL_ID else []) + WRITE_COLUMNS
+    meals = Meal.__table__
+    return Table(
+        name, MetaData(),
+        *[Column(col, meals.c[col].type) for col in columns],
+        prefixes=prefixes
+    )
+
+
+def _upsert_sql(dialect: str, key: str, stage_name: str) -> List[str]:
+    keys = key_columns(key)
+    update_cols = [c for c in WRITE_COLUMNS if c not in keys]
+    insert_cols = (["meal_id"] if key == KEY_MEAL_ID else []) + WRITE_COLUMNS
+    insert_list = ", ".join(insert_cols)
+
+    if dialect == "mssql":
+        on = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+        merge = (
+            f"MERGE meals WITH (HOLDLOCK) AS t USING {stage_name} AS s ON {on} "
+            f"WHEN MATCHED THEN UPDATE SET {', '.join(f't.{c} = s.{c}' for c in update_cols)} "
+            f"WHEN NOT MATCHED BY TARGET THEN INSERT ({insert_list}) "
+            f"VALUES ({', '.join('s.' + c for c in insert_cols)});"
+        )
+        if key == KEY_MEAL_ID:
+            # meal_id IDENTITY kolonu - açık id yazmak için
+            return ["SET IDENTITY_INSERT meals ON", merge, "SET IDENTITY_INSERT meals OFF"]
+        return [merge]
+
+    on = " AND ".join(f"meals.{k} = s.{k}" for k in keys)
+    return [
+        f"UPDATE meals SET {', '.join(f'{c} = s.{c}' for c in update_cols)} "
+        f"FROM {stage_name} AS s WHERE {on}",
+        f"INSERT INTO meals ({insert_list}) "
+        f"SELECT {', '.join('s.' + c for c in insert_cols)} FROM {stage_name} AS s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM meals WHERE {on})"
+    ]
+
+
+def _placeholder(conn: Connection) -> str:
+    return "?" if conn.dialect.paramstyle == "qmark" else "%s"
+
+
+def upsert_chunk(conn: Connection, chunk: pd.DataFrame, key: str = KEY_MEAL_ID) -> int:
+    """Tek parça: staging'e executemany, sonra set-based upsert"""
+    if chunk.empty:
+        return 0
+
+    dialect = conn.dialect.name
+    stage = _staging_table(dialect, key)
+    stage.drop(conn, checkfirst=True)
+    stage.create(conn)
+    try:
+        # Core insert + dict yerine tuple ile doğrudan DBAPI executemany
+        # (pyodbc'de fast_executemany devreye girer)
+        columns = list(chunk.columns)
+        insert_sql = (
+            f"INSERT INTO {stage.name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join([_placeholder(conn)] * len(columns))})"
+        )
+        conn.exec_driver_sql(insert_sql, list(chunk.itertuples(index=False, name=None)))
+        for statement in _upsert_sql(dialect, key, stage.name):
+            conn.execute(text(statement))
+    finally:
+        stage.drop(conn)
+    return len(chunk)
+
+
+def bulk_import_meals(
+    engine: Engine,
+    csv_path: str,
+    key: str = KEY_MEAL_ID,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    verbose: bool = True
+) -> dict:
+    """
+    CSV'yi parça parça meals tablosuna upsert et.
+
+    Her parça kendi transaction'ında commit edilir; büyük dosyada hata
+    olursa o ana kadarki parçalar kalıcıdır.
+
+    Returns: {rows, chunks, seconds, rows_per_sec}
+    """
+    total_rows = 0
+    chunks = 0
+    started = time.perf_counter()
+
+    try:
+        for chunk in read_meal_chunks(csv_path, key, chunksize):
+            chunk_started = time.perf_counter()
+            with engine.begin() as conn:
+                rows = upsert_chunk(conn, chunk, key)
+            total_rows += rows
+            chunks += 1
+            if verbose:
+                elapsed = time.perf_counter() - chunk_started
+                rate = rows / elapsed if elapsed > 0 else 0
+                print(f"Chunk {chunks}: {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    finally:
+        # Yarıda kalan import'ta da commit edilmiş parçalar önbelleklere yansısın
+        if total_rows:
+            with engine.begin() as conn:
+                bump_catalog_version(conn)
+
+    seconds = time.perf_counter() - started
+    return {
+        "rows": total_rows,
+        "chunks": chunks,
+        "seconds": round(seconds, 2),
+        "rows_per_sec": round(total_rows / seconds, 1) if seconds > 0 else 0
+    }
+
+
+def _load_existing_hashes(conn: Connection) -> pd.Series:
+    """DB'deki meal_id → content_hash (tek sorgu, sadece iki kolon)"""
+    rows = conn.execute(text("SELECT meal_id, content_hash FROM meals")).fetchall()
+    if not rows:
+        return pd.Series(dtype="object", index=pd.Index([], dtype="int64", name="meal_id"))
+    frame = pd.DataFrame(rows, columns=["meal_id", HASH_COLUMN])
+    return frame.set_index("meal_id")[HASH_COLUMN]
+
+
+def _delete_meals(conn: Connection, meal_ids: List[int]) -> int:
+    """
+    Katalogdan kalkan öğünleri sil. Log / favori / AI kabulü / haftalık planda
+    referansı olanlar FK nedeniyle silinmez (geçmiş kayıtlar bozulmasın).
+    """
+    dialect = conn.dialect.name
+    stage_name = "#meal_delete_stage" if dialect == "mssql" else "meal_delete_stage"
+    create = "CREATE TABLE" if dialect == "mssql" else "CREATE TEMPORARY TABLE"
+    conn.exec_driver_sql(f"{create} {stage_name} (meal_id INTEGER NOT NULL PRIMARY KEY)")
+    try:
+        conn.exec_driver_sql(
+            f"INSERT INTO {stage_name} (meal_id) VALUES ({_placeholder(conn)})",
+            [(int(meal_id),) for meal_id in meal_ids]
+        )
+        result = conn.execute(text(
+            f"DELETE FROM meals WHERE meal_id IN (SELECT meal_id FROM {stage_name}) "
+            "AND NOT EXISTS (SELECT 1 FROM meal_logs l WHERE l.meal_id = meals.meal_id) "
+            "AND NOT EXISTS (SELECT 1 FROM favorite_meals f WHERE f.meal_id = meals.meal_id) "
+            "AND NOT EXISTS (SELECT 1 FROM ai_acceptances a WHERE a.meal_id = meals.meal_id) "
+            "AND NOT EXISTS (SELECT 1 FROM weekly_meal_plans w WHERE w.meal_id = meals.meal_id)"
+        ))
+        return result.rowcount
+    finally:
+        conn.exec_driver_sql(f"DROP TABLE {stage_name}")
+
+
+def sync_meals(
+    engine: Engine,
+    csv_path: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    delete_missing: bool = True,
+    verbose: bool = True
+) -> dict:
+    """
+    CSV ile meals tablosunu hash karşılaştırmasıyla senkronize et (meal_id anahtarlı).
+
+    CSV tek geçişte okunur; her parçada sadece yeni veya hash'i değişen
+    satırlar staging + upsert ile yazılır. CSV'de olmayan öğünler
+    delete_missing ise silinir. Herhangi bir değişiklik olduysa
+    catalog_version bir artar, yoksa dokunulmaz.
+
+    Returns: {inserted, updated, deleted, delete_skipped, unchanged, version_bumped, seconds}
+    """
+    started = time.perf_counter()
+
+    with engine.connect() as conn:
+        existing = _load_existing_hashes(conn)
+
+    seen = []
+    inserted = updated = unchanged = 0
+    deleted = delete_skipped = 0
+
+    try:
+        for chunk in read_meal_chunks(csv_path, KEY_MEAL_ID, chunksize):
+            seen.append(chunk["meal_id"].to_numpy())
+
+            ids = chunk["meal_id"].to_numpy()
+            is_new = ~np.isin(ids, existing.index.to_numpy())
+            # content_hash'i boş eski satırlar da değişmiş sayılır
+            current = existing.reindex(ids).to_numpy()
+            is_changed = ~is_new & (current != chunk[HASH_COLUMN].to_numpy())
+
+            changed = chunk[is_new | is_changed]
+            if not changed.empty:
+                with engine.begin() as conn:
+                    upsert_chunk(conn, changed, KEY_MEAL_ID)
+
+            inserted += int(is_new.sum())
+            updated += int(is_changed.sum())
+            unchanged += len(chunk) - int(is_new.sum()) - int(is_changed.sum())
+            if verbose:
+                print(f"Chunk {len(seen)}: {int(is_new.sum())} new, {int(is_changed.sum())} changed, {len(chunk)} scanned")
+
+        if delete_missing and len(existing):
+            seen_ids = pd.Index(np.unique(np.concatenate(seen)) if seen else [])
+            missing = existing.index.difference(seen_ids)
+            if len(missing):
+                with engine.begin() as conn:
+                    deleted = _delete_meals(conn, missing.tolist())
+                delete_skipped = len(missing) - deleted
+    finally:
+        # Silme adımı (veya sonraki bir parça) hata verse de commit edilmiş
+        # değişiklikler için versiyon artar
+        version_bumped = bool(inserted or updated or deleted)
+        if version_bumped:
+            with engine.begin() as conn:
+                bump_catalog_version(conn)
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        "delete_skipped": delete_skipped,
+        "unchanged": unchanged,
+        "version_bumped": version_bumped,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
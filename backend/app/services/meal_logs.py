@@ -0,0 +1,101 @@
+"""
+Meal Log Writes
+
+Log ekleme / silme, değişiklik günlüğü (MealLogEvent) ve streak tek
+transaction'da yazılır; commit sonrası streak leaderboard güncellenir.
+
+Log geçmişi yemek alanlarıyla tek JOIN sorgusuyla okunur; uzun aralıklar
+server-side cursor'dan NDJSON olarak akıtılır (sabit bellek). Aynı kullanıcının eşzamanlı yazımları streak
+satırı kilidinde sıralanır (bkz. app/services/streaks.py).
+"""
+
+from datetime import date
+from typing import Iterator, Optional, Tuple
+import json
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.db.models import Meal, MealLog, MealLogEvent, UserStreak
+from app.services.leaderboard import streak_leaderboard
+from app.services.streaks import lock_streak, record_log, record_log_removed
+
+# JSON (tek gövde) cevapta izin verilen en uzun aralık; daha uzunu NDJSON
+JSON_MAX_DAYS = 93
+# Server-side cursor'dan tek seferde çekilen satır
+STREAM_BATCH_ROWS = 1000
+
+
+def add_meal_log(db: Session, user_id: int, meal_id: int, portion: float, log_date: date) -> Tuple[MealLog, UserStreak]:
+    """Logu ekle ve streak'i güncelle (commit dahil; hata olursa çağıran rollback yapar)"""
+    lock_streak(db, user_id)
+    log = MealLog(user_id=user_id, meal_id=meal_id, portion=portion, log_date=log_date)
+    db.add(log)
+    # Artımlı kural madenciliği için değişiklik günlüğü (aynı transaction)
+    db.add(MealLogEvent(user_id=user_id, log_date=log_date, meal_id=meal_id, delta=1))
+    db.flush()
+    streak = record_log(db, user_id, log_date)
+    db.commit()
+    db.refresh(log)
+    streak_leaderboard.update(user_id, streak.current_streak, streak.max_streak, streak.last_logged_date)
+    return log, streak
+
+
+def delete_meal_log(db: Session, user_id: int, log_id: int) -> Optional[UserStreak]:
+    """Kullanıcının logunu sil; bulunamazsa None"""
+    lock_streak(db, user_id)
+    log = db.query(MealLog).filter(MealLog.id == log_id, MealLog.user_id == user_id).first()
+    if not log:
+        db.rollback()
+        return None
+    db.add(MealLogEvent(user_id=log.user_id, log_date=log.log_date, meal_id=log.meal_id, delta=-1))
+    db.delete(log)
+    db.flush()
+    streak = record_log_removed(db, user_id, log.log_date)
+    db.commit()
+    streak_leaderboard.update(user_id, streak.current_streak, streak.max_streak, streak.last_logged_date)
+    return streak
+
+
+def log_history_query(user_id: int, start: date, end: date) -> Select:
+    """[start, end] logları + yemek alanları (makrolar porsiyonla çarpılmış), tarih sırasıyla"""
+    return select(
+        MealLog.id,
+        MealLog.log_date,
+        MealLog.meal_id,
+        MealLog.portion,
+        Meal.meal_name,
+        Meal.meal_type,
+        Meal.cuisine,
+        (Meal.calories * MealLog.portion).label("calories"),
+        (Meal.protein_g * MealLog.portion).label("protein_g"),
+        (Meal.carbs_g * MealLog.portion).label("carbs_g"),
+        (Meal.fat_g * MealLog.portion).label("fat_g")
+    ).join(
+        Meal, Meal.meal_id == MealLog.meal_id
+    ).where(
+        MealLog.user_id == user_id,
+        MealLog.log_date >= start,
+        MealLog.log_date <= end
+    ).order_by(MealLog.log_date, MealLog.id)
+
+
+def log_row(row) -> dict:
+    item = dict(row._mapping)
+    item["log_date"] = item["log_date"].isoformat()
+    return item
+
+
+def stream_log_history(engine: Engine, user_id: int, start: date, end: date) -> Iterator[str]:
+    """
+    NDJSON satırları. Kendi bağlantısını açar (istek Session'ı cevap
+    akarken kapanmış olur) ve satırları STREAM_BATCH_ROWS'luk parçalarla çeker.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=STREAM_BATCH_ROWS).execute(
+            log_history_query(user_id, start, end)
+        )
+        for rows in result.partitions():
+            yield "".join(json.dumps(log_row(row), ensure_ascii=False) + "\n" for row in rows)
@@ -0,0 +1,254 @@
+"""
+Meal Planner
+
+"Günün geri kalanında ne yemeliyim?": kalan kalori / protein / karbonhidrat /
+yağ hedefine en yakın 1–3 öğünlük kombinasyonlar.
+
+Her aday bir (yemek, porsiyon) çiftidir. Makrolar kalan hedefe bölünerek
+normalize edilir; hedef g vektörü (kalan hedef MIN_REMAINING'den büyükse 1)
+ve plan hatası
+
+    Σ_d w_d · (plan_d − g_d)²
+
+şeklindedir. Kalori üst sınırı (1 + CALORIE_TOLERANCE) kesindir.
+
+Arama slot slot ilerler (slot = bir meal_type veya herhangi biri):
+  - Havuz: diet_type / meal_type filtresi ve kalori sınırından geçen adaylar;
+    makro ızgarasında aynı hücreye düşenlerden biri tutulur, en fazla POOL_SIZE.
+  - Ara slotlarda kısmi toplamların kalan havuzların min/max kutusuna
+    uzaklığı bir alt sınırdır (lower bound); en iyi PARTIAL_LIMIT kısmi tutulur.
+  - Son slot: kısmi planlar alt sınıra göre sıralı bloklarla tek matris
+    çarpımıyla tamamlanır. Sıradaki bloğun alt sınırı mevcut en iyi
+    `limit` planın en kötüsünü geçiyorsa arama biter (branch and bound).
+
+Süre bütçesi aşılırsa o ana kadar bulunan en iyi planlar döner (complete=False).
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import time
+
+import numpy as np
+
+from app.services.meal_vectors import MealVectors
+
+# calories, protein, carbs, fat
+MACRO_WEIGHTS = np.array([1.0, 1.0, 0.5, 0.5])
+# Normalize ederken payda alt sınırı (kalan ~0 iken bölme patlamasın)
+MIN_REMAINING = np.array([50.0, 5.0, 5.0, 2.0])
+CALORIE_TOLERANCE = 0.10
+DEFAULT_PORTIONS = (1.0, 0.5, 1.5, 2.0)
+MAX_SLOTS = 3
+
+POOL_SIZE = 400
+PARTIAL_LIMIT = 20_000
+FINAL_BLOCK = 1_000
+# Izgara hücresi: kalan hedefin %2'si
+GRID_STEP = 0.02
+
+
+class Pool:
+    """Bir slotun adayları: yemek pozisyonu, porsiyon, normalize makrolar"""
+
+    def __init__(self, meal_pos: np.ndarray, portion: np.ndarray, units: np.ndarray):
+        self.meal_pos = meal_pos
+        self.portion = portion
+        self.units = units
+
+    def __len__(self) -> int:
+        return len(self.meal_pos)
+
+
+class PlanResult:
+    def __init__(self, plans: List[Tuple[float, List[Tuple[int, float]]]], complete: bool, evaluated: int, elapsed_ms: float):
+        # [(hata, [(meal_pos, porsiyon), ...])] hataya göre artan
+        self.plans = plans
+        self.complete = complete
+        self.evaluated = evaluated
+        self.elapsed_ms = elapsed_ms
+
+
+def _candidate_pool(
+    vectors: MealVectors,
+    meal_mask: np.ndarray,
+    portions: Sequence[float],
+    scale: np.ndarray,
+    calorie_cap: float
+) -> Pool:
+    """Filtreden geçen (yemek, porsiyon) adayları, makro ızgarasında hücre başına bir tane"""
+    meals = np.flatnonzero(meal_mask)
+    # Porsiyonlar 1.0'a yakınlığa göre: aynı ızgara hücresinde tam porsiyon tercih edilir
+    portions = np.array(sorted(portions, key=lambda p: abs(p - 1.0)), dtype=np.float64)
+    meal_pos = np.tile(meals, len(portions))
+    portion = np.repeat(portions, len(meals))
+    units = vectors.macros[meal_pos].astype(np.float64) * portion[:, None] / scale
+
+    keep = (units[:, 0] > 0) & (units[:, 0] <= calorie_cap)
+    meal_pos, portion, units = meal_pos[keep], portion[keep], units[keep]
+
+    # 4 × 16 bit hücre koordinatı tek int64 anahtara paketlenir (np.unique axis=0 yavaş)
+    cells = np.clip(np.floor(units / GRID_STEP), 0, 0xFFFF).astype(np.int64)
+    keys = (cells[:, 0] << 48) | (cells[:, 1] << 32) | (cells[:, 2] << 16) | cells[:, 3]
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    return Pool(meal_pos[first], portion[first], units[first])
+
+
+def _nearest(pool: Pool, share: np.ndarray) -> Pool:
+    """Havuz POOL_SIZE'dan büyükse slot başına eşit paya (share) en yakın adaylar"""
+    if len(pool) <= POOL_SIZE:
+        return pool
+    distance = ((pool.units - share) ** 2) @ MACRO_WEIGHTS
+    nearest = np.sort(np.argpartition(distance, POOL_SIZE - 1)[:POOL_SIZE])
+    return Pool(pool.meal_pos[nearest], pool.portion[nearest], pool.units[nearest])
+
+
+def _lower_bound(partial: np.ndarray, goal: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Kalan slotların toplamı [lo, hi] kutusundayken ulaşılabilecek en düşük hata"""
+    residual = goal - partial
+    gap = np.maximum(lo - residual, 0) + np.maximum(residual - hi, 0)
+    return (gap ** 2) @ MACRO_WEIGHTS
+
+
+def _allowed(members: np.ndarray, pool: Pool, slot: int, slots: List[Optional[str]]) -> np.ndarray:
+    """(m, q) - aynı yemek iki kez yok; aynı tip slotlarda sıra sabit (permütasyon tekrarı yok)"""
+    allowed = np.ones((len(members), len(pool)), dtype=bool)
+    for prev in range(slot):
+        if slots[prev] == slots[slot]:
+            allowed &= pool.meal_pos[None, :] > members[:, prev][:, None]
+        else:
+            allowed &= pool.meal_pos[None, :] != members[:, prev][:, None]
+    return allowed
+
+
+def _search_slots(
+    pools: List[Pool],
+    slots: List[Optional[str]],
+    goal: np.ndarray,
+    calorie_cap: float,
+    limit: int,
+    deadline: float
+) -> Tuple[List[Tuple[float, List[Tuple[int, float]]]], bool, int]:
+    sqrt_w = np.sqrt(MACRO_WEIGHTS)
+    n_slots = len(pools)
+    # Kalan slotların toplam min/max kutusu (slot j'den sonrası)
+    lo = [sum((p.units.min(axis=0) for p in pools[j:]), np.zeros(4)) for j in range(n_slots + 1)]
+    hi = [sum((p.units.max(axis=0) for p in pools[j:]), np.zeros(4)) for j in range(n_slots + 1)]
+
+    # Kısmi planlar: toplam (m, 4), üyeler (m, j) pool indeksleri
+    partial = np.zeros((1, 4))
+    members = np.zeros((1, 0), dtype=np.int64)
+    member_meals = np.zeros((1, 0), dtype=np.int64)
+    for slot in range(n_slots - 1):
+        pool = pools[slot]
+        sums = (partial[:, None, :] + pool.units[None, :, :]).reshape(-1, 4)
+        valid = _allowed(member_meals, pool, slot, slots).ravel()
+        valid &= sums[:, 0] + lo[slot + 1][0] <= calorie_cap
+        idx = np.flatnonzero(valid)
+        bound = _lower_bound(sums[idx], goal, lo[slot + 1], hi[slot + 1])
+        if len(idx) > PARTIAL_LIMIT:
+            best = np.argpartition(bound, PARTIAL_LIMIT - 1)[:PARTIAL_LIMIT]
+            idx = idx[best]
+        parent, child = np.divmod(idx, len(pool))
+        partial = sums[idx]
+        members = np.hstack([members[parent], child[:, None]])
+        member_meals = np.hstack([member_meals[parent], pool.meal_pos[child][:, None]])
+
+    last = pools[-1]
+    bound = _lower_bound(partial, goal, lo[n_slots - 1], hi[n_slots - 1])
+    order = np.argsort(bound, kind="stable")
+    b = last.units * sqrt_w
+    b_norm = (b ** 2).sum(axis=1)
+    variants = int(np.prod([len(np.unique(p.portion)) for p in pools]))
+
+    # Bulunan planlar: (hata, slot başına pool indeksi tuple'ı)
+    found = []
+    complete = True
+    evaluated = 0
+    for start in range(0, len(order), FINAL_BLOCK):
+        threshold = found[limit - 1][0] if len(found) >= limit else np.inf
+        block = order[start:start + FINAL_BLOCK]
+        if bound[block[0]] >= threshold:
+            break
+        # Bütçe aşılsa da en az bir blok değerlendirilir (boş cevap dönmesin)
+        if found and time.perf_counter() > deadline:
+            complete = False
+            break
+
+        a = (partial[block] - goal) * sqrt_w
+        errors = (a ** 2).sum(axis=1)[:, None] + b_norm[None, :] + 2.0 * (a @ b.T)
+        over = partial[block, 0][:, None] + last.units[None, :, 0] > calorie_cap
+        errors[over | ~_allowed(member_meals[block], last, n_slots - 1, slots)] = np.inf
+        evaluated += errors.size
+
+        # Bir yemek kümesinin en fazla `variants` porsiyon varyantı var: en iyi
+        # limit·variants eleman, tekilleştirmeden sonra en iyi `limit` kümeyi içerir
+        take = min(errors.size, limit * variants)
+        flat = np.argpartition(errors.ravel(), take - 1)[:take]
+        rows, cols = np.divmod(flat, len(last))
+        for err, row, col in zip(errors.ravel()[flat].tolist(), rows.tolist(), cols.tolist()):
+            if err < threshold:
+                found.append((err, tuple(members[block[row]].tolist()) + (col,)))
+
+        # Aynı yemek kümesinin farklı porsiyonlarından sadece en iyisi
+        found.sort(key=lambda f: f[0])
+        unique, seen = [], set()
+        for err, combo in found:
+            meals = frozenset(int(pools[s].meal_pos[i]) for s, i in enumerate(combo))
+            if meals not in seen:
+                seen.add(meals)
+                unique.append((err, combo))
+        found = unique[:limit]
+
+    plans = [
+        (err, [(int(pools[s].meal_pos[i]), float(pools[s].portion[i])) for s, i in enumerate(combo)])
+        for err, combo in found
+    ]
+    return plans, complete, evaluated
+
+
+def plan_meals(
+    vectors: MealVectors,
+    remaining: dict,
+    slots: Optional[List[str]] = None,
+    diet_types: Optional[List[str]] = None,
+    portions: Sequence[float] = DEFAULT_PORTIONS,
+    max_meals: int = MAX_SLOTS,
+    limit: int = 5,
+    budget_ms: float = 150
+) -> PlanResult:
+    """
+    slots verilirse tam o meal_type'larla (sırasız), verilmezse herhangi
+    tipten 1..max_meals öğünlük planlar aranır.
+    remaining: {calories, protein, carbs, fat}
+    """
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000.0
+    target = np.array([remaining["calories"], remaining["protein"], remaining["carbs"], remaining["fat"]], dtype=np.float64)
+    scale = np.maximum(target, MIN_REMAINING)
+    goal = target / scale
+    calorie_cap = goal[0] * (1.0 + CALORIE_TOLERANCE)
+
+    base_mask = vectors.category_mask("diet_type", diet_types or [])
+    if slots:
+        layouts = [list(slots)]
+    else:
+        layouts = [[None] * n for n in range(1, max_meals + 1)]
+
+    plans, complete, evaluated = [], True, 0
+    candidates = {}
+    for layout in layouts:
+        pools = []
+        for slot in layout:
+            if slot not in candidates:
+                meal_mask = base_mask & vectors.category_mask("meal_type", [slot] if slot else [])
+                candidates[slot] = _candidate_pool(vectors, meal_mask, portions, scale, calorie_cap)
+            pools.append(_nearest(candidates[slot], goal / len(layout)))
+        if any(len(p) == 0 for p in pools):
+            continue
+        found, done, count = _search_slots(pools, [s.lower() if s else None for s in layout], goal, calorie_cap, limit, deadline)
+        plans.extend(found)
+        complete &= done
+        evaluated += count
+
+    plans.sort(key=lambda p: p[0])
+    return PlanResult(plans[:limit], complete, evaluated, (time.perf_counter() - start) * 1000)
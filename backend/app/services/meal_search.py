@@ -0,0 +1,305 @@
+"""
+Semantic Meal Search
+
+"high protein breakfast", "light chicken dinner" gibi sorgular için yerel
+(ağ erişimi olmayan) hashing TF-IDF indeksi.
+
+Her yemeğin dokümanı: ad (NAME_WEIGHT kat) + cuisine / meal_type /
+diet_type / cooking_method + makro tercile etiketleri ("high protein",
+"low calorie"...). Unigram ve bigram'lar crc32 ile HASH_DIM boyutuna
+hash'lenir, tf = 1 + log(sayı), idf = log((1 + n) / (1 + df)) + 1, satırlar
+birim uzunluktadır. Matris seyrek float32 (CSC) olarak catalog_version
+başına diske yazılır:
+
+    {MEAL_INDEX_DIR}/search/v{catalog_version}/index.npz
+
+Versiyonun dosyası yoksa indeks arka planda kurulur, o sırada istek
+IndexNotReady (503) alır.
+
+Sorgu aynı şekilde vektörlenir; skor tek seyrek matris-vektör çarpımıdır
+(sadece sorgunun kolonlarına dokunur), makro filtreleri MealVectors
+maskeleridir.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import os
+import re
+import tempfile
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Meal
+from app.mining.transactions import tercile_codes
+from app.db.session import engine
+from app.services.catalog import BackgroundBuilder, IndexNotReady, VersionedCache, read_catalog_version
+from app.services.meal_vectors import MealVectors
+
+HASH_DIM = 1 << 18
+NAME_WEIGHT = 2
+TEXT_COLUMNS = ["cuisine", "meal_type", "diet_type", "cooking_method"]
+# Tercile etiketinin dokümandaki adı: "high protein", "low calorie" ...
+MACRO_TAGS = {
+    "calories": "calorie", "protein_g": "protein", "carbs_g": "carb", "fat_g": "fat",
+    "fiber_g": "fiber", "sugar_g": "sugar", "sodium_mg": "sodium"
+}
+# Sorgu genişletme (İngilizce katalog + Türkçe sorgular)
+SYNONYMS = {
+    "light": "low calorie", "hafif": "low calorie", "lean": "low fat", "hearty": "high calorie",
+    "doyurucu": "high calorie", "proteinli": "high protein", "yağsız": "low fat",
+    "kahvaltı": "breakfast", "öğle": "lunch", "akşam": "dinner", "atıştırmalık": "snack",
+    "tavuk": "chicken", "balık": "fish", "sebze": "vegetable", "salata": "salad",
+    "çorba": "soup", "sağlıklı": "healthy"
+}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Küçük harf kelimeler, basit çoğul kırpma (eggs → egg)"""
+    words = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def terms(words: List[str]) -> List[str]:
+    """Unigram + bigram"""
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_term(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) % HASH_DIM
+
+
+def expand_query(text: str) -> List[str]:
+    words = []
+    for word in tokenize(text):
+        words.extend(tokenize(SYNONYMS[word]) if word in SYNONYMS else [word])
+    return words
+
+
+def build_documents(df: pd.DataFrame) -> List[List[str]]:
+    """Yemek başına (ağırlıklı) terim listesi"""
+    tags = [[] for _ in range(len(df))]
+    for col, name in MACRO_TAGS.items():
+        codes, labels = tercile_codes(pd.to_numeric(df[col], errors="coerce"))
+        for i, code in enumerate(codes.tolist()):
+            if code >= 0:
+                tags[i].append(f"{labels[code]} {name}")
+
+    healthy = df["is_healthy"].fillna(False).astype(bool).tolist()
+    documents = []
+    for i, row in enumerate(df[["meal_name"] + TEXT_COLUMNS].itertuples(index=False)):
+        name_terms = terms(tokenize(row.meal_name or ""))
+        doc = name_terms * NAME_WEIGHT
+        for value in row[1:]:
+            if isinstance(value, str) and value:
+                doc.extend(terms(tokenize(value)))
+        for tag in tags[i]:
+            doc.extend(terms(tokenize(tag)))
+        if healthy[i]:
+            doc.append("healthy")
+        documents.append(doc)
+    return documents
+
+
+def build_tfidf(documents: List[List[str]]) -> Tuple[sparse.csc_matrix, np.ndarray]:
+    """(n_docs, HASH_DIM) satır-normalize float32 CSC matris ve idf (HASH_DIM,)"""
+    rows, cols = [], []
+    for i, doc in enumerate(documents):
+        hashed = [hash_term(t) for t in doc]
+        rows.extend([i] * len(hashed))
+        cols.extend(hashed)
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+        shape=(len(documents), HASH_DIM)
+    )
+    counts.sum_duplicates()
+
+    doc_freq = np.bincount(counts.indices, minlength=HASH_DIM)
+    idf = (np.log((1.0 + len(documents)) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+    counts.data = (1.0 + np.log(counts.data)) * idf[counts.indices]
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags((1.0 / norms).astype(np.float32)) @ counts
+    return matrix.astype(np.float32).tocsc(), idf
+
+
+class SearchIndex:
+    def __init__(self, meal_ids: np.ndarray, matrix: sparse.csc_matrix, idf: np.ndarray):
+        self.meal_ids = meal_ids
+        self.matrix = matrix
+        self.idf = idf
+        self._aligned: Optional[Tuple[MealVectors, np.ndarray]] = None
+
+    def query_vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(kolonlar, ağırlıklar) - birim uzunlukta seyrek sorgu vektörü"""
+        counts: Dict[int, int] = {}
+        for term in terms(expand_query(text)):
+            col = hash_term(term)
+            counts[col] = counts.get(col, 0) + 1
+        cols = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[cols]
+        # Katalogda hiç geçmeyen terimler skoru değiştirmez, sadece normu şişirir
+        seen = self.matrix.indptr[cols + 1] > self.matrix.indptr[cols]
+        cols, weights = cols[seen], weights[seen]
+        if len(cols) == 0:
+            return cols, weights
+        return cols, weights / np.linalg.norm(weights)
+
+    def scores(self, text: str) -> np.ndarray:
+        """Tüm yemekler için kosinüs benzerliği (meal_ids sırasıyla)"""
+        cols, weights = self.query_vector(text)
+        if len(cols) == 0:
+            return np.zeros(len(self.meal_ids), dtype=np.float32)
+        return self.matrix[:, cols] @ weights
+
+    def positions_in(self, vectors: MealVectors) -> np.ndarray:
+        """İndeks satırlarının MealVectors pozisyonları (aynı katalog versiyonu için bir kez)"""
+        aligned = self._aligned
+        if aligned is None or aligned[0] is not vectors:
+            aligned = (vectors, vectors.positions(self.meal_ids))
+            self._aligned = aligned
+        return aligned[1]
+
+
+def _index_dir(catalog_version: int) -> str:
+    return os.path.join(settings.MEAL_INDEX_DIR, "search", f"v{catalog_version}")
+
+
+def build_search_index(engine: Engine, catalog_version: Optional[int] = None) -> dict:
+    """
+    TF-IDF indeksini kur ve catalog_version dizinine yaz. Versiyon verilmezse
+    güncel versiyon okunur; verilirse (isteğin gördüğü versiyon) arada
+    versiyon artmış olsa da o dizine yazılır.
+    """
+    start = time.perf_counter()
+    columns = [Meal.meal_id, Meal.meal_name, Meal.is_healthy] + [getattr(Meal, c) for c in TEXT_COLUMNS + list(MACRO_TAGS)]
+    with engine.connect() as conn:
+        if catalog_version is None:
+            catalog_version = read_catalog_version(conn)
+        df = pd.read_sql(select(*columns).order_by(Meal.meal_id), conn)
+
+    matrix, idf = build_tfidf(build_documents(df))
+
+    directory = _index_dir(catalog_version)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "index.npz")
+    # Eşzamanlı kurulumlar birbirinin geçici dosyasını ezmesin: benzersiz isim
+    fd, tmp_path = tempfile.mkstemp(prefix="index.", suffix=".tmp.npz", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                meal_ids=df["meal_id"].to_numpy(dtype=np.int64),
+                data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                idf=idf
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {
+        "catalog_version": catalog_version,
+        "meals": len(df),
+        "nnz": int(matrix.nnz),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+def load_search_index(catalog_version: int) -> SearchIndex:
+    with np.load(os.path.join(_index_dir(catalog_version), "index.npz")) as data:
+        meal_ids = data["meal_ids"]
+        matrix = sparse.csc_matrix(
+            (data["data"], data["indices"], data["indptr"]), shape=(len(meal_ids), HASH_DIM)
+        )
+        return SearchIndex(meal_ids, matrix, data["idf"])
+
+
+search_builder = BackgroundBuilder(
+    "meal_search", lambda catalog_version: build_search_index(engine, catalog_version=catalog_version)
+)
+
+
+def _load_index(db: Session, catalog_version: int) -> SearchIndex:
+    if not os.path.exists(os.path.join(_index_dir(catalog_version), "index.npz")):
+        # Script çalıştırılmamış veya katalog yeni değişti: istek kurulumu beklemez
+        search_builder.start(catalog_version)
+        raise IndexNotReady(f"search index v{catalog_version} is being built")
+    return load_search_index(catalog_version)
+
+
+search_index_cache = VersionedCache("meal_search", _load_index)
+
+
+def top_matches(index: SearchIndex, vectors: MealVectors, text: str, mask: Optional[np.ndarray], limit: int) -> List[Tuple[int, float]]:
+    """
+    Sorguya en benzer yemekler (skor > 0). mask: MealVectors satır maskesi (filtreler)
+    Returns: [(meal_id, skor)]
+    """
+    scores = index.scores(text)
+    if mask is not None:
+        positions = index.positions_in(vectors)
+        keep = positions >= 0
+        keep[keep] &= mask[positions[keep]]
+        scores = np.where(keep, scores, 0)
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return list(zip(index.meal_ids[candidates].tolist(), scores[candidates].tolist()))
+
+
+BENCHMARK_QUERIES = [
+    "high protein breakfast", "light chicken dinner", "vegan lunch", "low carb snack",
+    "grilled fish", "hafif tavuk akşam", "hearty soup", "salad"
+]
+
+
+def benchmark_search(engine: Engine, queries: List[str] = BENCHMARK_QUERIES, repeats: int = 20, limit: int = 20) -> dict:
+    """Sorgu başına ortalama süre (ms): TF-IDF indeksi vs meal_name LIKE taraması"""
+    # Önce build_search_index çalıştırılmış olmalı
+    with engine.connect() as conn:
+        index = load_search_index(read_catalog_version(conn))
+    vectors = MealVectors(pd.read_sql(
+        select(Meal.meal_id, Meal.calories, Meal.protein_g, Meal.carbs_g, Meal.fat_g, Meal.meal_type, Meal.diet_type).order_by(Meal.meal_id),
+        engine
+    ))
+    mask = np.ones(len(vectors), dtype=bool)
+
+    start = time.perf_counter()
+    semantic_hits = {}
+    for _ in range(repeats):
+        for text in queries:
+            semantic_hits[text] = len(top_matches(index, vectors, text, mask, limit))
+    semantic_ms = (time.perf_counter() - start) * 1000 / (repeats * len(queries))
+
+    start = time.perf_counter()
+    like_hits = {}
+    with engine.connect() as conn:
+        for _ in range(repeats):
+            for text in queries:
+                rows = conn.execute(
+                    select(Meal.meal_id).where(Meal.meal_name.ilike(f"%{text}%")).limit(limit)
+                ).all()
+                like_hits[text] = len(rows)
+    like_ms = (time.perf_counter() - start) * 1000 / (repeats * len(queries))
+
+    return {
+        "meals": len(index.meal_ids),
+        "semantic_ms": round(semantic_ms, 3),
+        "like_ms": round(like_ms, 3),
+        "hits": {text: {"semantic": semantic_hits[text], "like": like_hits[text]} for text in queries}
+    }
@@ -0,0 +1,169 @@
+"""
+Meal Similarity Index
+
+İçerik tabanlı "buna benzer yemekler": besin vektörü (z-score) + one-hot
+cuisine / diet_type / meal_type, birim uzunluğa normalize edilir; kosinüs
+benzerliği nokta çarpımıdır.
+
+Her yemeğin en yakın top-k komşusu bloklu matris çarpımıyla önceden
+hesaplanır ve catalog_version başına diske yazılır:
+
+    {MEAL_INDEX_DIR}/similarity/v{catalog_version}/meal_ids.npy
+                                                  /neighbors.npy   (n, k) int32 pozisyon
+                                                  /scores.npy      (n, k) float32
+
+API dosyaları memory-mapped açar; istek başına mesafe hesabı yapılmaz.
+Versiyonun dizini yoksa indeks arka planda kurulur, o sırada istek
+IndexNotReady (503) alır.
+"""
+
+from typing import List, Optional, Tuple
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Meal
+from app.db.session import engine
+from app.services.catalog import BackgroundBuilder, IndexNotReady, VersionedCache, read_catalog_version
+
+NUTRIENT_COLUMNS = [
+    "calories", "protein_g", "carbs_g", "fat_g", "fiber_g", "sugar_g",
+    "sodium_mg", "cholesterol_mg"
+]
+CATEGORY_COLUMNS = ["cuisine", "diet_type", "meal_type"]
+# One-hot blok ağırlığı (besin vektörüne göre kategorinin etkisi)
+CATEGORY_WEIGHT = 1.0
+# Blok başına benzerlik matrisi eleman sayısı (~256 MB float32)
+BLOCK_ELEMENTS = 64_000_000
+
+
+def build_feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    """(n_meals, n_features) float32, satırlar birim uzunlukta"""
+    nutrients = df[NUTRIENT_COLUMNS].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    std = nutrients.std(axis=0)
+    std[std == 0] = 1.0
+    blocks = [(nutrients - nutrients.mean(axis=0)) / std]
+
+    for col in CATEGORY_COLUMNS:
+        codes = pd.Categorical(df[col].fillna("")).codes
+        one_hot = np.zeros((len(df), codes.max() + 1 if len(codes) else 0))
+        one_hot[np.arange(len(df)), codes] = CATEGORY_WEIGHT
+        blocks.append(one_hot)
+
+    features = np.hstack(blocks).astype(np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+def top_k_neighbors(features: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her satır için kendisi hariç en benzer k satır (bloklu X @ X.T).
+    Returns: (neighbors int32 (n, k), scores float32 (n, k)) - benzerliğe göre azalan
+    """
+    n = features.shape[0]
+    k = max(0, min(k, n - 1))
+    neighbors = np.zeros((n, k), dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if k == 0:
+        return neighbors, scores
+
+    block = max(1, BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, n, block):
+        end = min(start + block, n)
+        sims = features[start:end] @ features.T
+        sims[np.arange(end - start), np.arange(start, end)] = -np.inf  # kendisi
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        neighbors[start:end] = np.take_along_axis(part, order, axis=1)
+        scores[start:end] = np.take_along_axis(part_scores, order, axis=1)
+    return neighbors, scores
+
+
+class SimilarityIndex:
+    """Memory-mapped komşu tablosu"""
+
+    def __init__(self, directory: str):
+        self.meal_ids = np.load(os.path.join(directory, "meal_ids.npy"), mmap_mode="r")
+        self.neighbors = np.load(os.path.join(directory, "neighbors.npy"), mmap_mode="r")
+        self.scores = np.load(os.path.join(directory, "scores.npy"), mmap_mode="r")
+
+    def similar(self, meal_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """[(meal_id, benzerlik)]; yemek indekste yoksa None"""
+        pos = int(np.searchsorted(self.meal_ids, meal_id))
+        if pos >= len(self.meal_ids) or self.meal_ids[pos] != meal_id:
+            return None
+        row = self.neighbors[pos, :limit]
+        return list(zip(self.meal_ids[row].tolist(), self.scores[pos, :limit].tolist()))
+
+
+def _index_dir(catalog_version: int) -> str:
+    return os.path.join(settings.MEAL_INDEX_DIR, "similarity", f"v{catalog_version}")
+
+
+def build_similarity_index(engine: Engine, k: int = None, catalog_version: Optional[int] = None) -> dict:
+    """
+    Komşu tablosunu hesapla ve catalog_version dizinine yaz. Versiyon
+    verilmezse güncel versiyon okunur; verilirse (isteğin gördüğü versiyon)
+    arada versiyon artmış olsa da o dizine yazılır.
+    """
+    k = k or settings.SIMILAR_MEALS_TOP_K
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        if catalog_version is None:
+            catalog_version = read_catalog_version(conn)
+        columns = [Meal.meal_id] + [getattr(Meal, c) for c in NUTRIENT_COLUMNS + CATEGORY_COLUMNS]
+        df = pd.read_sql(select(*columns).order_by(Meal.meal_id), conn)
+
+    features = build_feature_matrix(df)
+    neighbors, scores = top_k_neighbors(features, k)
+
+    # Yarım yazılmış dizin okunmasın: benzersiz geçici dizine yaz (eşzamanlı
+    # kurulumlar birbirinin dosyasını ezmesin), sonra taşı
+    directory = _index_dir(catalog_version)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f"v{catalog_version}.", suffix=".tmp", dir=os.path.dirname(directory))
+    try:
+        np.save(os.path.join(tmp_dir, "meal_ids.npy"), df["meal_id"].to_numpy(dtype=np.int64))
+        np.save(os.path.join(tmp_dir, "neighbors.npy"), neighbors)
+        np.save(os.path.join(tmp_dir, "scores.npy"), scores)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # Başka bir kurulum aynı versiyonu bu arada yazdıysa onunki kalır
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.exists(os.path.join(directory, "scores.npy")):
+            raise
+
+    return {
+        "catalog_version": catalog_version,
+        "meals": len(df),
+        "k": neighbors.shape[1],
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+similarity_builder = BackgroundBuilder(
+    "meal_similarity", lambda catalog_version: build_similarity_index(engine, catalog_version=catalog_version)
+)
+
+
+def _load_index(db: Session, catalog_version: int) -> SimilarityIndex:
+    directory = _index_dir(catalog_version)
+    if not os.path.exists(os.path.join(directory, "scores.npy")):
+        # Script çalıştırılmamış veya katalog yeni değişti: istek kurulumu beklemez
+        similarity_builder.start(catalog_version)
+        raise IndexNotReady(f"similarity index v{catalog_version} is being built")
+    return SimilarityIndex(directory)
+
+
+similarity_index_cache = VersionedCache("meal_similarity", _load_index)
@@ -0,0 +1,73 @@
+"""
+Meal Vectors
+
+Katalogun makro vektörleri (kalori, protein, karbonhidrat, yağ) ve
+kategorik kodları (meal_type, diet_type) meal_id sırasıyla NumPy
+dizilerinde tutulur. Öneri / planlama endpoint'leri her istekte meals
+tablosunu taramak yerine bu dizileri filtreler.
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Meal
+from app.services.catalog import VersionedCache
+
+MACRO_COLUMNS = ["calories", "protein_g", "carbs_g", "fat_g"]
+# UserContext.remaining() anahtarları, MACRO_COLUMNS ile aynı sırada
+MACRO_KEYS = ["calories", "protein", "carbs", "fat"]
+
+
+class MealVectors:
+    def __init__(self, df: pd.DataFrame):
+        self.meal_ids = df["meal_id"].to_numpy(dtype=np.int64)
+        # (n_meals, 4) float32
+        self.macros = df[MACRO_COLUMNS].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=np.float32)
+
+        meal_types = pd.Categorical(df["meal_type"].fillna(""))
+        diet_types = pd.Categorical(df["diet_type"].fillna(""))
+        self.meal_type_names: List[str] = list(meal_types.categories)
+        self.diet_type_names: List[str] = list(diet_types.categories)
+        self.meal_type_codes = meal_types.codes.astype(np.int16)
+        self.diet_type_codes = diet_types.codes.astype(np.int16)
+
+    def __len__(self) -> int:
+        return len(self.meal_ids)
+
+    def positions(self, meal_ids: np.ndarray) -> np.ndarray:
+        """meal_id → satır pozisyonu; katalogda olmayanlar -1"""
+        pos = np.searchsorted(self.meal_ids, meal_ids)
+        pos[pos >= len(self.meal_ids)] = 0
+        found = self.meal_ids[pos] == meal_ids if len(self.meal_ids) else np.zeros(len(pos), dtype=bool)
+        return np.where(found, pos, -1)
+
+    def category_mask(self, column: str, values: List[str]) -> np.ndarray:
+        """column (meal_type / diet_type) değeri verilenlerden biri olan satırlar (büyük/küçük harf duyarsız)"""
+        if not values:
+            return np.ones(len(self), dtype=bool)
+        codes, categories = {
+            "meal_type": (self.meal_type_codes, self.meal_type_names),
+            "diet_type": (self.diet_type_codes, self.diet_type_names)
+        }[column]
+        wanted = {v.lower() for v in values}
+        return np.isin(codes, [i for i, c in enumerate(categories) if c.lower() in wanted])
+
+    def within(self, remaining: dict, keys: List[str]) -> np.ndarray:
+        """Verilen makrolarda kalan değeri aşmayan satırlar"""
+        mask = np.ones(len(self), dtype=bool)
+        for key in keys:
+            mask &= self.macros[:, MACRO_KEYS.index(key)] <= remaining[key]
+        return mask
+
+
+def _build_vectors(db: Session, catalog_version: int) -> MealVectors:
+    columns = [Meal.meal_id] + [getattr(Meal, c) for c in MACRO_COLUMNS] + [Meal.meal_type, Meal.diet_type]
+    df = pd.read_sql(select(*columns).order_by(Meal.meal_id), db.get_bind())
+    return MealVectors(df)
+
+
+meal_vectors_cache = VersionedCache("meal_vectors", _build_vectors)
@@ -122,6 +122,42 @@ def calculate_protein_target(weight_kg: float, goal_type: str) -> int:
     return int(round(weight_kg * multiplier))
 
 
+# Protein dışındaki kalorinin yağdan gelen payı (kalanı karbonhidrat)
+FAT_CALORIE_SHARE = 0.30
+KCAL_PER_GRAM = {"protein": 4, "carbs": 4, "fat": 9}
+
+
+def calculate_macro_targets(calorie_target: int, protein_target: int) -> Tuple[int, int]:
+    """
+    Kalori ve protein hedefinden günlük karbonhidrat / yağ hedefi.
+
+    Yağ: kalorinin %30'u, karbonhidrat: protein ve yağdan kalan kalori.
+
+    Returns: (carbs_g, fat_g)
+    """
+    fat_g = calorie_target * FAT_CALORIE_SHARE / KCAL_PER_GRAM["fat"]
+    carbs_kcal = calorie_target - protein_target * KCAL_PER_GRAM["protein"] - fat_g * KCAL_PER_GRAM["fat"]
+    carbs_g = max(0.0, carbs_kcal / KCAL_PER_GRAM["carbs"])
+    return int(round(carbs_g)), int(round(fat_g))
+
+
+def calculate_remaining(calorie_target: int, protein_target: int, totals: dict) -> dict:
+    """
+    Günlük hedeflerden tüketilen toplamlar düşülmüş kalan makrolar (negatifse 0).
+
+    totals: {calories, protein, carbs, fat} (daily_totals çıktısı)
+    Returns: {calories, protein, carbs, fat}
+    """
+    carbs_target, fat_target = calculate_macro_targets(calorie_target, protein_target)
+    targets = {
+        "calories": calorie_target,
+        "protein": protein_target,
+        "carbs": carbs_target,
+        "fat": fat_target
+    }
+    return {key: max(0.0, float(target) - totals[key]) for key, target in targets.items()}
+
+
 def get_full_calculations(
     weight_kg: float,
     height_cm: int,
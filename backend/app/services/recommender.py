@@ -0,0 +1,253 @@
+"""
+Implicit Feedback Recommender
+
+Loglar, favoriler ve AI kabulleri kullanıcı × yemek etkileşim matrisine
+(scipy.sparse CSR) ağırlıklı olarak toplanır ve implicit ALS (Hu, Koren,
+Volinsky 2008) ile faktörlenir:
+
+    r_ui = LOG_WEIGHT·log sayısı + FAVORITE_WEIGHT·favori + ACCEPT_WEIGHT·kabul sayısı
+    p_ui = 1 (r_ui > 0),  c_ui = 1 + alpha·r_ui
+
+Her yarım adım kapalı formdur: A_u = YᵀY + λI + Y_uᵀ·diag(alpha·r_u)·Y_u,
+b_u = Σ_i c_ui·y_i. Benzer uzunluktaki satırlar bloklanıp doldurulur,
+A_u'lar batched matmul ile, sistemler toplu np.linalg.solve ile çözülür
+(kullanıcı başına Python döngüsü yok).
+
+Faktörler float16 olarak tek dosyada saklanır:
+
+    {RECOMMENDER_DIR}/als_model.npz
+
+API dosyayı mtime değiştiğinde yeniden yükler; öneri, kullanıcı vektörü ile
+tüm yemek faktörlerinin tek matris-vektör çarpımıdır.
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.models import AIAcceptance, FavoriteMeal, Meal, MealLog
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "als_model.npz"
+
+LOG_WEIGHT = 1.0
+FAVORITE_WEIGHT = 4.0
+ACCEPT_WEIGHT = 2.0
+
+DEFAULT_FACTORS = 32
+DEFAULT_ITERATIONS = 15
+DEFAULT_REGULARIZATION = 0.1
+DEFAULT_ALPHA = 10.0
+# Bir bloktaki en büyük tensörün eleman sayısı: faktörler B·L·k ve normal
+# denklemler B·k·k (her biri ≤ ~64 MB float64; matmul / solve geçicileriyle
+# blok başına tepe bellek bunun birkaç katı, ~300 MB)
+BLOCK_ELEMENTS = 8_000_000
+
+
+def load_interactions(engine: Engine) -> Tuple[np.ndarray, np.ndarray, sparse.csr_matrix]:
+    """
+    Returns: (user_ids, meal_ids, R) - R (n_users, n_meals) ağırlıklı etkileşim,
+    user_ids etkileşimi olan kullanıcılar, meal_ids tüm katalog (sıralı)
+    """
+    sources = [
+        (select(MealLog.user_id, MealLog.meal_id, func.count().label("n")).group_by(MealLog.user_id, MealLog.meal_id), LOG_WEIGHT),
+        (select(FavoriteMeal.user_id, FavoriteMeal.meal_id, func.count().label("n")).group_by(FavoriteMeal.user_id, FavoriteMeal.meal_id), FAVORITE_WEIGHT),
+        (select(AIAcceptance.user_id, AIAcceptance.meal_id, func.count().label("n")).group_by(AIAcceptance.user_id, AIAcceptance.meal_id), ACCEPT_WEIGHT)
+    ]
+    frames = []
+    with engine.connect() as conn:
+        meal_ids = np.array(conn.execute(select(Meal.meal_id).order_by(Meal.meal_id)).scalars().all(), dtype=np.int64)
+        for query, weight in sources:
+            df = pd.read_sql(query, conn)
+            # Favori tekrarları tek favori sayılır
+            n = df["n"].clip(upper=1) if weight == FAVORITE_WEIGHT else df["n"]
+            frames.append(pd.DataFrame({
+                "user_id": df["user_id"].astype(np.int64),
+                "meal_id": df["meal_id"].astype(np.int64),
+                "r": n.astype(np.float64) * weight
+            }))
+    df = pd.concat(frames, ignore_index=True)
+
+    # Katalogdan silinmiş yemekler atlanır
+    cols = np.searchsorted(meal_ids, df["meal_id"].to_numpy())
+    cols[cols >= len(meal_ids)] = 0
+    known = meal_ids[cols] == df["meal_id"].to_numpy() if len(meal_ids) else np.zeros(len(df), dtype=bool)
+    df, cols = df[known], cols[known]
+
+    user_ids, rows = np.unique(df["user_id"].to_numpy(), return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (df["r"].to_numpy(), (rows, cols)), shape=(len(user_ids), len(meal_ids))
+    )
+    matrix.sum_duplicates()
+    return user_ids, meal_ids, matrix
+
+
+def _solve_rows(matrix: sparse.csr_matrix, fixed: np.ndarray, regularization: float, alpha: float) -> np.ndarray:
+    """Sabit faktörlere (fixed) göre matrix'in her satırı için kapalı form ALS çözümü"""
+    n_rows, k = matrix.shape[0], fixed.shape[1]
+    result = np.zeros((n_rows, k))
+    gram = fixed.T @ fixed + regularization * np.eye(k)
+    indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+
+    # Satırlar nnz'ye göre sıralanır; bir bloktaki satırlar aynı uzunluğa
+    # (bloğun en uzunu) doldurulur ve (B, L, k) tensörü batched matmul'a girer
+    lengths = np.diff(indptr)
+    order = np.argsort(lengths, kind="stable")
+    order = order[lengths[order] > 0]
+    start = 0
+    while start < len(order):
+        # Sıralı olduğundan bloğun en uzun satırı sonuncusudur:
+        # B·k·max(L, k) ≤ BLOCK_ELEMENTS (kısa satırlarda B·k·k baskındır)
+        window = order[start:start + max(1, BLOCK_ELEMENTS // (max(int(lengths[order[start]]), k) * k))]
+        cost = np.arange(1, len(window) + 1) * np.maximum(lengths[window], k) * k
+        rows = window[:max(1, int(np.searchsorted(cost, BLOCK_ELEMENTS, side="right")))]
+        width = int(lengths[rows[-1]])
+
+        offsets = np.arange(width)
+        valid = offsets[None, :] < lengths[rows][:, None]
+        flat = np.where(valid, indptr[rows][:, None] + offsets[None, :], 0)
+        weights = np.where(valid, alpha * data[flat], 0.0)
+        factors = fixed[indices[flat]] * valid[:, :, None]
+
+        a = gram + np.matmul((factors * weights[:, :, None]).transpose(0, 2, 1), factors)
+        b = (factors * (1.0 + weights)[:, :, None]).sum(axis=1)
+        result[rows] = np.linalg.solve(a, b[:, :, None])[:, :, 0]
+        start += len(rows)
+    return result
+
+
+def fit_als(
+    matrix: sparse.csr_matrix,
+    factors: int = DEFAULT_FACTORS,
+    iterations: int = DEFAULT_ITERATIONS,
+    regularization: float = DEFAULT_REGULARIZATION,
+    alpha: float = DEFAULT_ALPHA,
+    seed: int = 42
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns: (user_factors (n_users, k), item_factors (n_meals, k)) float64"""
+    rng = np.random.default_rng(seed)
+    n_users, n_items = matrix.shape
+    user_factors = np.zeros((n_users, factors))
+    item_factors = rng.normal(scale=0.01, size=(n_items, factors))
+    transposed = matrix.T.tocsr()
+    for _ in range(iterations):
+        user_factors = _solve_rows(matrix, item_factors, regularization, alpha)
+        item_factors = _solve_rows(transposed, user_factors, regularization, alpha)
+    return user_factors, item_factors
+
+
+def _model_path() -> str:
+    return os.path.join(settings.RECOMMENDER_DIR, MODEL_FILE)
+
+
+def train_recommender(
+    engine: Engine,
+    factors: int = DEFAULT_FACTORS,
+    iterations: int = DEFAULT_ITERATIONS,
+    regularization: float = DEFAULT_REGULARIZATION,
+    alpha: float = DEFAULT_ALPHA,
+    save: bool = True
+) -> dict:
+    """Etkileşimleri yükle, ALS eğit, faktörleri diske yaz"""
+    timings = {}
+    start = time.perf_counter()
+    user_ids, meal_ids, matrix = load_interactions(engine)
+    timings["load"] = time.perf_counter() - start
+
+    step = time.perf_counter()
+    user_factors, item_factors = fit_als(matrix, factors, iterations, regularization, alpha)
+    timings["fit"] = time.perf_counter() - step
+
+    # Etkileşimi olmayan kullanıcılar için popülerlik sıralaması
+    popularity = np.asarray((matrix > 0).sum(axis=0)).ravel().astype(np.float32)
+    metadata = {
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "n_users": int(matrix.shape[0]),
+        "n_meals": int(matrix.shape[1]),
+        "nnz": int(matrix.nnz),
+        "factors": factors,
+        "iterations": iterations,
+        "regularization": regularization,
+        "alpha": alpha
+    }
+
+    if save:
+        step = time.perf_counter()
+        path = _model_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            user_ids=user_ids,
+            meal_ids=meal_ids,
+            user_factors=user_factors.astype(np.float16),
+            item_factors=item_factors.astype(np.float16),
+            popularity=popularity,
+            metadata=np.array(json.dumps(metadata))
+        )
+        os.replace(tmp_path, path)
+        timings["save"] = time.perf_counter() - step
+
+    timings["total"] = time.perf_counter() - start
+    return {**metadata, "seconds": {k: round(v, 3) for k, v in timings.items()}}
+
+
+class RecommenderModel:
+    def __init__(self, path: str):
+        with np.load(path) as data:
+            self.user_ids = data["user_ids"]
+            self.meal_ids = data["meal_ids"]
+            # Kullanıcı faktörleri float16 kalır (satır başına dönüştürülür)
+            self.user_factors = data["user_factors"]
+            self.item_factors = data["item_factors"].astype(np.float32)
+            self.popularity = data["popularity"]
+            self.metadata = json.loads(str(data["metadata"]))
+        self.mtime = os.path.getmtime(path)
+
+    def scores(self, user_id: int) -> Tuple[np.ndarray, bool]:
+        """
+        Tüm yemekler için skor (meal_ids sırasıyla).
+        Returns: (scores, personalized) - kullanıcı modelde yoksa popülerlik
+        """
+        pos = int(np.searchsorted(self.user_ids, user_id))
+        if pos < len(self.user_ids) and self.user_ids[pos] == user_id:
+            return self.item_factors @ self.user_factors[pos].astype(np.float32), True
+        return self.popularity, False
+
+
+class RecommenderModelCache:
+    """Modeli bellekte tutar; dosya yeniden yazılınca tekrar yükler"""
+
+    def __init__(self):
+        self._model: Optional[RecommenderModel] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[RecommenderModel]:
+        path = _model_path()
+        try:
+            mtime = os.path.getmtime(path)
+        except FileNotFoundError:
+            return None
+        model = self._model
+        if model and model.mtime == mtime:
+            return model
+        with self._lock:
+            if not self._model or self._model.mtime != mtime:
+                self._model = RecommenderModel(path)
+                logger.info(f"Recommender model loaded: {self._model.metadata}")
+            return self._model
+
+
+recommender_model_cache = RecommenderModelCache()
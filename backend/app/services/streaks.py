@@ -0,0 +1,171 @@
+"""
+Streak Engine
+
+Streak, kullanıcının farklı log_date'lerinden türetilir (gaps and islands):
+ardışık günler bir "ada"dır; max_streak en uzun ada, current_streak son
+log gününde biten adanın uzunluğu, last_logged_date en büyük log_date.
+Bugünün durumu (aktif / uyarı / kırık) build_streak_status'ta
+last_logged_date'e göre belirlenir.
+
+İki yol:
+  - record_log: yeni log son log gününden sonraysa tek koşullu UPDATE
+    (SET current_streak = current_streak + 1 ...), O(1); geçmişe tarihli log
+    iki adayı birleştirebileceği için kullanıcının tarihlerinden yeniden
+    hesaplanır.
+  - recompute_all_streaks: tüm kullanıcılar tek DISTINCT sorgu + sıralı
+    tarih dizisi üzerinde vektörel tek geçiş, tek transaction'da yazılır.
+
+Eşzamanlılık: log yazan / silen transaction önce lock_streak ile streak
+satırını atomik olarak oluşturur-kilitler (MSSQL MERGE WITH (HOLDLOCK),
+diğerlerinde INSERT ... ON CONFLICT DO UPDATE), sonra logu yazar. Aynı
+kullanıcının yazımları bu satırda sıralanır; okuma-değiştir-yaz kaybı ve
+ikinci satır oluşmaz.
+"""
+
+from datetime import date, timedelta
+from typing import Optional, Tuple
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import case, delete, insert, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.models import MealLog, UserStreak
+
+# datetime64[D] (1970-01-01 = 0) → date.toordinal()
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def compute_streaks(user_ids: np.ndarray, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    user_ids, days: (user_id, gün sırası) çiftleri, tekil ve (user_id, gün) sıralı.
+    Returns: (users, current_streak, max_streak, last_day) - kullanıcı başına
+    """
+    if len(days) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    # Yeni ada: yeni kullanıcı veya önceki günle arada boşluk
+    new_island = np.ones(len(days), dtype=bool)
+    new_island[1:] = (user_ids[1:] != user_ids[:-1]) | (np.diff(days) != 1)
+    island_starts = np.flatnonzero(new_island)
+    island_lengths = np.diff(np.append(island_starts, len(days)))
+    island_users = user_ids[island_starts]
+
+    user_starts = np.flatnonzero(np.r_[True, island_users[1:] != island_users[:-1]])
+    user_ends = np.append(user_starts[1:], len(island_starts)) - 1
+    users = island_users[user_starts]
+    max_streak = np.maximum.reduceat(island_lengths, user_starts)
+    current_streak = island_lengths[user_ends]
+    last_day = days[np.append(island_starts[1:], len(days)) - 1][user_ends]
+    return users, current_streak, max_streak, last_day
+
+
+def user_log_days(db: Session, user_id: int) -> np.ndarray:
+    dates = db.execute(
+        select(MealLog.log_date).where(MealLog.user_id == user_id).distinct().order_by(MealLog.log_date)
+    ).scalars().all()
+    return np.array([d.toordinal() for d in dates], dtype=np.int64)
+
+
+def recompute_user_streak(db: Session, user_id: int) -> UserStreak:
+    """Kullanıcının streak'ini log tarihlerinden yeniden hesapla (commit çağırana ait)"""
+    days = user_log_days(db, user_id)
+    streak = db.get(UserStreak, user_id, populate_existing=True)
+    if streak is None:
+        streak = UserStreak(user_id=user_id)
+        db.add(streak)
+
+    _, current, longest, last_day = compute_streaks(np.full(len(days), user_id, dtype=np.int64), days)
+    if len(current):
+        streak.current_streak = int(current[0])
+        streak.max_streak = int(longest[0])
+        streak.last_logged_date = date.fromordinal(int(last_day[0]))
+    else:
+        streak.current_streak = 0
+        streak.max_streak = 0
+        streak.last_logged_date = None
+    return streak
+
+
+def _lock_sql(dialect: str) -> str:
+    if dialect == "mssql":
+        return (
+            "MERGE user_streaks WITH (HOLDLOCK) AS t USING (SELECT :user_id AS user_id) AS s "
+            "ON t.user_id = s.user_id "
+            "WHEN MATCHED THEN UPDATE SET t.current_streak = t.current_streak "
+            "WHEN NOT MATCHED THEN INSERT (user_id, current_streak, max_streak) VALUES (s.user_id, 0, 0);"
+        )
+    return (
+        "INSERT INTO user_streaks (user_id, current_streak, max_streak) VALUES (:user_id, 0, 0) "
+        "ON CONFLICT (user_id) DO UPDATE SET current_streak = user_streaks.current_streak"
+    )
+
+
+def lock_streak(db: Session, user_id: int) -> None:
+    """
+    Streak satırını yoksa oluştur ve satır kilidini al (tek atomik ifade).
+    Log yazmadan / silmeden önce, aynı transaction'da çağrılmalı.
+    """
+    db.execute(text(_lock_sql(db.get_bind().dialect.name)), {"user_id": user_id})
+
+
+def record_log(db: Session, user_id: int, log_date: date) -> UserStreak:
+    """
+    Yeni log sonrası streak (lock_streak alınmış, log flush edilmiş olmalı;
+    commit çağırana ait). Son log gününden sonraki log tek koşullu UPDATE.
+    """
+    continues = UserStreak.last_logged_date == log_date - timedelta(days=1)
+    new_current = case((continues, UserStreak.current_streak + 1), else_=1)
+    result = db.execute(
+        update(UserStreak)
+        .where(UserStreak.user_id == user_id, UserStreak.last_logged_date < log_date)
+        .values(
+            current_streak=new_current,
+            max_streak=case((new_current > UserStreak.max_streak, new_current), else_=UserStreak.max_streak),
+            last_logged_date=log_date
+        )
+        .execution_options(synchronize_session=False)
+    )
+    streak = db.get(UserStreak, user_id, populate_existing=True)
+    if result.rowcount == 0 and (streak.last_logged_date is None or log_date < streak.last_logged_date):
+        # İlk log / geçmişe tarihli log (aynı gün ise değişiklik yok)
+        return recompute_user_streak(db, user_id)
+    return streak
+
+
+def record_log_removed(db: Session, user_id: int, log_date: date) -> Optional[UserStreak]:
+    """Log silindikten sonra (lock_streak alınmış, flush edilmiş): o gün başka log kalmadıysa yeniden hesapla"""
+    still_logged = db.execute(
+        select(MealLog.id).where(MealLog.user_id == user_id, MealLog.log_date == log_date).limit(1)
+    ).first()
+    if still_logged:
+        return db.get(UserStreak, user_id, populate_existing=True)
+    return recompute_user_streak(db, user_id)
+
+
+def recompute_all_streaks(engine: Engine) -> dict:
+    """Tüm kullanıcıların streak'ini tek geçişte yeniden hesapla ve user_streaks'i yeniden yaz"""
+    start = time.perf_counter()
+    query = select(MealLog.user_id, MealLog.log_date).distinct().order_by(MealLog.user_id, MealLog.log_date)
+    with engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+    user_ids = df["user_id"].to_numpy(dtype=np.int64)
+    days = pd.to_datetime(df["log_date"]).to_numpy().astype("datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+    users, current, longest, last_day = compute_streaks(user_ids, days)
+
+    rows = [
+        {"user_id": u, "current_streak": c, "max_streak": m, "last_logged_date": date.fromordinal(d)}
+        for u, c, m, d in zip(users.tolist(), current.tolist(), longest.tolist(), last_day.tolist())
+    ]
+    with engine.begin() as conn:
+        conn.execute(delete(UserStreak))
+        if rows:
+            conn.execute(insert(UserStreak), rows)
+
+    return {
+        "users": len(rows),
+        "log_days": len(days),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
@@ -0,0 +1,180 @@
+"""
+User Context Loader
+
+UserGoals, UserProfile ve bugünkü DailyActivity her endpoint'te ayrı ayrı
+.first() ile sorgulanıyordu. Bu servis üçünü tek bir outer join sorgusuyla
+yükler, istek başına bir kez (FastAPI dependency cache) ve kısa TTL'li
+kullanıcı bazlı cache ile paylaştırır.
+
+Yazma endpoint'leri (POST /user/goals, POST /profile, POST /profile/activity)
+commit sonrası invalidate_user_context() çağırmalıdır.
+"""
+
+from datetime import date
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+from fastapi import Depends
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.db.models import User, UserGoals, UserProfile, DailyActivity
+from app.core.config import settings
+from app.core.security import get_current_user_id
+from app.services.metabolism import get_full_calculations, calculate_macro_targets, calculate_remaining
+
+
+# Hedef yoksa kullanılan varsayılanlar
+DEFAULT_CALORIE_TARGET = 2000
+DEFAULT_PROTEIN_TARGET = 100
+DEFAULT_GOAL_TYPE = "koruma"
+
+
+class UserContext:
+    """
+    Kullanıcının hedef / profil / günlük aktivite görüntüsü.
+
+    ORM nesneleri session'dan ayrılmıştır (detached), sadece okuma içindir.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        activity_date: date,
+        goals: Optional[UserGoals],
+        profile: Optional[UserProfile],
+        activity: Optional[DailyActivity]
+    ):
+        self.user_id = user_id
+        self.activity_date = activity_date
+        self.goals = goals
+        self.profile = profile
+        self.activity = activity
+
+    @property
+    def goal_type(self) -> str:
+        return self.goals.goal_type if self.goals else DEFAULT_GOAL_TYPE
+
+    @property
+    def calorie_target(self) -> int:
+        return self.goals.daily_calorie_target if self.goals else DEFAULT_CALORIE_TARGET
+
+    @property
+    def protein_target(self) -> int:
+        return self.goals.daily_protein_target if self.goals else DEFAULT_PROTEIN_TARGET
+
+    @property
+    def carbs_target(self) -> int:
+        return calculate_macro_targets(self.calorie_target, self.protein_target)[0]
+
+    @property
+    def fat_target(self) -> int:
+        return calculate_macro_targets(self.calorie_target, self.protein_target)[1]
+
+    def remaining(self, totals: dict) -> dict:
+        """Hedeflerden günlük toplamlar düşülmüş kalan makrolar (negatifse 0)"""
+        return calculate_remaining(self.calorie_target, self.protein_target, totals)
+
+    @property
+    def steps(self) -> int:
+        return self.activity.steps if self.activity else 0
+
+    def calculations(self, steps: Optional[int] = None) -> Optional[dict]:
+        """Profil varsa metabolizma hesapları, yoksa None"""
+        if not self.profile:
+            return None
+        return get_full_calculations(
+            weight_kg=self.profile.weight_kg,
+            height_cm=self.profile.height_cm,
+            birth_year=self.profile.birth_year,
+            gender=self.profile.gender,
+            steps=self.steps if steps is None else steps,
+            goal_type=self.goal_type
+        )
+
+
+class UserContextCache:
+    """Thread-safe, kısa TTL'li kullanıcı bazlı cache"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        # {user_id: (expires_at, UserContext)}
+        self._entries: Dict[int, Tuple[float, UserContext]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, activity_date: date) -> Optional[UserContext]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if not entry:
+                return None
+            expires_at, ctx = entry
+            # Gün dönümünde bugünkü aktivite değişir
+            if expires_at < time.monotonic() or ctx.activity_date != activity_date:
+                del self._entries[user_id]
+                return None
+            return ctx
+
+    def set(self, ctx: UserContext) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[ctx.user_id] = (time.monotonic() + self.ttl_seconds, ctx)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+user_context_cache = UserContextCache(settings.USER_CONTEXT_TTL_SECONDS)
+
+
+def load_user_context(user_id: int, db: Session, activity_date: Optional[date] = None) -> UserContext:
+    """Hedef, profil ve aktiviteyi tek sorguda yükle (cache'e bakmadan)"""
+    activity_date = activity_date or date.today()
+
+    row = db.query(UserGoals, UserProfile, DailyActivity).select_from(User).outerjoin(
+        UserGoals, UserGoals.user_id == User.id
+    ).outerjoin(
+        UserProfile, UserProfile.user_id == User.id
+    ).outerjoin(
+        DailyActivity, and_(
+            DailyActivity.user_id == User.id,
+            DailyActivity.activity_date == activity_date
+        )
+    ).filter(
+        User.id == user_id
+    ).first()
+
+    goals, profile, activity = row if row else (None, None, None)
+
+    # Cache'te paylaşılacağı için session'dan ayır (commit expire etmesin)
+    for obj in (goals, profile, activity):
+        if obj is not None:
+            db.expunge(obj)
+
+    return UserContext(user_id, activity_date, goals, profile, activity)
+
+
+def get_user_context_for(user_id: int, db: Session) -> UserContext:
+    """Bugünkü context'i cache üzerinden getir"""
+    today = date.today()
+    ctx = user_context_cache.get(user_id, today)
+    if ctx is None:
+        ctx = load_user_context(user_id, db, today)
+        user_context_cache.set(ctx)
+    return ctx
+
+
+def get_user_context(
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+) -> UserContext:
+    """FastAPI dependency - istek başına bir kez çözülür"""
+    return get_user_context_for(user_id, db)
+
+
+def invalidate_user_context(user_id: int) -> None:
+    """Hedef / profil / aktivite yazıldıktan sonra çağır"""
+    user_context_cache.invalidate(user_id)
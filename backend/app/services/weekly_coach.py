@@ -8,17 +8,15 @@ Skor uydurma yok, tamamen mevcut veriden.
 from datetime import date, datetime, timedelta
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
 
 from app.db.models import (
-    UserGoals, UserProfile, DailyActivity, 
-    MealLog, Meal, AIInteraction, AIAcceptance
+    DailyActivity, MealLog, Meal, AIInteraction, AIAcceptance
 )
 from app.services.warnings import generate_daily_warnings
-from app.services.metabolism import get_full_calculations
+from app.services.user_context import UserContext, get_user_context_for
 
 
-def get_weekly_summary(user_id: int, end_date: date, db: Session) -> dict:
+def get_weekly_summary(user_id: int, end_date: date, db: Session, user_ctx: Optional[UserContext] = None) -> dict:
     """
     Son 7 günün haftalık özetini hesaplar.
     
@@ -30,6 +28,8 @@ def get_weekly_summary(user_id: int, end_date: date, db: Session) -> dict:
     - Kaç gün AI önerisi kabul edilmiş
     - En sık gelen uyarı
     
+    user_ctx: Verilirse (UserContext) hedefler tekrar sorgulanmaz.
+    
     Returns:
         dict: Haftalık özet verileri
     """
@@ -37,9 +37,10 @@ def get_weekly_summary(user_id: int, end_date: date, db: Session) -> dict:
     start_date = end_date - timedelta(days=6)
     
     # 1️⃣ Kullanıcı hedeflerini al
-    user_goals = db.query(UserGoals).filter(UserGoals.user_id == user_id).first()
-    calorie_target = user_goals.daily_calorie_target if user_goals else 2000
-    protein_target = user_goals.daily_protein_target if user_goals else 100
+    if user_ctx is None:
+        user_ctx = get_user_context_for(user_id, db)
+    calorie_target = user_ctx.calorie_target
+    protein_target = user_ctx.protein_target
     
     # 2️⃣ Haftalık yemek kayıtlarını al
     weekly_logs = db.query(MealLog).filter(
@@ -115,7 +116,6 @@ def get_weekly_summary(user_id: int, end_date: date, db: Session) -> dict:
     # 8️⃣ En sık gelen uyarı
     # Her gün için uyarıları hesapla ve en çok tekrar edeni bul
     warning_counts = {}
-    user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
     
     for day_str, day_data in daily_totals.items():
         # Aktivite verisi
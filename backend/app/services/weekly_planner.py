@@ -0,0 +1,368 @@
+"""
+Weekly Meal Plans (batch)
+
+Hafta sonu çalışan job: aktif her kullanıcı için 7 günlük plan üretir ve
+weekly_meal_plans tablosuna yazar.
+
+Hedefler analysis ile aynı önceliktedir: profil varsa
+metabolism.get_full_calculations (son 7 günün ortalama adımıyla), yoksa
+UserGoals, o da yoksa varsayılanlar. Karbonhidrat / yağ hedefi
+calculate_macro_targets'tan gelir.
+
+Plan: günlük hedef SLOT_SHARES oranlarında öğünlere bölünür.
+  - Ana öğünler (Breakfast, Lunch, Dinner): slot payına en yakın 7 farklı
+    (yemek, porsiyon) seçilir; favoriler hatada FAVORITE_ERROR_FACTOR ile öne çıkar.
+  - Snack dengeleme slotudur: her gün ana öğünlerden kalan farka en yakın,
+    hafta içinde tekrar etmeyen atıştırmalık seçilir.
+Hatalar kullanıcı bloğu × aday matrisi olarak iki matris çarpımıyla hesaplanır.
+
+Katalog (makro matrisi + meal_type kodları) süreç havuzunun initializer'ı ile
+her worker'a bir kez yüklenir; işler sadece kullanıcı dizilerini taşır ve
+sonuç kompakt NumPy dizileri olarak döner. Ana süreç chunk chunk yazar
+(DELETE hafta + executemany INSERT).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.db.models import DailyActivity, FavoriteMeal, Meal, MealLog, UserGoals, UserProfile, WeeklyMealPlan
+from app.services.metabolism import calculate_macro_targets, get_full_calculations
+from app.services.user_context import DEFAULT_CALORIE_TARGET, DEFAULT_PROTEIN_TARGET, DEFAULT_GOAL_TYPE
+
+DAYS = 7
+# Günlük hedefin öğünlere dağılımı; son slot (Snack) günü dengeler
+SLOT_SHARES = {"Breakfast": 0.25, "Lunch": 0.35, "Dinner": 0.30, "Snack": 0.10}
+BALANCING_SLOT = "Snack"
+PORTIONS = (1.0, 0.5, 1.5, 2.0)
+MACRO_WEIGHTS = np.array([1.0, 1.0, 0.5, 0.5])
+FAVORITE_ERROR_FACTOR = 0.5
+
+ACTIVE_DAYS = 14
+STEPS_DAYS = 7
+DEFAULT_CHUNK_USERS = 500
+# Kullanıcı bloğu başına hata tensörü eleman sayısı (B·7·n, ~32 MB float32)
+PLAN_BLOCK_ELEMENTS = 8_000_000
+
+# Worker'a initializer ile bir kez yüklenen katalog
+_catalog: Optional[dict] = None
+
+
+def next_week_start(today: Optional[date] = None) -> date:
+    """Bir sonraki Pazartesi"""
+    today = today or date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def load_catalog(engine: Engine) -> dict:
+    """Planlamada kullanılan katalog dizileri (meal_id sırasıyla)"""
+    columns = [Meal.meal_id, Meal.calories, Meal.protein_g, Meal.carbs_g, Meal.fat_g, Meal.meal_type]
+    with engine.connect() as conn:
+        df = pd.read_sql(select(*columns).order_by(Meal.meal_id), conn)
+    macros = df[["calories", "protein_g", "carbs_g", "fat_g"]].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    meal_types = df["meal_type"].fillna("").str.lower().to_numpy()
+    return {
+        "meal_ids": df["meal_id"].to_numpy(dtype=np.int64),
+        "slots": {slot: slot_candidates(macros, np.flatnonzero(meal_types == slot.lower())) for slot in SLOT_SHARES}
+    }
+
+
+def slot_candidates(macros: np.ndarray, meals: np.ndarray) -> dict:
+    """
+    Slotun tüm (yemek, porsiyon) adayları; aday j = porsiyon_idx·len(meals) + yemek_idx.
+    units: porsiyonlu ham makrolar (n, 4) float32, kullanıcı hedefine bölünmemiş
+    """
+    units = (np.tile(macros[meals], (len(PORTIONS), 1)) * np.repeat(np.array(PORTIONS), len(meals))[:, None]).astype(np.float32)
+    return {
+        "meals": meals,
+        "meal_pos": np.tile(meals, len(PORTIONS)),
+        "portion": np.repeat(np.array(PORTIONS), len(meals)),
+        "units": units,
+        "units_sq": units ** 2
+    }
+
+
+def load_user_inputs(engine: Engine, as_of: Optional[date] = None, user_ids: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    Aktif kullanıcılar (son ACTIVE_DAYS günde log) ve günlük hedefleri.
+    Returns: DataFrame[user_id, calories, protein, carbs, fat]
+    """
+    as_of = as_of or date.today()
+    with engine.connect() as conn:
+        active = select(MealLog.user_id).where(MealLog.log_date >= as_of - timedelta(days=ACTIVE_DAYS)).distinct()
+        if user_ids is not None:
+            active = active.where(MealLog.user_id.in_(user_ids))
+        users = pd.read_sql(active, conn)
+        goals = pd.read_sql(select(
+            UserGoals.user_id, UserGoals.daily_calorie_target, UserGoals.daily_protein_target, UserGoals.goal_type
+        ), conn)
+        profiles = pd.read_sql(select(
+            UserProfile.user_id, UserProfile.weight_kg, UserProfile.height_cm, UserProfile.birth_year, UserProfile.gender
+        ), conn)
+        steps = pd.read_sql(select(
+            DailyActivity.user_id, func.avg(DailyActivity.steps).label("steps")
+        ).where(
+            DailyActivity.activity_date >= as_of - timedelta(days=STEPS_DAYS)
+        ).group_by(DailyActivity.user_id), conn)
+
+    df = users.merge(goals, on="user_id", how="left").merge(profiles, on="user_id", how="left").merge(steps, on="user_id", how="left")
+    calories, protein = [], []
+    for row in df.itertuples(index=False):
+        goal_type = row.goal_type if isinstance(row.goal_type, str) else DEFAULT_GOAL_TYPE
+        if not pd.isna(row.weight_kg):
+            calcs = get_full_calculations(
+                weight_kg=row.weight_kg, height_cm=int(row.height_cm), birth_year=int(row.birth_year),
+                gender=row.gender, steps=0 if pd.isna(row.steps) else int(row.steps), goal_type=goal_type
+            )
+            calories.append(calcs["target_calories"])
+            protein.append(calcs["target_protein"])
+        elif not pd.isna(row.daily_calorie_target):
+            calories.append(int(row.daily_calorie_target))
+            protein.append(int(row.daily_protein_target))
+        else:
+            calories.append(DEFAULT_CALORIE_TARGET)
+            protein.append(DEFAULT_PROTEIN_TARGET)
+
+    macros = [calculate_macro_targets(c, p) for c, p in zip(calories, protein)]
+    return pd.DataFrame({
+        "user_id": df["user_id"].astype(np.int64),
+        "calories": np.array(calories, dtype=np.float64),
+        "protein": np.array(protein, dtype=np.float64),
+        "carbs": np.array([m[0] for m in macros], dtype=np.float64),
+        "fat": np.array([m[1] for m in macros], dtype=np.float64)
+    })
+
+
+def load_favorites(engine: Engine) -> Dict[int, np.ndarray]:
+    """{user_id: favori meal_id dizisi}"""
+    with engine.connect() as conn:
+        df = pd.read_sql(select(FavoriteMeal.user_id, FavoriteMeal.meal_id).distinct(), conn)
+    return {int(uid): group.to_numpy(dtype=np.int64) for uid, group in df.groupby("user_id")["meal_id"]}
+
+
+def _init_worker(catalog: dict) -> None:
+    global _catalog
+    _catalog = catalog
+
+
+def _errors(candidates: dict, inv_scale: np.ndarray, goal: np.ndarray) -> np.ndarray:
+    """
+    Σ_k w_k·(units_jk / scale_bk − goal_bk)² tüm kullanıcı × aday çiftleri için,
+    iki matris çarpımıyla. inv_scale (B, 4), goal (B, D, 4) → (B, D, n)
+    """
+    w = MACRO_WEIGHTS.astype(np.float32)
+    inv_scale, goal = inv_scale.astype(np.float32), goal.astype(np.float32)
+    quad = (inv_scale ** 2 * w) @ candidates["units_sq"].T
+    cross = (goal * (w * inv_scale)[:, None, :]) @ candidates["units"].T
+    return quad[:, None, :] - 2.0 * cross + ((goal ** 2) @ w)[:, :, None]
+
+
+def _favor(errors: np.ndarray, candidates: dict, favorite_pos: List[np.ndarray]) -> None:
+    """Favori yemeklerin (tüm porsiyonları) hatasını FAVORITE_ERROR_FACTOR ile çarp"""
+    meals = candidates["meals"]
+    for b, positions in enumerate(favorite_pos):
+        idx = np.flatnonzero(np.isin(meals, positions))
+        if len(idx):
+            cols = (np.arange(len(PORTIONS))[:, None] * len(meals) + idx[None, :]).ravel()
+            errors[b, :, cols] *= FAVORITE_ERROR_FACTOR
+
+
+def _distinct_best(errors: np.ndarray, meal_pos: np.ndarray, count: int) -> np.ndarray:
+    """
+    Satır başına hatası en düşük, yemekleri farklı `count` aday (B, count).
+    Yemek başına en fazla len(PORTIONS) varyant olduğundan en iyi
+    count·len(PORTIONS) aday yeterli; slotta az yemek varsa seçim tekrar eder.
+    """
+    take = min(errors.shape[1], count * len(PORTIONS))
+    top = np.argpartition(errors, take - 1, axis=1)[:, :take] if take < errors.shape[1] else np.tile(np.arange(take), (len(errors), 1))
+    chosen = np.empty((len(errors), count), dtype=np.int64)
+    for b in range(len(errors)):
+        row = top[b][np.argsort(errors[b, top[b]], kind="stable")]
+        _, first = np.unique(meal_pos[row], return_index=True)
+        chosen[b] = np.resize(row[np.sort(first)][:count], count)
+    return chosen
+
+
+def plan_users(targets: np.ndarray, favorites: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Kullanıcı bloğunun haftası. targets (B, 4): günlük (calories, protein, carbs, fat)
+    Returns: (kullanıcı idx, gün, slot idx, meal_pos, porsiyon) sütunları
+    """
+    n_users = len(targets)
+    inv_scale = 1.0 / np.maximum(targets, 1.0)
+    favorite_pos = [np.flatnonzero(np.isin(_catalog["meal_ids"], f)) if len(f) else f for f in favorites]
+    day_totals = np.zeros((n_users, DAYS, 4))
+    out = []
+
+    for slot_idx, (slot, share) in enumerate(SLOT_SHARES.items()):
+        candidates = _catalog["slots"][slot]
+        if slot == BALANCING_SLOT or len(candidates["meals"]) == 0:
+            continue
+        errors = _errors(candidates, inv_scale, np.full((n_users, 1, 4), share))
+        _favor(errors, candidates, favorite_pos)
+        chosen = _distinct_best(errors[:, 0, :], candidates["meal_pos"], DAYS)
+        day_totals += candidates["units"][chosen] * inv_scale[:, None, :]
+        out.append((chosen, slot_idx, candidates))
+
+    snack = _catalog["slots"][BALANCING_SLOT]
+    if len(snack["meals"]):
+        # (B, 7, n): her gün ana öğünlerden kalan farka göre; gün gün en iyisi,
+        # seçilen yemek kullanıcının haftasında tekrar etmez
+        errors = _errors(snack, inv_scale, 1.0 - day_totals)
+        _favor(errors, snack, favorite_pos)
+        chosen = np.empty((n_users, DAYS), dtype=np.int64)
+        for b in range(n_users):
+            for day in range(DAYS):
+                c = int(np.argmin(errors[b, day]))
+                chosen[b, day] = c
+                if day + 1 < len(snack["meals"]):
+                    errors[b, :, snack["meal_pos"] == snack["meal_pos"][c]] = np.inf
+        out.append((chosen, list(SLOT_SHARES).index(BALANCING_SLOT), snack))
+
+    users, days, slots, meal_pos, portion = [], [], [], [], []
+    for chosen, slot_idx, candidates in out:
+        users.append(np.repeat(np.arange(n_users), DAYS))
+        days.append(np.tile(np.arange(DAYS), n_users))
+        slots.append(np.full(n_users * DAYS, slot_idx))
+        meal_pos.append(candidates["meal_pos"][chosen.ravel()])
+        portion.append(candidates["portion"][chosen.ravel()])
+    if not out:
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(5))
+    return tuple(np.concatenate(parts) for parts in (users, days, slots, meal_pos, portion))
+
+
+def _plan_chunk(user_ids: np.ndarray, targets: np.ndarray, favorites: List[np.ndarray]) -> Tuple[np.ndarray, ...]:
+    """Worker: chunk'taki kullanıcıları bloklar halinde planla; sonuç sütun dizileri"""
+    largest = max((len(c["meal_pos"]) for c in _catalog["slots"].values()), default=1)
+    block = max(1, PLAN_BLOCK_ELEMENTS // (DAYS * max(largest, 1)))
+    parts = []
+    for start in range(0, len(user_ids), block):
+        users, days, slots, meal_pos, portion = plan_users(targets[start:start + block], favorites[start:start + block])
+        parts.append((
+            user_ids[start + users], days.astype(np.int8), slots.astype(np.int8),
+            _catalog["meal_ids"][meal_pos], portion.astype(np.float32)
+        ))
+    if not parts:
+        return tuple(np.zeros(0) for _ in range(5))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def _chunks(users: pd.DataFrame, favorites: Dict[int, np.ndarray], size: int) -> Iterator[tuple]:
+    empty = np.zeros(0, dtype=np.int64)
+    targets = users[["calories", "protein", "carbs", "fat"]].to_numpy()
+    user_ids = users["user_id"].to_numpy()
+    for start in range(0, len(users), size):
+        ids = user_ids[start:start + size]
+        yield ids, targets[start:start + size], [favorites.get(int(u), empty) for u in ids]
+
+
+def _write_chunk(engine: Engine, week_start: date, user_ids: np.ndarray, result: Tuple[np.ndarray, ...]) -> int:
+    """Chunk'taki kullanıcıların o haftaki eski planını sil, yenisini toplu ekle"""
+    out_user, out_day, out_slot, out_meal, out_portion = result
+    slot_names = list(SLOT_SHARES)
+    rows = [
+        {
+            "user_id": u, "week_start": week_start, "plan_date": week_start + timedelta(days=d),
+            "meal_type": slot_names[s], "meal_id": m, "portion": p
+        }
+        for u, d, s, m, p in zip(out_user.tolist(), out_day.tolist(), out_slot.tolist(), out_meal.tolist(), out_portion.tolist())
+    ]
+    with engine.begin() as conn:
+        conn.execute(delete(WeeklyMealPlan).where(
+            WeeklyMealPlan.week_start == week_start,
+            WeeklyMealPlan.user_id.in_(user_ids.tolist())
+        ))
+        if rows:
+            conn.execute(insert(WeeklyMealPlan), rows)
+    return len(rows)
+
+
+def generate_weekly_plans(
+    engine: Engine,
+    week_start: Optional[date] = None,
+    workers: Optional[int] = None,
+    chunk_users: int = DEFAULT_CHUNK_USERS,
+    user_ids: Optional[List[int]] = None,
+    save: bool = True
+) -> dict:
+    """
+    Tüm aktif kullanıcılar için haftalık plan.
+    Returns: {week_start, users, rows, plans_per_second, seconds: {...}}
+    """
+    week_start = week_start or next_week_start()
+    workers = workers or os.cpu_count() or 1
+    timings = {}
+    start = time.perf_counter()
+
+    catalog = load_catalog(engine)
+    users = load_user_inputs(engine, user_ids=user_ids)
+    favorites = load_favorites(engine)
+    timings["load"] = time.perf_counter() - start
+
+    step = time.perf_counter()
+    n_rows = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog,)) as executor:
+        chunks = list(_chunks(users, favorites, chunk_users))
+        futures = [executor.submit(_plan_chunk, *chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            result = future.result()
+            n_rows += _write_chunk(engine, week_start, chunk[0], result) if save else len(result[0])
+    planning = time.perf_counter() - step
+    timings["plan_and_write"] = planning
+    timings["total"] = time.perf_counter() - start
+
+    return {
+        "week_start": week_start.isoformat(),
+        "users": len(users),
+        "rows": n_rows,
+        "workers": workers,
+        "plans_per_second": round(len(users) / planning, 1) if planning > 0 else None,
+        "seconds": {k: round(v, 3) for k, v in timings.items()}
+    }
+
+
+def benchmark_planning(
+    engine: Engine,
+    n_users: int,
+    workers: Optional[int] = None,
+    chunk_users: int = DEFAULT_CHUNK_USERS,
+    seed: int = 42
+) -> dict:
+    """Gerçek katalog + rastgele hedefli sentetik kullanıcılarla planlama hızı (DB'ye yazmaz)"""
+    workers = workers or os.cpu_count() or 1
+    catalog = load_catalog(engine)
+    rng = np.random.default_rng(seed)
+    calories = rng.integers(1400, 3200, n_users)
+    protein = rng.integers(60, 200, n_users)
+    macros = np.array([calculate_macro_targets(int(c), int(p)) for c, p in zip(calories, protein)])
+    users = pd.DataFrame({
+        "user_id": np.arange(1, n_users + 1, dtype=np.int64),
+        "calories": calories.astype(np.float64),
+        "protein": protein.astype(np.float64),
+        "carbs": macros[:, 0].astype(np.float64),
+        "fat": macros[:, 1].astype(np.float64)
+    })
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog,)) as executor:
+        n_rows = sum(len(result[0]) for result in executor.map(_plan_chunk_args, _chunks(users, {}, chunk_users)))
+    elapsed = time.perf_counter() - start
+    return {
+        "users": n_users,
+        "meals": len(catalog["meal_ids"]),
+        "rows": n_rows,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "plans_per_second": round(n_users / elapsed, 1) if elapsed > 0 else None
+    }
+
+
+def _plan_chunk_args(chunk: tuple) -> Tuple[np.ndarray, ...]:
+    return _plan_chunk(*chunk)
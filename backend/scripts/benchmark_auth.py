@@ -0,0 +1,49 @@
+"""
+İstek başına auth maliyeti: get_current_user_id, JWT cache'li vs cache'siz
+
+Dashboard benzeri burst: her kullanıcı aynı token ile --burst istek atar.
+Cache'siz ölçümde her çağrıda cache temizlenir (decode + HMAC doğrulaması).
+
+Kullanım (backend/ dizininden):
+    python -m scripts.benchmark_auth
+    python -m scripts.benchmark_auth --users 1000 --burst 10
+"""
+import argparse
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.security import create_access_token, get_current_user_id
+from app.core.token_cache import token_cache
+
+def _per_request_us(credentials: list, burst: int, cached: bool) -> float:
+    token_cache.clear()
+    start = time.perf_counter()
+    for creds in credentials:
+        for _ in range(burst):
+            if not cached:
+                token_cache.clear()
+            get_current_user_id(creds)
+    return (time.perf_counter() - start) / (len(credentials) * burst) * 1e6
+
+def run(users: int = 200, burst: int = 8):
+    credentials = [
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(str(user_id)))
+        for user_id in range(1, users + 1)
+    ]
+    uncached = _per_request_us(credentials, burst, cached=False)
+    before = token_cache.stats()
+    cached = _per_request_us(credentials, burst, cached=True)
+    after = token_cache.stats()
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    print(f"🔐 {users} kullanıcı x {burst} istek/burst")
+    print(f"⏱️  Cache'siz: {uncached:.1f} µs/istek, cache'li: {cached:.1f} µs/istek ({uncached / cached:.1f}x)")
+    print(f"📊 Cache'li çalışma: {hits} hit, {misses} miss")
+    return {"uncached_us": round(uncached, 2), "cached_us": round(cached, 2), "hits": hits, "misses": misses}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auth overhead benchmark (JWT cache)")
+    parser.add_argument("--users", type=int, default=200, help="Farklı token sayısı")
+    parser.add_argument("--burst", type=int, default=8, help="Token başına art arda istek")
+    args = parser.parse_args()
+    run(args.users, args.burst)
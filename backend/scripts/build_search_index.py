@@ -0,0 +1,30 @@
+"""
+Meal search index (hashing TF-IDF, güncel catalog_version için)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.build_search_index
+    python -m scripts.build_search_index --benchmark
+"""
+import argparse
+
+from app.db.session import engine
+from app.services.meal_search import benchmark_search, build_search_index
+
+def run(benchmark: bool = False):
+    stats = build_search_index(engine)
+    print(
+        f"✅ Search index: {stats['meals']} yemek, {stats['nnz']} terim, "
+        f"catalog v{stats['catalog_version']}, {stats['seconds']}s"
+    )
+    if benchmark:
+        result = benchmark_search(engine)
+        print(f"⏱️  Semantic: {result['semantic_ms']} ms/sorgu, LIKE: {result['like_ms']} ms/sorgu")
+        for text, hits in result["hits"].items():
+            print(f"   '{text}': {hits['semantic']} sonuç (LIKE: {hits['like']})")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meal search index")
+    parser.add_argument("--benchmark", action="store_true", help="Semantic arama vs LIKE karşılaştırması")
+    args = parser.parse_args()
+    run(args.benchmark)
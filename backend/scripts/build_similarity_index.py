@@ -0,0 +1,25 @@
+"""
+Meal similarity index (top-k komşu tablosu, güncel catalog_version için)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.build_similarity_index
+    python -m scripts.build_similarity_index --k 100
+"""
+import argparse
+
+from app.db.session import engine
+from app.services.meal_similarity import build_similarity_index
+
+def run(k: int = None):
+    stats = build_similarity_index(engine, k)
+    print(
+        f"✅ Similarity index: {stats['meals']} yemek × {stats['k']} komşu, "
+        f"catalog v{stats['catalog_version']}, {stats['seconds']}s"
+    )
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meal similarity index")
+    parser.add_argument("--k", type=int, default=None, help="Yemek başına komşu (default: SIMILAR_MEALS_TOP_K)")
+    args = parser.parse_args()
+    run(args.k)
@@ -0,0 +1,45 @@
+"""
+Haftalık plan batch job'u (aktif tüm kullanıcılar → weekly_meal_plans)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.generate_weekly_plans
+    python -m scripts.generate_weekly_plans --week-start 2026-10-26 --workers 8
+    python -m scripts.generate_weekly_plans --benchmark 20000
+"""
+import argparse
+from datetime import date
+
+from app.db.session import engine
+from app.services.weekly_planner import (
+    generate_weekly_plans, benchmark_planning, DEFAULT_CHUNK_USERS
+)
+
+def run(week_start: date = None, workers: int = None, chunk_users: int = DEFAULT_CHUNK_USERS, save: bool = True):
+    stats = generate_weekly_plans(engine, week_start, workers=workers, chunk_users=chunk_users, save=save)
+    print(
+        f"✅ Hafta {stats['week_start']}: {stats['users']} kullanıcı, {stats['rows']} öğün "
+        f"({stats['workers']} worker)"
+    )
+    print(f"⏱️  {stats['plans_per_second']} plan/sn, {stats['seconds']}")
+    return stats
+
+def run_benchmark(n_users: int, workers: int = None, chunk_users: int = DEFAULT_CHUNK_USERS):
+    stats = benchmark_planning(engine, n_users, workers=workers, chunk_users=chunk_users)
+    print(
+        f"📊 {stats['users']} sentetik kullanıcı × {stats['meals']} yemek, {stats['workers']} worker: "
+        f"{stats['seconds']}s → {stats['plans_per_second']} plan/sn"
+    )
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Weekly meal plan batch job")
+    parser.add_argument("--week-start", type=date.fromisoformat, default=None, help="Pazartesi (default: gelecek hafta)")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (default: CPU)")
+    parser.add_argument("--chunk-users", type=int, default=DEFAULT_CHUNK_USERS, help="İş başına kullanıcı")
+    parser.add_argument("--dry-run", action="store_true", help="Planla ama yazma")
+    parser.add_argument("--benchmark", type=int, default=None, metavar="N", help="N sentetik kullanıcıyla hız ölçümü")
+    args = parser.parse_args()
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.workers, args.chunk_users)
+    else:
+        run(args.week_start, args.workers, args.chunk_users, save=not args.dry_run)
@@ -1,44 +1,48 @@
-import pandas as pd
-from app.db.session import SessionLocal
-from app.db.models import Meal
+"""
+Meal catalog import (bulk upsert)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.import_meals
+    python -m scripts.import_meals --csv ../data/external_foods.csv --chunksize 100000
+    python -m scripts.import_meals --key name_calories   # CSV'de meal_id yoksa
+    python -m scripts.import_meals --sync                # sadece değişen satırlar
+    python -m scripts.import_meals --sync --keep-missing # CSV'de olmayanları silme
+"""
+import argparse
+
+from app.db.session import engine
+from app.services.meal_import import (
+    bulk_import_meals, sync_meals, DEFAULT_CHUNKSIZE, KEY_MEAL_ID, KEY_NAME_CALORIES
+)
 
 CSV_PATH = "../data/healthy_eating_clean.csv"
 
-def run():
-    df = pd.read_csv(CSV_PATH)
-
-    db = SessionLocal()
-
-    for _, row in df.iterrows():
-        meal = Meal(
-            meal_id=int(row["meal_id"]),
-            meal_name=row["meal_name"],
-
-            cuisine=row["cuisine"],
-            meal_type=row["meal_type"],
-            diet_type=row["diet_type"],
-
-            calories=row["calories"],
-            protein_g=row["protein_g"],
-            carbs_g=row["carbs_g"],
-            fat_g=row["fat_g"],
-            fiber_g=row["fiber_g"],
-            sugar_g=row["sugar_g"],
-
-            sodium_mg=row["sodium_mg"],
-            cholesterol_mg=row["cholesterol_mg"],
-
-            prep_time_min=row["prep_time_min"],
-            cook_time_min=row["cook_time_min"],
-
-            rating=row["rating"],
-            is_healthy=bool(row["is_healthy"]),
-        )
-
-        db.merge(meal)  # meal_id aynıysa overwrite
-    db.commit()
-    db.close()
-    print("✅ Meals import tamamlandı")
+def run(csv_path: str = CSV_PATH, key: str = KEY_MEAL_ID, chunksize: int = DEFAULT_CHUNKSIZE):
+    stats = bulk_import_meals(engine, csv_path, key=key, chunksize=chunksize)
+    print(
+        f"✅ Meals import tamamlandı: {stats['rows']} satır, {stats['chunks']} parça, "
+        f"{stats['seconds']}s ({stats['rows_per_sec']:,.0f} rows/sec)"
+    )
+    return stats
+
+def run_sync(csv_path: str = CSV_PATH, chunksize: int = DEFAULT_CHUNKSIZE, delete_missing: bool = True):
+    stats = sync_meals(engine, csv_path, chunksize=chunksize, delete_missing=delete_missing)
+    print(
+        f"✅ Meals sync tamamlandı: +{stats['inserted']} ~{stats['updated']} -{stats['deleted']} "
+        f"({stats['delete_skipped']} referanslı silinmedi, {stats['unchanged']} değişmedi) "
+        f"{stats['seconds']}s, version {'artırıldı' if stats['version_bumped'] else 'aynı'}"
+    )
+    return stats
 
 if __name__ == "__main__":
-    run()
+    parser = argparse.ArgumentParser(description="Meal CSV bulk import")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--key", choices=[KEY_MEAL_ID, KEY_NAME_CALORIES], default=KEY_MEAL_ID)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--sync", action="store_true", help="Hash karşılaştırmalı artımlı sync (meal_id anahtarı)")
+    parser.add_argument("--keep-missing", action="store_true", help="Sync'te CSV'de olmayan öğünleri silme")
+    args = parser.parse_args()
+    if args.sync:
+        run_sync(args.csv, args.chunksize, delete_missing=not args.keep_missing)
+    else:
+        run(args.csv, args.key, args.chunksize)
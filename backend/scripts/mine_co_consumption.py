@@ -0,0 +1,81 @@
+"""
+Co-consumption rules from meal_logs (rule store'a yeni versiyon yazar)
+
+Her (user_id, log_date) bir transaction. Kullanım (backend/ dizininden):
+    python -m scripts.mine_co_consumption
+    python -m scripts.mine_co_consumption --items attributes --min-support 0.02
+    python -m scripts.mine_co_consumption --items both --workers 8 --partition-size 500000
+    python -m scripts.mine_co_consumption --items both --incremental --prune-events
+"""
+import argparse
+
+from app.db.session import engine
+from app.mining.co_consumption import (
+    mine_co_consumption_rules, ITEMS_MEALS, ITEMS_ATTRIBUTES,
+    DEFAULT_MIN_SUPPORT, DEFAULT_MIN_LIFT, DEFAULT_PARTITION_SIZE, DEFAULT_CHUNK_ROWS
+)
+from app.mining.incremental import update_co_consumption_rules, prune_events
+
+def run(items: str = ITEMS_MEALS, min_support: float = DEFAULT_MIN_SUPPORT, min_confidence: float = 0.0,
+        min_lift: float = DEFAULT_MIN_LIFT, max_len: int = None, partition_size: int = DEFAULT_PARTITION_SIZE,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS, workers: int = None, save: bool = True):
+    stats = mine_co_consumption_rules(
+        engine, items=items, min_support=min_support, min_confidence=min_confidence,
+        min_lift=min_lift, max_len=max_len, partition_size=partition_size,
+        chunk_rows=chunk_rows, workers=workers, save=save
+    )
+    seconds = stats["seconds"]
+    print(
+        f"✅ [{items}] {stats['n_transactions']} transaction, {stats['n_partitions']} partition → "
+        f"{stats['n_candidates']} aday, {stats['n_itemsets']} sık itemset, {stats['n_rules']} kural "
+        f"({seconds['total']}s; yerel {seconds['local_mining']}s, sayım {seconds['counting']}s)"
+    )
+    if save:
+        print(f"📦 Rule store versiyon {stats['version']}")
+    return stats
+
+def run_incremental(items: str = ITEMS_MEALS, partition_size: int = DEFAULT_PARTITION_SIZE,
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS, workers: int = None, **default_params):
+    stats = update_co_consumption_rules(
+        engine, items, partition_size=partition_size, chunk_rows=chunk_rows,
+        workers=workers, **default_params
+    )
+    if stats["mode"] == "full":
+        print(f"ℹ️  [{items}] Tam madencilik ({stats['reason']}): {stats['n_itemsets']} sık itemset, {stats['n_rules']} kural")
+    elif stats["events"] == 0:
+        print(f"✅ [{items}] Yeni log olayı yok")
+    else:
+        print(
+            f"✅ [{items}] {stats['events']} olay, {stats['delta_transactions']} transaction → "
+            f"{stats['touched_itemsets']}/{stats['tracked_itemsets']} itemset güncellendi, "
+            f"+{stats['promoted']} -{stats['demoted']} sık, {stats['rescans']} tarama "
+            f"({stats['rescan_candidates']} aday), {stats['n_rules']} kural, {stats['seconds']['total']}s"
+        )
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="meal_logs co-consumption rule mining")
+    parser.add_argument("--items", choices=[ITEMS_MEALS, ITEMS_ATTRIBUTES, "both"], default=ITEMS_MEALS)
+    parser.add_argument("--min-support", type=float, default=DEFAULT_MIN_SUPPORT)
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--min-lift", type=float, default=DEFAULT_MIN_LIFT)
+    parser.add_argument("--max-len", type=int, default=None)
+    parser.add_argument("--partition-size", type=int, default=DEFAULT_PARTITION_SIZE, help="Partition başına transaction")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Cursor'dan okunan satır/parça")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Rule store'a yazma")
+    parser.add_argument("--incremental", action="store_true", help="Sadece yeni log olaylarını uygula")
+    parser.add_argument("--prune-events", action="store_true", help="İşlenmiş log olaylarını sil")
+    args = parser.parse_args()
+
+    kinds = [ITEMS_MEALS, ITEMS_ATTRIBUTES] if args.items == "both" else [args.items]
+    for kind in kinds:
+        if args.incremental:
+            run_incremental(kind, args.partition_size, args.chunk_rows, args.workers,
+                            min_support=args.min_support, min_confidence=args.min_confidence,
+                            min_lift=args.min_lift, max_len=args.max_len)
+        else:
+            run(kind, args.min_support, args.min_confidence, args.min_lift, args.max_len,
+                args.partition_size, args.chunk_rows, args.workers, save=not args.dry_run)
+    if args.prune_events:
+        print(f"🧹 {prune_events(engine)} işlenmiş log olayı silindi")
@@ -0,0 +1,41 @@
+"""
+Meal attribute association rules (rule store'a yeni versiyon yazar)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.mine_rules
+    python -m scripts.mine_rules --min-support 0.01 --min-lift 1.2
+    python -m scripts.mine_rules --max-len 3 --dry-run
+"""
+import argparse
+
+from app.db.session import engine
+from app.mining.attribute_rules import (
+    mine_attribute_rules, DEFAULT_MIN_SUPPORT, DEFAULT_MIN_CONFIDENCE, DEFAULT_MIN_LIFT
+)
+
+def run(min_support: float = DEFAULT_MIN_SUPPORT, min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        min_lift: float = DEFAULT_MIN_LIFT, max_len: int = None, save: bool = True):
+    stats = mine_attribute_rules(
+        engine, min_support=min_support, min_confidence=min_confidence,
+        min_lift=min_lift, max_len=max_len, save=save
+    )
+    seconds = stats["seconds"]
+    print(
+        f"✅ {stats['n_transactions']} yemek, {stats['n_items']} item → "
+        f"{stats['n_itemsets']} sık itemset, {stats['n_rules']} kural "
+        f"({seconds['total']}s; itemset {seconds['itemsets']}s, kural {seconds['rules']}s)"
+    )
+    if save:
+        print(f"📦 Rule store versiyon {stats['version']} (catalog v{stats['catalog_version']})")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meal attribute rule mining")
+    parser.add_argument("--min-support", type=float, default=DEFAULT_MIN_SUPPORT)
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument("--min-lift", type=float, default=DEFAULT_MIN_LIFT)
+    parser.add_argument("--max-len", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Rule store'a yazma")
+    args = parser.parse_args()
+
+    run(args.min_support, args.min_confidence, args.min_lift, args.max_len, save=not args.dry_run)
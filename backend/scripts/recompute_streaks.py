@@ -0,0 +1,17 @@
+"""
+Tüm kullanıcıların streak'ini log tarihlerinden yeniden hesapla
+(geçmişe tarihli / silinmiş loglar yüzünden kaymış user_streaks satırları için)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.recompute_streaks
+"""
+from app.db.session import engine
+from app.services.streaks import recompute_all_streaks
+
+def run():
+    stats = recompute_all_streaks(engine)
+    print(f"✅ Streaks: {stats['users']} kullanıcı, {stats['log_days']} log günü, {stats['seconds']}s")
+    return stats
+
+if __name__ == "__main__":
+    run()
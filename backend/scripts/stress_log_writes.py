@@ -0,0 +1,129 @@
+"""
+Eşzamanlı log yazımı stres testi (streak / log / değişiklik günlüğü tutarlılığı)
+
+Tek kullanıcı için yüzlerce paralel POST /logs + DELETE /logs yazımı
+(aynı servis fonksiyonları) çalıştırır, sonra değişmezleri kontrol eder:
+  - kullanıcının tek user_streaks satırı var
+  - streak satırı, log tarihlerinden yeniden hesaplananla aynı
+  - log sayısı farkı = başarılı ekleme - başarılı silme
+  - meal_log_events delta toplamı farkı = log sayısı farkı
+Oluşturulan loglar sonunda silinir (--keep ile kalır).
+
+Kullanım (backend/ dizininden):
+    python -m scripts.stress_log_writes --user-id 1
+    python -m scripts.stress_log_writes --user-id 1 --writes 1000 --workers 64 --days 10
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.db.models import Meal, MealLog, MealLogEvent, UserStreak
+from app.services.meal_logs import add_meal_log, delete_meal_log
+from app.services.streaks import compute_streaks, user_log_days
+
+def _snapshot(user_id: int) -> dict:
+    with SessionLocal() as db:
+        return {
+            "logs": db.execute(select(func.count()).select_from(MealLog).where(MealLog.user_id == user_id)).scalar(),
+            "events": db.execute(
+                select(func.coalesce(func.sum(MealLogEvent.delta), 0)).where(MealLogEvent.user_id == user_id)
+            ).scalar(),
+            "streak_rows": db.execute(
+                select(func.count()).select_from(UserStreak).where(UserStreak.user_id == user_id)
+            ).scalar()
+        }
+
+def _expected_streak(user_id: int) -> tuple:
+    with SessionLocal() as db:
+        days = user_log_days(db, user_id)
+        streak = db.get(UserStreak, user_id)
+        actual = (streak.current_streak, streak.max_streak, streak.last_logged_date) if streak else (0, 0, None)
+    _, current, longest, last_day = compute_streaks(np.full(len(days), user_id, dtype=np.int64), days)
+    expected = (int(current[0]), int(longest[0]), date.fromordinal(int(last_day[0]))) if len(days) else (0, 0, None)
+    return expected, actual
+
+def run(user_id: int, writes: int = 400, workers: int = 32, days: int = 14, delete_ratio: float = 0.2, meal_id: int = None, keep: bool = False):
+    if meal_id is None:
+        with SessionLocal() as db:
+            meal_id = db.execute(select(func.min(Meal.meal_id))).scalar()
+
+    before = _snapshot(user_id)
+    created = []
+    lock = threading.Lock()
+    counts = {"added": 0, "deleted": 0, "failed": 0}
+    today = date.today()
+
+    def task(i: int):
+        rng = random.Random(i)
+        try:
+            with SessionLocal() as db:
+                target = None
+                if rng.random() < delete_ratio:
+                    with lock:
+                        if created:
+                            target = created.pop(rng.randrange(len(created)))
+                if target is not None:
+                    if delete_meal_log(db, user_id, target) is not None:
+                        with lock:
+                            counts["deleted"] += 1
+                    return
+                log_date = today - timedelta(days=rng.randrange(days))
+                log, _ = add_meal_log(db, user_id, meal_id, 1.0, log_date)
+                with lock:
+                    created.append(log.id)
+                    counts["added"] += 1
+        except Exception as e:
+            with lock:
+                counts["failed"] += 1
+            print(f"⚠️  Yazım hatası: {e}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(task, range(writes)))
+    seconds = time.perf_counter() - start
+
+    after = _snapshot(user_id)
+    expected, actual = _expected_streak(user_id)
+    net = counts["added"] - counts["deleted"]
+    checks = {
+        "single_streak_row": after["streak_rows"] == 1,
+        "streak_matches_logs": expected == actual,
+        "log_count": after["logs"] - before["logs"] == net,
+        "event_balance": after["events"] - before["events"] == net
+    }
+
+    print(
+        f"⏱️  {writes} yazım, {workers} worker: {seconds:.2f}s ({writes / seconds:,.0f} yazım/s) - "
+        f"{counts['added']} ekleme, {counts['deleted']} silme, {counts['failed']} hata"
+    )
+    print(f"🔥 Streak: beklenen {expected}, satır {actual}")
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    if not keep:
+        with SessionLocal() as db:
+            for log_id in created:
+                delete_meal_log(db, user_id, log_id)
+        print(f"🧹 {len(created)} stres logu silindi")
+
+    return {**counts, "seconds": round(seconds, 3), "checks": checks}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent meal log write stress test")
+    parser.add_argument("--user-id", type=int, required=True, help="Yazımların yapılacağı (test) kullanıcı")
+    parser.add_argument("--writes", type=int, default=400, help="Toplam yazım sayısı")
+    parser.add_argument("--workers", type=int, default=32, help="Paralel thread sayısı")
+    parser.add_argument("--days", type=int, default=14, help="Log tarihleri son N gün içinden")
+    parser.add_argument("--delete-ratio", type=float, default=0.2, help="Yazımların silme olma oranı")
+    parser.add_argument("--meal-id", type=int, default=None, help="Loglanacak yemek (default: katalogdaki ilk)")
+    parser.add_argument("--keep", action="store_true", help="Stres loglarını silme")
+    args = parser.parse_args()
+    checks = run(args.user_id, args.writes, args.workers, args.days, args.delete_ratio, args.meal_id, args.keep)["checks"]
+    raise SystemExit(0 if all(checks.values()) else 1)
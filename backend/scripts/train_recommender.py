@@ -0,0 +1,32 @@
+"""
+Implicit ALS öneri modeli eğitimi (loglar + favoriler + AI kabulleri)
+
+Kullanım (backend/ dizininden):
+    python -m scripts.train_recommender
+    python -m scripts.train_recommender --factors 64 --iterations 20 --alpha 20
+"""
+import argparse
+
+from app.db.session import engine
+from app.services.recommender import (
+    train_recommender, DEFAULT_FACTORS, DEFAULT_ITERATIONS, DEFAULT_REGULARIZATION, DEFAULT_ALPHA
+)
+
+def run(factors: int, iterations: int, regularization: float, alpha: float, save: bool = True):
+    stats = train_recommender(engine, factors, iterations, regularization, alpha, save=save)
+    print(
+        f"✅ ALS: {stats['n_users']} kullanıcı × {stats['n_meals']} yemek, "
+        f"{stats['nnz']} etkileşim, k={stats['factors']}"
+    )
+    print(f"⏱️  {stats['seconds']}")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Implicit ALS recommender")
+    parser.add_argument("--factors", type=int, default=DEFAULT_FACTORS, help="Faktör boyutu")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="ALS iterasyonu")
+    parser.add_argument("--regularization", type=float, default=DEFAULT_REGULARIZATION, help="L2 (lambda)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Confidence ölçeği")
+    parser.add_argument("--dry-run", action="store_true", help="Modeli diske yazma")
+    args = parser.parse_args()
+    run(args.factors, args.iterations, args.regularization, args.alpha, save=not args.dry_run)
@@ -44,6 +44,9 @@ interface Log {
 interface Favorite {
     id: number;
     meal_id: number;
+    meal_name?: string;
+    calories?: number;
+    protein_g?: number;
 }
 
 interface UserGoals {
@@ -145,44 +148,33 @@ export default function DashboardPage() {
 
     const fetchData = useCallback(async () => {
         try {
-            // Check profile first
+            // Dashboard widget'ları tek istekte (profil, stats, uyarılar, loglar,
+            // favoriler, hedefler, günlük progress, streak, öneriler, haftalık)
             try {
-                const profileRes = await apiRequest('/profile');
-                if (profileRes.ok) {
-                    const pData = await profileRes.json();
-                    setShowProfileSetup(!pData.has_profile);
-                }
-            } catch {
-                // Profile check failed, continue anyway
-            }
-
-            // Fetch profile stats (BMR, TDEE, Activity)
-            try {
-                const statsRes = await apiRequest('/profile/stats');
-                if (statsRes.ok) {
-                    const statsData = await statsRes.json();
-                    if (statsData.has_profile) {
+                const dashRes = await apiRequest(`/dashboard?target_date=${selectedDate}`);
+                if (dashRes.ok) {
+                    const dash = await dashRes.json();
+                    setShowProfileSetup(!dash.has_profile);
+                    if (dash.profile_stats.has_profile) {
                         setProfileStats({
-                            bmr: statsData.calculations.bmr,
-                            tdee: statsData.calculations.tdee,
-                            target_calories: statsData.calculations.target_calories,
-                            steps: statsData.activity.steps,
-                            activity_level: statsData.activity.level,
+                            bmr: dash.profile_stats.calculations.bmr,
+                            tdee: dash.profile_stats.calculations.tdee,
+                            target_calories: dash.profile_stats.calculations.target_calories,
+                            steps: dash.profile_stats.activity.steps,
+                            activity_level: dash.profile_stats.activity.level,
                         });
                     }
+                    setDailyWarnings(dash.warnings);
+                    setLogs(dash.logs);
+                    setFavorites(dash.favorites);
+                    setGoals(dash.goals);
+                    setDailyProgress(dash.progress);
+                    setStreakData(dash.streak);
+                    setSuggestionsData(dash.suggestions);
+                    setWeeklyData(dash.weekly);
                 }
             } catch {
-                // Stats fetch failed
-            }
-
-            // Fetch daily warnings (8.5.3)
-            try {
-                const warnRes = await apiRequest('/analysis/warnings');
-                if (warnRes.ok) {
-                    setDailyWarnings(await warnRes.json());
-                }
-            } catch {
-                // Warning fetch failed
+                // Dashboard fetch failed, continue
             }
 
             // Fetch meals
@@ -190,71 +182,6 @@ export default function DashboardPage() {
             const mealsData = mealsRes.ok ? await mealsRes.json() : [];
             setMeals(mealsData);
 
-            // Fetch logs for selected date
-            const logsRes = await apiRequest(`/logs?log_date=${selectedDate}`);
-            if (logsRes.ok) setLogs(await logsRes.json());
-
-            // Fetch favorites
-            const favsRes = await apiRequest('/favorites');
-            if (favsRes.ok) setFavorites(await favsRes.json());
-
-            // Fetch goals
-            const goalsRes = await apiRequest('/user/goals');
-            if (goalsRes.ok) setGoals(await goalsRes.json());
-
-            // FAZ 10.3 - Fetch daily progress
-            try {
-                const progressDailyRes = await apiRequest(`/progress/daily?target_date=${selectedDate}`);
-                if (progressDailyRes.ok) {
-                    setDailyProgress(await progressDailyRes.json());
-                }
-            } catch {
-                // Progress fetch failed, continue
-            }
-
-            // FAZ 10.4 - Fetch streak
-            try {
-                const streakRes = await apiRequest('/engagement/streak');
-                if (streakRes.ok) {
-                    setStreakData(await streakRes.json());
-                }
-            } catch {
-                // Streak fetch failed, continue
-            }
-
-            // FAZ 10.4 - Fetch meal suggestions
-            try {
-                const suggestRes = await apiRequest('/engagement/meal-suggestions');
-                if (suggestRes.ok) {
-                    setSuggestionsData(await suggestRes.json());
-                }
-            } catch {
-                // Suggestions fetch failed, continue
-            }
-
-            // Fetch weekly data (son 7 gün)
-            const weekly: WeeklyData[] = [];
-            for (let i = 6; i >= 0; i--) {
-                const date = new Date(selectedDate);
-                date.setDate(date.getDate() - i);
-                const dateStr = date.toISOString().split('T')[0];
-
-                const dayLogsRes = await apiRequest(`/logs?log_date=${dateStr}`);
-                const dayLogs = dayLogsRes.ok ? await dayLogsRes.json() : [];
-
-                let dayCal = 0, dayProtein = 0;
-                for (const log of dayLogs) {
-                    const meal = mealsData.find((m: Meal) => m.meal_id === log.meal_id);
-                    if (meal) {
-                        dayCal += meal.calories * log.portion;
-                        dayProtein += meal.protein_g * log.portion;
-                    }
-                }
-
-                weekly.push({ date: dateStr, calories: dayCal, protein: dayProtein });
-            }
-            setWeeklyData(weekly);
-
             // Fetch progress analysis
             try {
                 const progressRes = await apiRequest('/analysis/progress');
@@ -353,7 +280,7 @@ export default function DashboardPage() {
 
     const macros = calculateMacros();
     const favoriteNames = favorites
-        .map(f => meals.find(m => m.meal_id === f.meal_id)?.meal_name)
+        .map(f => f.meal_name ?? meals.find(m => m.meal_id === f.meal_id)?.meal_name)
         .filter(Boolean) as string[];
 
     return (
@@ -10,6 +10,10 @@ interface Meal {
 interface Favorite {
     id: number;
     meal_id: number;
+    // GET /favorites ve /dashboard yemek alanlarını da döndürür
+    meal_name?: string;
+    calories?: number;
+    protein_g?: number;
 }
 
 interface FavoritesListProps {
@@ -20,7 +24,10 @@ interface FavoritesListProps {
 }
 
 export default function FavoritesList({ favorites, meals, onEat, onRemove }: FavoritesListProps) {
-    const getMeal = (mealId: number) => meals.find((m) => m.meal_id === mealId);
+    const getMeal = (fav: Favorite): Meal | undefined =>
+        fav.meal_name !== undefined
+            ? { meal_id: fav.meal_id, meal_name: fav.meal_name, calories: fav.calories ?? 0, protein_g: fav.protein_g ?? 0 }
+            : meals.find((m) => m.meal_id === fav.meal_id);
 
     if (favorites.length === 0) {
         return (
@@ -33,7 +40,7 @@ export default function FavoritesList({ favorites, meals, onEat, onRemove }: Fav
     return (
         <div className="space-y-2">
             {favorites.map((fav) => {
-                const meal = getMeal(fav.meal_id);
+                const meal = getMeal(fav);
                 if (!meal) return null;
 
                 return (